@@ -62,13 +62,89 @@ class Settings(BaseSettings):
     MEDIAPIPE_MIN_DETECTION_CONFIDENCE: float = 0.5
     MEDIAPIPE_MIN_TRACKING_CONFIDENCE: float = 0.5
 
+    # MediaPipe graph pool (one Hands graph per realtime session / worker)
+    HANDS_POOL_MAX_SIZE: int = 8
+    HANDS_POOL_IDLE_TIMEOUT: int = 300  # seconds
+    HANDS_POOL_CHECKOUT_TIMEOUT: float = 10.0  # seconds
+    HANDS_POOL_MIN_SIZE: int = 2  # graphs pre-built at startup and never evicted
+
+    # Startup warm-up (readiness: GET /ready)
+    STARTUP_WARMUP: bool = True
+    WARMUP_GRAPHS: str = "hands"  # comma-separated: hands, holistic, pose, face
+
+    # Video landmark extraction: hands | hands_pose | holistic
+    # (per-model override: registry metadata 'landmark_profile'; per-request: ?landmark_profile=)
+    LANDMARK_PROFILE: str = "hands_pose"
+    LANDMARK_FACE_INTERVAL: int = 5  # holistic profile: run face mesh every N sampled frames
+
+    # Realtime keypoint smoothing: none | one_euro | kalman (per-session override: ?smoothing=)
+    LANDMARK_SMOOTHING: str = "none"
+
+    # Realtime ROI crop-and-track hand detection (per-session override: ?roi_tracking=)
+    HAND_ROI_TRACKING: bool = False
+    HAND_ROI_FULL_DETECTION_INTERVAL: int = 15  # frames between full-frame detections
+    HAND_ROI_MARGIN: float = 0.3  # fraction of the hands bounding box size
+    HAND_ROI_EDGE_MARGIN: float = 0.02  # re-detect on full frame when a hand is this close to the crop edge
+
+    # Inference resolution: frames wider than this are downscaled before MediaPipe (0 = full resolution)
+    REALTIME_INFERENCE_WIDTH: int = 640
+    VIDEO_INFERENCE_WIDTH: int = 640
+    # Adaptive realtime resolution: lower width when per-frame latency exceeds the budget
+    REALTIME_ADAPTIVE_RESOLUTION: bool = False
+    REALTIME_LATENCY_BUDGET_MS: float = 50.0
+    REALTIME_MIN_INFERENCE_WIDTH: int = 256
+
+    # Realtime response format: json | flat | binary | msgpack (per-session override: ?format=, ?delta=)
+    REALTIME_RESPONSE_FORMAT: str = "json"
+
+    # Realtime sliding-window gesture recognition (per-session override: ?recognition=)
+    REALTIME_GESTURE_RECOGNITION: bool = False
+    GESTURE_WINDOW_SIZE: int = 30  # frames per window
+    GESTURE_WINDOW_STRIDE: int = 5  # run the classifier every N frames
+    GESTURE_CONFIDENCE_THRESHOLD: float = 0.6
+
+    # Realtime emotion detection (per-session override: ?emotion=): face mesh at a lower cadence than hands
+    REALTIME_EMOTION_RECOGNITION: bool = False
+    EMOTION_FACE_INTERVAL: int = 10  # run face mesh + emotion model every N frames
+    EMOTION_SCHEDULE: str = "interval"  # interval | hands (only on frames with hands)
+    EMOTION_SMOOTHING_ALPHA: float = 0.5  # EMA weight of the newest prediction (1 = hold latest)
+    EMOTION_HOLD_SECONDS: float = 2.0  # clear the emotion state after this long without a face (0 = hold forever)
+
+    # Cross-session micro-batching of sequence-model inference
+    INFERENCE_BATCHING: bool = True
+    INFERENCE_BATCH_MAX_SIZE: int = 16
+    INFERENCE_BATCH_MAX_WAIT_MS: float = 5.0  # max wait to fill a batch after its first request
+
+    # Trained model inference runtime: auto | keras | onnx | tflite
+    # (auto = registry metadata 'backend', else the model file extension)
+    MODEL_RUNTIME_BACKEND: str = "auto"
+    MODEL_RUNTIME_THREADS: int = 0  # intra-op threads per model (0 = runtime default)
+    MODEL_WATCH_INTERVAL: float = 5.0  # seconds between registry checks for a new active model (0 = off)
+
     # Processing settings
     MAX_WORKERS: int = 4
     PROCESSING_TIMEOUT: int = 300  # seconds
 
+    # Sharded video keypoint extraction (worker processes)
+    VIDEO_SHARD_WORKERS: int = 0  # 0 = number of CPU cores
+    VIDEO_SHARD_MIN_FRAMES: int = 50  # min sampled frames per shard
+    VIDEO_SEEK_THRESHOLD: int = 60  # seek instead of grab() when skipping >= N frames (0 = never seek)
+    VIDEO_PREFETCH_FRAMES: int = 4  # frames decoded ahead by a background thread (0 = inline)
+
+    # Keypoint cache (extracted video keypoints keyed by upload content hash)
+    KEYPOINT_CACHE_ENABLED: bool = True
+    KEYPOINT_CACHE_DIR: Path = DATA_DIR / "cache" / "keypoints"
+    KEYPOINT_CACHE_MAX_BYTES: int = 512 * 1024 * 1024  # 512MB
+
     # Logging
     LOG_LEVEL: str = "INFO"
     LOG_FORMAT: str = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    REQUEST_LOGGING: bool = True  # one line per HTTP request (runtime toggle: /telemetry)
+
+    # Sampled realtime frame telemetry (runtime toggle: /telemetry)
+    TELEMETRY_ENABLED: bool = False
+    TELEMETRY_SAMPLE_EVERY: int = 30  # log 1 in N frames per session
+    TELEMETRY_MAX_PER_SECOND: float = 1.0  # per session
 
     class Config:
         env_file = ".env"
@@ -99,7 +175,6 @@ class Settings(BaseSettings):
 
 
 # Global settings instance
+# NOTE: Importing config has no side effects - directories are created at
+# application startup (main.py startup_event -> settings.create_directories())
 settings = Settings()
-
-# Create necessary directories on import
-settings.create_directories()
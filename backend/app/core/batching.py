@@ -0,0 +1,216 @@
+"""
+Micro-Batching - Gom các inference requests từ nhiều sessions thành batches
+
+Model sequence (TF/ONNX) trên CPU chạy batch size 1 lãng phí phần lớn
+throughput vectorized. MicroBatcher nhận requests từ mọi session vào một
+queue; một worker thread gom requests thành batch (tối đa max_batch_size,
+chờ tối đa max_wait giây kể từ request đầu tiên), gọi batch_fn một lần cho
+cả batch rồi trả kết quả về Future của từng request.
+
+- submit(): non-blocking, trả về concurrent.futures.Future
+  (await bằng asyncio.wrap_future, hoặc future.result() trong thread)
+- Lỗi của batch_fn được set vào Future của mọi request trong batch
+"""
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+# Các batchers đang chạy (metrics / shutdown)
+_batchers: Dict[str, 'MicroBatcher'] = {}
+_batchers_lock = threading.Lock()
+
+
+class MicroBatcher:
+    """
+    Dynamic batching broker cho một model
+    """
+
+    def __init__(
+        self,
+        name: str,
+        batch_fn: Callable[[List[Any]], Sequence[Any]],
+        max_batch_size: int = 16,
+        max_wait: float = 0.005
+    ):
+        """
+        INPUT:
+            name: Tên batcher (log / metrics, duy nhất)
+            batch_fn: Hàm xử lý list items -> list results cùng thứ tự, cùng độ dài
+            max_batch_size: Số requests tối đa mỗi batch
+            max_wait: Thời gian chờ tối đa (giây) để gom batch sau request đầu tiên
+        """
+        self.name = name
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait
+
+        self._queue: 'queue.Queue' = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._closed = False
+
+        self._batches = 0
+        self._items = 0
+        self._failed_batches = 0
+        self._max_batch = 0
+        self._total_run = 0.0
+
+        with _batchers_lock:
+            _batchers[name] = self
+
+    def submit(self, item: Any) -> Future:
+        """
+        Gửi một request vào batch tiếp theo
+
+        INPUT:
+            item: Input của một request (vd: feature window)
+        OUTPUT:
+            Future - result là phần tử tương ứng trong kết quả batch_fn
+        RAISES:
+            RuntimeError nếu batcher đã shutdown
+        """
+        future: Future = Future()
+        # Closed check + put under the lock: nothing can be queued after shutdown's _STOP
+        with self._lock:
+            if self._closed:
+                raise RuntimeError(f"Batcher '{self.name}' is shut down")
+            self._ensure_worker()
+            self._queue.put((item, future))
+        return future
+
+    def _ensure_worker(self):
+        """Khởi động worker thread khi có request đầu tiên (lazy, gọi khi giữ self._lock)"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=f"batcher-{self.name}", daemon=True)
+            self._thread.start()
+            logger.info(
+                f"Micro-batcher '{self.name}' started "
+                f"(max batch: {self.max_batch_size}, max wait: {self.max_wait * 1000:.1f}ms)"
+            )
+
+    def _run(self):
+        """Worker loop: chờ request đầu tiên, gom thêm tới khi đầy hoặc hết max_wait"""
+        while True:
+            first = self._queue.get()
+            if first is _STOP:
+                return
+
+            batch = [first]
+            deadline = time.perf_counter() + self.max_wait
+            stop = False
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                try:
+                    entry = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if entry is _STOP:
+                    stop = True
+                    break
+                batch.append(entry)
+
+            self._process(batch)
+            if stop:
+                return
+
+    def _process(self, batch: List[tuple]):
+        """Chạy batch_fn một lần và trả kết quả về từng Future"""
+        # Requests cancelled while queued are dropped from the batch
+        batch = [(item, future) for item, future in batch if future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+
+        started_at = time.perf_counter()
+        try:
+            results = self.batch_fn([item for item, _ in batch])
+            if len(results) != len(batch):
+                raise ValueError(f"batch_fn returned {len(results)} results for {len(batch)} items")
+        except Exception as e:
+            logger.error(f"Micro-batcher '{self.name}' batch failed: {str(e)}")
+            self._failed_batches += 1
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        finally:
+            self._batches += 1
+            self._items += len(batch)
+            self._max_batch = max(self._max_batch, len(batch))
+            self._total_run += time.perf_counter() - started_at
+
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+
+    def shutdown(self):
+        """
+        Dừng worker sau khi xử lý hết các requests đang chờ
+
+        Requests còn lại trong queue sau khi worker dừng (không còn ai xử lý)
+        nhận RuntimeError thay vì chờ mãi.
+        """
+        with self._lock:
+            self._closed = True
+            thread, self._thread = self._thread, None
+            if thread is not None:
+                self._queue.put(_STOP)
+
+        if thread is not None:
+            thread.join(timeout=5)
+        if thread is not None and thread.is_alive():
+            # Still inside batch_fn - it will finish the queued requests before _STOP
+            logger.warning(f"Micro-batcher '{self.name}' worker did not stop within 5s")
+        else:
+            self._fail_pending()
+
+        with _batchers_lock:
+            if _batchers.get(self.name) is self:
+                del _batchers[self.name]
+
+    def _fail_pending(self):
+        """Set RuntimeError cho các requests còn trong queue (worker đã dừng)"""
+        error = RuntimeError(f"Batcher '{self.name}' is shut down")
+        while True:
+            try:
+                entry = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if entry is not _STOP and entry[1].set_running_or_notify_cancel():
+                entry[1].set_exception(error)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        OUTPUT:
+            {'batches', 'items', 'avg_batch_size', 'max_batch_size_seen',
+             'failed_batches', 'avg_batch_ms', 'pending'}
+        """
+        batches = self._batches
+        return {
+            'batches': batches,
+            'items': self._items,
+            'avg_batch_size': round(self._items / batches, 2) if batches else 0.0,
+            'max_batch_size_seen': self._max_batch,
+            'failed_batches': self._failed_batches,
+            'avg_batch_ms': round(self._total_run / batches * 1000, 2) if batches else 0.0,
+            'pending': self._queue.qsize()
+        }
+
+
+def get_batcher_metrics() -> Dict[str, Dict[str, Any]]:
+    """Metrics của tất cả batchers đang chạy"""
+    with _batchers_lock:
+        batchers = list(_batchers.values())
+    return {batcher.name: batcher.get_metrics() for batcher in batchers}
+
+
+def shutdown_batchers():
+    """Dừng tất cả batchers (application shutdown)"""
+    with _batchers_lock:
+        batchers = list(_batchers.values())
+    for batcher in batchers:
+        batcher.shutdown()
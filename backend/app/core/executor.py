@@ -0,0 +1,166 @@
+"""
+Inference Executor - Chạy các tác vụ CPU-bound ngoài asyncio event loop
+
+Tất cả các lời gọi blocking (MediaPipe, cv2 decode, STT, TTS, augmentation)
+từ async endpoints phải đi qua executor này để event loop luôn rảnh
+phục vụ WebSocket clients và health checks.
+"""
+import asyncio
+import functools
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+# Số lượng wait-time samples gần nhất dùng để tính percentile
+_WAIT_SAMPLE_WINDOW = 1024
+
+
+class InferenceExecutor:
+    """
+    Thread pool có giới hạn (settings.MAX_WORKERS) cho các tác vụ blocking
+
+    Theo dõi metrics: queue depth, số task đang chạy, wait time, run time.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        """
+        INPUT:
+            max_workers: Số worker threads (default: settings.MAX_WORKERS)
+        """
+        self.max_workers = max_workers or settings.MAX_WORKERS
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._failed = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._total_run = 0.0
+        self._recent_waits = deque(maxlen=_WAIT_SAMPLE_WINDOW)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Tạo thread pool khi cần (lazy)"""
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix="inference"
+                    )
+                    logger.info(f"Inference executor started with {self.max_workers} workers")
+        return self._executor
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        Chạy func(*args, **kwargs) trên worker thread và await kết quả
+
+        INPUT:
+            func: Hàm blocking cần chạy
+            *args, **kwargs: Tham số cho func
+        OUTPUT:
+            Kết quả trả về của func
+        RAISES:
+            Exception do func raise
+        USAGE:
+            result = await inference_executor.run(service.recognize_from_video, file_path)
+        """
+        submitted_at = time.perf_counter()
+        with self._lock:
+            self._queued += 1
+
+        call = functools.partial(self._execute, func, submitted_at, args, kwargs)
+        future = self._get_executor().submit(call)
+        future.add_done_callback(self._on_done)
+        return await asyncio.wrap_future(future)
+
+    def _execute(self, func: Callable, submitted_at: float, args: tuple, kwargs: dict) -> Any:
+        """Chạy trên worker thread - ghi nhận wait time và run time"""
+        started_at = time.perf_counter()
+        wait_time = started_at - submitted_at
+
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+            self._total_wait += wait_time
+            self._max_wait = max(self._max_wait, wait_time)
+            self._recent_waits.append(wait_time)
+
+        try:
+            result = func(*args, **kwargs)
+        except Exception:
+            with self._lock:
+                self._failed += 1
+            raise
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._completed += 1
+                self._total_run += time.perf_counter() - started_at
+
+        return result
+
+    def _on_done(self, future):
+        """Task bị cancel trước khi chạy vẫn phải được trừ khỏi queue"""
+        if future.cancelled():
+            with self._lock:
+                self._queued -= 1
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Lấy metrics hiện tại của executor
+
+        OUTPUT:
+            {
+                'max_workers': int,
+                'queue_depth': int - Số task đang chờ worker,
+                'running': int - Số task đang chạy,
+                'completed': int,
+                'failed': int,
+                'avg_wait_ms': float,
+                'p95_wait_ms': float - Trên các task gần nhất,
+                'max_wait_ms': float,
+                'avg_run_ms': float
+            }
+        """
+        with self._lock:
+            completed = self._completed
+            started = completed + self._running
+            recent = sorted(self._recent_waits)
+
+            return {
+                'max_workers': self.max_workers,
+                'queue_depth': self._queued,
+                'running': self._running,
+                'completed': completed,
+                'failed': self._failed,
+                'avg_wait_ms': round(self._total_wait / started * 1000, 3) if started else 0.0,
+                'p95_wait_ms': round(recent[min(len(recent) - 1, int(len(recent) * 0.95))] * 1000, 3) if recent else 0.0,
+                'max_wait_ms': round(self._max_wait * 1000, 3),
+                'avg_run_ms': round(self._total_run / completed * 1000, 3) if completed else 0.0
+            }
+
+    def shutdown(self, wait: bool = True):
+        """
+        Dừng thread pool
+
+        INPUT:
+            wait: Chờ các task đang chạy hoàn thành
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+            logger.info("Inference executor stopped")
+
+
+# Global instance
+inference_executor = InferenceExecutor()
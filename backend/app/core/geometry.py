@@ -0,0 +1,171 @@
+"""
+Geometry - Các phép tính hình học vectorized trên landmarks
+
+Tất cả các hàm nhận array (..., N, 3) - một frame (N, 3), một sequence
+(T, N, 3) hoặc batch (B, T, N, 3) - và tính toàn bộ trong một lần gọi NumPy,
+không lặp Python theo từng điểm.
+
+Landmarks dạng list of dicts chuyển sang array bằng as_points();
+LandmarkFrame.segment() đã trả về array (n, 4).
+"""
+from typing import Iterable, Sequence, Tuple, Union
+
+import numpy as np
+
+# MediaPipe Hands landmark indices
+HAND_WRIST = 0
+HAND_MIDDLE_MCP = 9
+HAND_FINGERTIPS = (4, 8, 12, 16, 20)
+
+# Các khớp ngón tay (điểm trước, khớp, điểm sau) - góc tại khớp giữa
+HAND_JOINT_TRIPLES = (
+    (1, 2, 3), (2, 3, 4),                      # Thumb
+    (0, 5, 6), (5, 6, 7), (6, 7, 8),           # Index
+    (0, 9, 10), (9, 10, 11), (10, 11, 12),     # Middle
+    (0, 13, 14), (13, 14, 15), (14, 15, 16),   # Ring
+    (0, 17, 18), (17, 18, 19), (18, 19, 20)    # Pinky
+)
+
+# MediaPipe Pose landmark indices
+POSE_LEFT_SHOULDER = 11
+POSE_RIGHT_SHOULDER = 12
+
+# Khuỷu tay / vai (điểm trước, khớp, điểm sau)
+POSE_ARM_TRIPLES = (
+    (12, 11, 13), (11, 13, 15),  # Left shoulder, left elbow
+    (11, 12, 14), (12, 14, 16)   # Right shoulder, right elbow
+)
+
+# Tránh chia cho 0 khi scale suy biến (landmarks trùng nhau / thiếu)
+_EPS = 1e-8
+
+Reference = Union[int, Sequence[int]]
+
+
+def as_points(landmarks) -> np.ndarray:
+    """
+    Chuyển landmarks sang array (N, 3) float32
+
+    INPUT:
+        landmarks: list of {'x','y','z'} | array (..., N, 3 hoặc 4)
+            (cột thứ 4 - visibility - bị bỏ)
+    OUTPUT:
+        numpy array (..., N, 3)
+    """
+    if isinstance(landmarks, np.ndarray):
+        return landmarks[..., :3]
+    return np.array([(lm['x'], lm['y'], lm.get('z', 0.0)) for lm in landmarks], np.float32)
+
+
+def pairwise_distances(points: np.ndarray) -> np.ndarray:
+    """
+    Ma trận khoảng cách Euclidean giữa tất cả các cặp điểm
+
+    INPUT:
+        points: (..., N, 3)
+    OUTPUT:
+        (..., N, N) - distances[..., i, j] = |p_i - p_j|
+    """
+    diff = points[..., :, None, :] - points[..., None, :, :]
+    return np.sqrt(np.einsum('...ijk,...ijk->...ij', diff, diff))
+
+
+def point_distances(points: np.ndarray, pairs: Iterable[Tuple[int, int]]) -> np.ndarray:
+    """
+    Khoảng cách giữa các cặp điểm chỉ định (rẻ hơn pairwise_distances khi ít cặp)
+
+    INPUT:
+        points: (..., N, 3)
+        pairs: list of (i, j)
+    OUTPUT:
+        (..., P) - theo thứ tự pairs
+    """
+    first, second = np.asarray(list(pairs)).T
+    return np.linalg.norm(points[..., first, :] - points[..., second, :], axis=-1)
+
+
+def reference_point(points: np.ndarray, reference: Reference) -> np.ndarray:
+    """
+    Điểm tham chiếu: một landmark hoặc trung điểm của nhiều landmarks
+
+    INPUT:
+        points: (..., N, 3)
+        reference: index hoặc list indices (vd: hai vai)
+    OUTPUT:
+        (..., 1, 3)
+    """
+    if isinstance(reference, int):
+        return points[..., reference:reference + 1, :]
+    return points[..., list(reference), :].mean(axis=-2, keepdims=True)
+
+
+def normalize_to_reference(points: np.ndarray, reference: Reference = 0) -> np.ndarray:
+    """
+    Dời gốc toạ độ về điểm tham chiếu (vd: cổ tay, trung điểm hai vai)
+
+    INPUT:
+        points: (..., N, 3)
+        reference: index hoặc list indices (default: điểm đầu tiên)
+    OUTPUT:
+        (..., N, 3)
+    """
+    return points - reference_point(points, reference)
+
+
+def normalize_scale(points: np.ndarray, scale_pair: Tuple[int, int]) -> np.ndarray:
+    """
+    Chia toạ độ cho khoảng cách giữa hai landmarks (bất biến theo kích thước / khoảng cách camera)
+
+    INPUT:
+        points: (..., N, 3) - thường đã normalize_to_reference
+        scale_pair: (i, j) - vd: (cổ tay, MCP ngón giữa), (vai trái, vai phải)
+    OUTPUT:
+        (..., N, 3) - frames có scale = 0 (thiếu landmarks) giữ nguyên
+    """
+    scale = point_distances(points, [scale_pair])[..., None]
+    return np.where(scale > _EPS, points / np.maximum(scale, _EPS), points)
+
+
+def normalize_hand(points: np.ndarray) -> np.ndarray:
+    """
+    Normalize hand landmarks: gốc tại cổ tay, đơn vị = cổ tay -> MCP ngón giữa
+
+    INPUT:
+        points: (..., 21, 3)
+    OUTPUT:
+        (..., 21, 3)
+    """
+    return normalize_scale(normalize_to_reference(points, HAND_WRIST), (HAND_WRIST, HAND_MIDDLE_MCP))
+
+
+def normalize_pose(points: np.ndarray) -> np.ndarray:
+    """
+    Normalize pose landmarks: gốc tại trung điểm hai vai, đơn vị = độ rộng vai
+
+    INPUT:
+        points: (..., 33, 3)
+    OUTPUT:
+        (..., 33, 3)
+    """
+    centered = normalize_to_reference(points, (POSE_LEFT_SHOULDER, POSE_RIGHT_SHOULDER))
+    return normalize_scale(centered, (POSE_LEFT_SHOULDER, POSE_RIGHT_SHOULDER))
+
+
+def joint_angles(points: np.ndarray, triples: Iterable[Tuple[int, int, int]]) -> np.ndarray:
+    """
+    Góc tại khớp giữa của mỗi bộ ba (a, b, c): góc giữa b->a và b->c
+
+    INPUT:
+        points: (..., N, 3)
+        triples: list of (a, b, c) - vd: HAND_JOINT_TRIPLES, POSE_ARM_TRIPLES
+    OUTPUT:
+        (..., K) - radians trong [0, pi], 0 khi vector suy biến
+    """
+    a, b, c = np.asarray(list(triples)).T
+    v1 = points[..., a, :] - points[..., b, :]
+    v2 = points[..., c, :] - points[..., b, :]
+
+    dot = np.einsum('...k,...k->...', v1, v2)
+    norms = np.linalg.norm(v1, axis=-1) * np.linalg.norm(v2, axis=-1)
+    cosine = np.where(norms > _EPS, dot / np.maximum(norms, _EPS), 1.0)
+    return np.arccos(np.clip(cosine, -1.0, 1.0))
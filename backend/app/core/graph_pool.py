@@ -0,0 +1,272 @@
+"""
+Graph Pool - Pool có giới hạn cho các MediaPipe graph instances
+
+MediaPipe graphs (Hands, Pose, ...) với static_image_mode=False giữ tracking
+state và không thread-safe. Mỗi realtime session / worker thread checkout
+một graph riêng, dùng xong checkin lại để tái sử dụng.
+"""
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class GraphPool:
+    """
+    Pool checkout/checkin cho graph instances
+
+    - Tối đa max_size instances (cả idle lẫn đang dùng)
+    - Instances idle quá idle_timeout giây bị close (giữ lại ít nhất min_size)
+    - Checkout chờ khi pool đầy, TimeoutError nếu quá timeout
+    """
+
+    def __init__(
+        self,
+        name: str,
+        factory: Callable[[], Any],
+        max_size: int,
+        idle_timeout: float,
+        min_size: int = 0
+    ):
+        """
+        INPUT:
+            name: Tên pool (dùng cho log/metrics)
+            factory: Hàm tạo graph instance mới
+            max_size: Số instances tối đa
+            idle_timeout: Thời gian idle (giây) trước khi bị evict
+            min_size: Số instances không bị evict (được tạo sẵn bởi prewarm())
+        """
+        self.name = name
+        self._factory = factory
+        self.max_size = max(1, max_size)
+        self.min_size = min(max(0, min_size), self.max_size)
+        self.idle_timeout = idle_timeout
+
+        self._idle = deque()  # (graph, last_used) - most recently used ở cuối
+        self._size = 0
+        self._cond = threading.Condition()
+
+        self._created = 0
+        self._evicted = 0
+        self._checkouts = 0
+        self._waits = 0
+        self._timeouts = 0
+        self._total_wait = 0.0
+
+    def checkout(self, timeout: Optional[float] = None) -> Any:
+        """
+        Lấy một graph instance (tái sử dụng instance idle hoặc tạo mới)
+
+        INPUT:
+            timeout: Thời gian chờ tối đa khi pool đầy (None = chờ mãi)
+        OUTPUT:
+            Graph instance - phải checkin() sau khi dùng xong
+        RAISES:
+            TimeoutError nếu pool đầy quá timeout
+        """
+        self._evict_idle()
+        started_at = time.monotonic()
+        deadline = None if timeout is None else started_at + timeout
+        waited = False
+
+        with self._cond:
+            while True:
+                if self._idle:
+                    graph, _ = self._idle.pop()
+                    self._record_checkout(started_at, waited)
+                    return graph
+
+                if self._size < self.max_size:
+                    self._size += 1
+                    self._record_checkout(started_at, waited)
+                    break
+
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    self._timeouts += 1
+                    raise TimeoutError(f"No {self.name} graph available (pool size: {self.max_size})")
+
+                waited = True
+                self._cond.wait(remaining)
+
+        # Create outside the lock - graph construction takes hundreds of ms
+        try:
+            logger.info(f"Creating {self.name} graph ({self._size}/{self.max_size})")
+            graph = self._factory()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+
+        with self._cond:
+            self._created += 1
+        return graph
+
+    def checkin(self, graph: Any, reset: bool = True):
+        """
+        Trả graph về pool
+
+        INPUT:
+            graph: Instance đã checkout
+            reset: Xoá tracking state để session sau không dùng lại
+        """
+        if reset and hasattr(graph, 'reset'):
+            try:
+                graph.reset()
+            except Exception as e:
+                logger.warning(f"Failed to reset {self.name} graph, discarding: {str(e)}")
+                self.discard(graph)
+                return
+
+        with self._cond:
+            self._idle.append((graph, time.monotonic()))
+            self._cond.notify()
+
+    def discard(self, graph: Any):
+        """
+        Close graph lỗi và giải phóng slot của nó trong pool
+
+        INPUT:
+            graph: Instance đã checkout
+        """
+        self._close(graph)
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+
+    @contextmanager
+    def lease(self, timeout: Optional[float] = None):
+        """
+        Context manager checkout/checkin
+
+        USAGE:
+            with pool.lease() as hands:
+                results = hands.process(image_rgb)
+        """
+        graph = self.checkout(timeout)
+        try:
+            yield graph
+        finally:
+            self.checkin(graph)
+
+    def prewarm(self, count: Optional[int] = None, warmup: Optional[Callable[[Any], None]] = None) -> int:
+        """
+        Tạo sẵn graphs để request đầu tiên không phải chờ graph construction
+
+        INPUT:
+            count: Số graphs cần có sẵn (default: min_size, tối đa max_size)
+            warmup: Hàm chạy trên mỗi graph (vd: process một frame giả)
+        OUTPUT:
+            Số graphs đã warm-up
+        RAISES:
+            Exception của factory / warmup
+        """
+        count = min(self.min_size if count is None else count, self.max_size)
+        graphs = []
+        try:
+            for _ in range(count):
+                try:
+                    graph = self.checkout(timeout=0)
+                except TimeoutError:
+                    break
+                graphs.append(graph)
+                if warmup is not None:
+                    warmup(graph)
+        finally:
+            for graph in graphs:
+                self.checkin(graph)
+        return len(graphs)
+
+    def _evict_idle(self):
+        """Close các instances idle quá idle_timeout"""
+        if not self.idle_timeout:
+            return
+
+        expired = []
+        now = time.monotonic()
+        with self._cond:
+            # Least recently used ở đầu deque
+            while (
+                self._idle
+                and self._size - len(expired) > self.min_size
+                and now - self._idle[0][1] > self.idle_timeout
+            ):
+                expired.append(self._idle.popleft()[0])
+            self._size -= len(expired)
+            self._evicted += len(expired)
+            if expired:
+                self._cond.notify(len(expired))
+
+        for graph in expired:
+            self._close(graph)
+        if expired:
+            logger.info(f"Evicted {len(expired)} idle {self.name} graph(s)")
+
+    def _record_checkout(self, started_at: float, waited: bool):
+        """Cập nhật metrics (gọi khi đang giữ lock)"""
+        self._checkouts += 1
+        if waited:
+            self._waits += 1
+            self._total_wait += time.monotonic() - started_at
+
+    def _close(self, graph: Any):
+        """Close graph, bỏ qua lỗi"""
+        try:
+            if hasattr(graph, 'close'):
+                graph.close()
+        except Exception as e:
+            logger.warning(f"Error closing {self.name} graph: {str(e)}")
+
+    def close_all(self):
+        """
+        Close tất cả instances idle
+
+        NOTE: Gọi khi shutdown, sau khi đã dừng các workers đang dùng graph
+        """
+        with self._cond:
+            graphs = [graph for graph, _ in self._idle]
+            self._idle.clear()
+            self._size -= len(graphs)
+            self._cond.notify_all()
+
+        for graph in graphs:
+            self._close(graph)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Lấy metrics của pool
+
+        OUTPUT:
+            {
+                'max_size': int,
+                'min_size': int,
+                'size': int - Tổng số instances hiện có,
+                'idle': int,
+                'in_use': int,
+                'created': int,
+                'evicted': int,
+                'checkouts': int,
+                'waits': int - Số lần checkout phải chờ,
+                'timeouts': int,
+                'avg_wait_ms': float - Trung bình trên các lần phải chờ
+            }
+        """
+        with self._cond:
+            return {
+                'max_size': self.max_size,
+                'min_size': self.min_size,
+                'size': self._size,
+                'idle': len(self._idle),
+                'in_use': self._size - len(self._idle),
+                'created': self._created,
+                'evicted': self._evicted,
+                'checkouts': self._checkouts,
+                'waits': self._waits,
+                'timeouts': self._timeouts,
+                'avg_wait_ms': round(self._total_wait / self._waits * 1000, 3) if self._waits else 0.0
+            }
@@ -0,0 +1,298 @@
+"""
+Keypoint Cache - Cache trên disk cho keypoints trích xuất từ video
+
+Key = content hash của video + tham số trích xuất + fingerprint cấu hình
+MediaPipe. Mỗi entry là một file .npz chứa các NumPy arrays (vd:
+HandKeypointTrack) và metadata JSON. Tổng dung lượng bị giới hạn, entries
+ít dùng nhất (mtime cũ nhất) bị xoá trước.
+
+Khi cấu hình MediaPipe (confidence thresholds, version) thay đổi, fingerprint
+thay đổi => key mới, entries cũ không bao giờ được hit và bị purge_stale() xoá.
+"""
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+_META_KEY = '__meta__'
+_CACHE_SUFFIX = '.npz'
+
+
+def mediapipe_config_fingerprint() -> str:
+    """
+    Fingerprint của cấu hình ảnh hưởng tới kết quả trích xuất landmarks
+
+    OUTPUT:
+        str - Hex digest (16 ký tự)
+    """
+    try:
+        from importlib.metadata import version
+        mediapipe_version = version('mediapipe')
+    except Exception:
+        mediapipe_version = 'unknown'
+
+    config = {
+        'mediapipe': mediapipe_version,
+        'min_detection_confidence': settings.MEDIAPIPE_MIN_DETECTION_CONFIDENCE,
+        'min_tracking_confidence': settings.MEDIAPIPE_MIN_TRACKING_CONFIDENCE
+    }
+    return hashlib.sha256(json.dumps(config, sort_keys=True).encode()).hexdigest()[:16]
+
+
+class KeypointCache:
+    """
+    Content-addressed cache của keypoint arrays, LRU theo tổng dung lượng
+
+    Thread-safe; các processes dùng chung thư mục cache cũng an toàn vì
+    entries được ghi atomic (temp file + rename).
+    """
+
+    def __init__(self, cache_dir: Path, max_bytes: int, enabled: bool = True):
+        """
+        INPUT:
+            cache_dir: Thư mục chứa các file .npz
+            max_bytes: Tổng dung lượng tối đa
+            enabled: False = get() luôn miss, put() không ghi
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._fingerprint: Optional[str] = None
+        self._total_bytes: Optional[int] = None  # Scan thư mục lần đầu khi cần
+
+        self._hits = 0
+        self._misses = 0
+        self._writes = 0
+        self._evictions = 0
+
+    @property
+    def fingerprint(self) -> str:
+        """Fingerprint cấu hình MediaPipe hiện tại"""
+        if self._fingerprint is None:
+            self._fingerprint = mediapipe_config_fingerprint()
+        return self._fingerprint
+
+    def make_key(self, content_hash: str, **params) -> str:
+        """
+        Tạo cache key
+
+        INPUT:
+            content_hash: SHA-256 của nội dung video (xem core/utils.py::save_upload_stream)
+            **params: Tham số trích xuất (vd: kind='hands', sample_rate=5, max_frames=0)
+        OUTPUT:
+            str - Key (tên file, không có suffix)
+        """
+        material = json.dumps(
+            {'content': content_hash, 'config': self.fingerprint, 'params': params},
+            sort_keys=True
+        )
+        return hashlib.sha256(material.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[Tuple[Dict[str, np.ndarray], Dict[str, Any]]]:
+        """
+        Đọc entry
+
+        INPUT:
+            key: Cache key (xem make_key())
+        OUTPUT:
+            (arrays, meta) hoặc None nếu miss
+        """
+        if not self.enabled:
+            return None
+
+        path = self._path(key)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                arrays = {name: data[name] for name in data.files if name != _META_KEY}
+                meta = json.loads(str(data[_META_KEY]))
+            # Touch mtime - LRU order
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self._misses += 1
+            return None
+        except Exception as e:
+            logger.warning(f"Discarding unreadable keypoint cache entry {key}: {str(e)}")
+            self._remove(path)
+            with self._lock:
+                self._misses += 1
+            return None
+
+        with self._lock:
+            self._hits += 1
+        return arrays, meta
+
+    def put(self, key: str, arrays: Dict[str, np.ndarray], meta: Optional[Dict[str, Any]] = None):
+        """
+        Ghi entry (ghi đè nếu đã có), sau đó evict nếu vượt max_bytes
+
+        INPUT:
+            key: Cache key
+            arrays: Dict tên -> NumPy array
+            meta: Dict JSON-serializable (optional)
+        """
+        if not self.enabled:
+            return
+
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            with self._lock:
+                self._ensure_total_bytes()
+
+            meta = dict(meta or {}, fingerprint=self.fingerprint)
+            path = self._path(key)
+
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    np.savez_compressed(f, **arrays, **{_META_KEY: np.array(json.dumps(meta))})
+                old_size = path.stat().st_size if path.exists() else 0
+                os.replace(tmp_path, path)
+            except Exception:
+                Path(tmp_path).unlink(missing_ok=True)
+                raise
+
+            size = path.stat().st_size
+            with self._lock:
+                self._total_bytes += size - old_size
+                self._writes += 1
+        except Exception as e:
+            logger.warning(f"Failed to write keypoint cache entry {key}: {str(e)}")
+            return
+
+        self._evict()
+
+    def purge_stale(self) -> int:
+        """
+        Xoá các entries được tạo với cấu hình MediaPipe khác hiện tại
+
+        OUTPUT:
+            int - Số entries đã xoá
+        """
+        removed = 0
+        for path in self._entries():
+            try:
+                with np.load(path, allow_pickle=False) as data:
+                    fingerprint = json.loads(str(data[_META_KEY])).get('fingerprint')
+            except Exception:
+                fingerprint = None
+            if fingerprint != self.fingerprint:
+                self._remove(path)
+                removed += 1
+
+        if removed:
+            logger.info(f"Purged {removed} stale keypoint cache entries")
+        return removed
+
+    def clear(self):
+        """Xoá toàn bộ entries"""
+        for path in self._entries():
+            self._remove(path)
+
+    def _evict(self):
+        """Xoá entries cũ nhất (mtime) cho tới khi tổng dung lượng <= max_bytes"""
+        with self._lock:
+            if self._ensure_total_bytes() <= self.max_bytes:
+                return
+
+        entries = []
+        for path in self._entries():
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+
+        total = sum(size for _, size, _ in entries)
+        evicted = 0
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            self._remove(path, count=False)
+            total -= size
+            evicted += 1
+
+        with self._lock:
+            self._total_bytes = total
+            self._evictions += evicted
+        if evicted:
+            logger.info(f"Evicted {evicted} keypoint cache entries")
+
+    def _ensure_total_bytes(self) -> int:
+        """Tổng dung lượng (scan thư mục lần đầu, gọi khi đang giữ lock)"""
+        if self._total_bytes is None:
+            self._total_bytes = sum(path.stat().st_size for path in self._entries())
+        return self._total_bytes
+
+    def _entries(self):
+        """Danh sách các file entry hiện có"""
+        if not self.cache_dir.exists():
+            return []
+        return list(self.cache_dir.glob(f"*{_CACHE_SUFFIX}"))
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}{_CACHE_SUFFIX}"
+
+    def _remove(self, path: Path, count: bool = True):
+        """Xoá một entry, cập nhật tổng dung lượng"""
+        try:
+            size = path.stat().st_size
+            path.unlink()
+        except FileNotFoundError:
+            return
+        if count:
+            with self._lock:
+                if self._total_bytes is not None:
+                    self._total_bytes -= size
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Lấy metrics của cache
+
+        OUTPUT:
+            {
+                'enabled': bool,
+                'entries': int,
+                'total_bytes': int,
+                'max_bytes': int,
+                'hits': int,
+                'misses': int,
+                'hit_rate': float,
+                'writes': int,
+                'evictions': int
+            }
+        """
+        entries = len(self._entries())
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'enabled': self.enabled,
+                'entries': entries,
+                'total_bytes': self._ensure_total_bytes(),
+                'max_bytes': self.max_bytes,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': round(self._hits / lookups, 3) if lookups else 0.0,
+                'writes': self._writes,
+                'evictions': self._evictions
+            }
+
+
+# Global instance
+keypoint_cache = KeypointCache(
+    settings.KEYPOINT_CACHE_DIR,
+    settings.KEYPOINT_CACHE_MAX_BYTES,
+    enabled=settings.KEYPOINT_CACHE_ENABLED
+)
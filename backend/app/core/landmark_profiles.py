@@ -0,0 +1,168 @@
+"""
+Landmark Profiles - Chỉ chạy các MediaPipe graphs mà model downstream cần
+
+Holistic luôn chạy face mesh (468 điểm), pose và cả hai tay cho mỗi frame,
+kể cả khi classifier chỉ dùng hands. Một landmark profile chọn các graphs:
+
+- 'hands': Hands graph (pooled, tracking riêng cho mỗi video)
+- 'hands_pose': Hands + Pose, chỉ giữ upper-body pose (landmarks 0-24: mặt,
+  vai, tay, hông - bỏ chân)
+- 'holistic': Hands + Pose + Face Mesh; face chạy mỗi face_interval frames
+  (settings.LANDMARK_FACE_INTERVAL), giữ kết quả gần nhất giữa các lần chạy
+
+Graphs chỉ được tạo khi profile dùng tới. Output luôn là LandmarkFrame kind
+'holistic' (segments 'face', 'pose', 'left_hand', 'right_hand'), nên code đọc
+'*_landmarks' keys không phụ thuộc profile.
+
+USAGE:
+    with LandmarkPipeline('hands') as pipeline:
+        for frame in frames:
+            landmarks = pipeline.process(frame.image)
+"""
+import logging
+from contextlib import ExitStack
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from ..config import settings
+from .landmarks import LandmarkFrame
+
+logger = logging.getLogger(__name__)
+
+LANDMARK_PROFILES = ('hands', 'hands_pose', 'holistic')
+
+_PROFILE_GRAPHS = {
+    'hands': ('hands',),
+    'hands_pose': ('hands', 'pose'),
+    'holistic': ('hands', 'pose', 'face')
+}
+
+# MediaPipe Pose: 0-10 face, 11-22 shoulders/arms/hands, 23-24 hips, 25-32 legs
+UPPER_BODY_POSE_LANDMARKS = 25
+
+# MediaPipe Hands labels handedness assuming a mirrored (selfie) image; on an
+# unmirrored frame 'Left' is the signer's right hand (Holistic's right_hand)
+_HAND_SEGMENTS = {'Left': 'right_hand', 'Right': 'left_hand'}
+
+
+def resolve_profile(profile: Optional[str] = None) -> str:
+    """
+    Kiểm tra tên profile
+
+    INPUT:
+        profile: 'hands' | 'hands_pose' | 'holistic' | None (settings.LANDMARK_PROFILE)
+    OUTPUT:
+        Tên profile
+    RAISES:
+        ValueError nếu profile không hỗ trợ
+    """
+    profile = profile or settings.LANDMARK_PROFILE
+    if profile not in _PROFILE_GRAPHS:
+        raise ValueError(f"Unknown landmark profile: {profile}. Supported: {', '.join(LANDMARK_PROFILES)}")
+    return profile
+
+
+class LandmarkPipeline:
+    """
+    Trích xuất landmarks theo profile cho một chuỗi frames (một video)
+
+    Context manager: mượn một Hands graph từ pool cho cả chuỗi frames (tracking
+    giữa các frames). Pose / Face Mesh dùng shared graphs của model_manager.
+    """
+
+    def __init__(
+        self,
+        profile: Optional[str] = None,
+        face_interval: Optional[int] = None,
+        manager=None
+    ):
+        """
+        INPUT:
+            profile: Landmark profile (default: settings.LANDMARK_PROFILE)
+            face_interval: Chạy face mesh mỗi N frames (profile 'holistic',
+                default: settings.LANDMARK_FACE_INTERVAL, 1 = mọi frame)
+            manager: ModelManager (default: model_manager)
+        RAISES:
+            ValueError nếu profile không hỗ trợ hoặc face_interval < 1
+        """
+        if manager is None:
+            from .model_manager import model_manager as manager
+
+        self.profile = resolve_profile(profile)
+        self.face_interval = settings.LANDMARK_FACE_INTERVAL if face_interval is None else face_interval
+        if self.face_interval < 1:
+            raise ValueError("face_interval must be >= 1")
+        self.graphs = _PROFILE_GRAPHS[self.profile]
+        self.manager = manager
+
+        self.frame_count = 0
+        self.graph_runs = {name: 0 for name in self.graphs}
+        self._face: Optional[np.ndarray] = None
+        self._hands = None
+        self._stack = ExitStack()
+
+    def __enter__(self) -> 'LandmarkPipeline':
+        self._hands = self._stack.enter_context(self.manager.hands_session())
+        return self
+
+    def __exit__(self, *exc_info):
+        self._hands = None
+        self._stack.close()
+
+    def process(self, image, is_rgb: bool = False) -> LandmarkFrame:
+        """
+        Trích xuất landmarks của một frame
+
+        INPUT:
+            image: numpy array (BGR format from cv2)
+            is_rgb: bool - True nếu image đã ở RGB
+        OUTPUT:
+            LandmarkFrame (kind 'holistic') - segments 'face', 'pose',
+            'left_hand', 'right_hand' (chỉ các phần profile có và detect được)
+        """
+        import cv2
+        image_rgb = image if is_rgb else cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+
+        hands_frame = self.manager.extract_hand_landmarks(image_rgb, is_rgb=True, hands=self._hands)
+        self.graph_runs['hands'] += 1
+        hands: Dict[str, np.ndarray] = {}
+        for hand_type, points in hands_frame.iter_hands():
+            segment = _HAND_SEGMENTS.get(hand_type)
+            if segment is None or segment in hands:
+                segment = next((s for s in ('left_hand', 'right_hand') if s not in hands), None)
+            if segment is not None:
+                hands[segment] = points
+
+        pose = None
+        if 'pose' in self.graphs:
+            pose = self.manager.extract_pose_landmarks(image_rgb, is_rgb=True).segment('pose')
+            self.graph_runs['pose'] += 1
+            if pose is not None and self.profile == 'hands_pose':
+                pose = pose[:UPPER_BODY_POSE_LANDMARKS]
+
+        if 'face' in self.graphs and self.frame_count % self.face_interval == 0:
+            self._face = self.manager.extract_face_landmarks(image_rgb, is_rgb=True).segment('face')
+            self.graph_runs['face'] += 1
+
+        self.frame_count += 1
+        return LandmarkFrame.from_segments(
+            [
+                ('face', self._face),
+                ('pose', pose),
+                ('left_hand', hands.get('left_hand')),
+                ('right_hand', hands.get('right_hand'))
+            ],
+            kind='holistic'
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        OUTPUT:
+            {'profile', 'frames', 'graph_runs': {graph: count}}
+        """
+        return {
+            'profile': self.profile,
+            'frames': self.frame_count,
+            'graph_runs': dict(self.graph_runs)
+        }
@@ -0,0 +1,345 @@
+"""
+Landmark Store - File binary cho landmark sequences (đọc bằng np.memmap)
+
+FILE LAYOUT (little-endian, version 1):
+    [0:32)      Header (_HEADER)
+                    magic       4s   b"VSLS"
+                    version     u16
+                    dtype       u8   0 = float32, 1 = float16
+                    reserved    u8
+                    frames      u32  T
+                    joints      u32  J
+                    segments    u32  S
+                    meta_size   u32  độ dài JSON metadata (bytes)
+                    data_offset u64
+    [32:...)    JSON metadata (utf-8): segments [[name, start, stop], ...] + meta
+    data_offset Points block (T, J, 4) x, y, z, visibility - căn 64 bytes
+    ...         Mask block uint8 (T, S) - segment có mặt trong frame hay không
+
+Points và mask được map trực tiếp bằng np.memmap (không parse, không copy),
+nên có thể mở hàng nghìn sequences cho training / benchmark / template matching.
+Joints của segment vắng mặt được ghi 0.
+
+Converters từ/tới format JSON hiện có: list of frame dicts
+({'pose_landmarks': [...], 'left_hand_landmarks': [...], ...}) và LandmarkFrame.
+"""
+import json
+import os
+import struct
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .landmarks import LANDMARK_FIELDS, LandmarkFrame
+
+MAGIC = b"VSLS"
+FORMAT_VERSION = 1
+
+_HEADER = struct.Struct("<4sHBBIIIIQ")
+_DATA_ALIGNMENT = 64
+_DTYPES = {0: np.dtype('<f4'), 1: np.dtype('<f2')}
+_DTYPE_CODES = {dtype: code for code, dtype in _DTYPES.items()}
+
+# Layouts (segment name, số joints) - thứ tự joints trong file
+HANDS_LAYOUT = (('left_hand', 21), ('right_hand', 21))
+HOLISTIC_LAYOUT = (('pose', 33), ('left_hand', 21), ('right_hand', 21))
+HOLISTIC_FACE_LAYOUT = HOLISTIC_LAYOUT + (('face', 468),)
+
+Layout = Sequence[Tuple[str, int]]
+
+_HAND_SEGMENT_NAMES = ('left_hand', 'right_hand')
+
+
+class LandmarkSequence:
+    """
+    Landmark sequence (T frames) với layout cố định
+
+    - points: (T, J, 4) float32/float16 - ndarray hoặc np.memmap
+    - mask: (T, S) bool - segment s có mặt trong frame t
+    - segments: dict tên -> (start, stop) joints, theo thứ tự layout
+    - meta: dict JSON-serializable (fps, frame_numbers, label, ...)
+    """
+
+    __slots__ = ('points', 'mask', 'segments', 'meta')
+
+    def __init__(
+        self,
+        points: np.ndarray,
+        mask: np.ndarray,
+        segments: Dict[str, Tuple[int, int]],
+        meta: Optional[Dict[str, Any]] = None
+    ):
+        self.points = points
+        self.mask = mask
+        self.segments = segments
+        self.meta = meta or {}
+
+    def __len__(self) -> int:
+        return self.points.shape[0]
+
+    def segment(self, name: str) -> np.ndarray:
+        """
+        Landmarks của một segment
+
+        OUTPUT:
+            View (T, n, 4) - frames vắng mặt là 0 (xem present())
+        """
+        start, stop = self.segments[name]
+        return self.points[:, start:stop]
+
+    def present(self, name: str) -> np.ndarray:
+        """Mask (T,) bool - segment có mặt trong frame"""
+        return self.mask[:, list(self.segments).index(name)]
+
+    def __repr__(self) -> str:
+        layout = ', '.join(f'{name}={stop - start}' for name, (start, stop) in self.segments.items())
+        return f"LandmarkSequence(frames={len(self)}, {layout}, dtype={self.points.dtype})"
+
+
+def _layout_segments(layout: Layout) -> Dict[str, Tuple[int, int]]:
+    """(name, joints) -> {name: (start, stop)}"""
+    segments = {}
+    start = 0
+    for name, joints in layout:
+        segments[name] = (start, start + joints)
+        start += joints
+    return segments
+
+
+def empty_landmark_sequence(frames: int, layout: Layout = HOLISTIC_LAYOUT, meta: Optional[Dict] = None) -> LandmarkSequence:
+    """
+    Tạo sequence T frames toàn 0 (chưa có segment nào)
+
+    INPUT:
+        frames: Số frames
+        layout: list of (segment name, joints)
+        meta: Metadata (optional)
+    OUTPUT:
+        LandmarkSequence float32
+    """
+    segments = _layout_segments(layout)
+    joints = sum(count for _, count in layout)
+    return LandmarkSequence(
+        np.zeros((frames, joints, 4), np.float32),
+        np.zeros((frames, len(segments)), bool),
+        segments,
+        meta
+    )
+
+
+def write_landmark_sequence(
+    path: Union[str, Path],
+    sequence: LandmarkSequence,
+    dtype: str = 'float32'
+) -> str:
+    """
+    Ghi sequence ra file (atomic: ghi file tạm rồi rename)
+
+    INPUT:
+        path: Đường dẫn file (thường đuôi .vsls)
+        sequence: LandmarkSequence
+        dtype: 'float32' hoặc 'float16' (giảm một nửa dung lượng, sai số ~1e-3)
+    OUTPUT:
+        str - Đường dẫn file
+    RAISES:
+        ValueError nếu dtype không hỗ trợ
+    """
+    file_dtype = np.dtype(dtype).newbyteorder('<')
+    if file_dtype not in _DTYPE_CODES:
+        raise ValueError(f"Unsupported dtype: {dtype} (use float32 or float16)")
+
+    frames, joints, channels = sequence.points.shape
+    if channels != len(LANDMARK_FIELDS):
+        raise ValueError(f"Expected (T, J, {len(LANDMARK_FIELDS)}) points, got {sequence.points.shape}")
+
+    meta_bytes = json.dumps({
+        'segments': [[name, start, stop] for name, (start, stop) in sequence.segments.items()],
+        'meta': sequence.meta
+    }).encode('utf-8')
+    header_end = _HEADER.size + len(meta_bytes)
+    data_offset = -(-header_end // _DATA_ALIGNMENT) * _DATA_ALIGNMENT
+
+    header = _HEADER.pack(
+        MAGIC, FORMAT_VERSION, _DTYPE_CODES[file_dtype], 0,
+        frames, joints, len(sequence.segments), len(meta_bytes), data_offset
+    )
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(header)
+        f.write(meta_bytes)
+        f.write(b'\0' * (data_offset - header_end))
+        f.write(np.ascontiguousarray(sequence.points, file_dtype).tobytes())
+        f.write(np.ascontiguousarray(sequence.mask, np.uint8).tobytes())
+    os.replace(tmp_path, path)
+    return str(path)
+
+
+def read_landmark_sequence(path: Union[str, Path], mmap: bool = True) -> LandmarkSequence:
+    """
+    Mở file landmark sequence
+
+    INPUT:
+        path: Đường dẫn file
+        mmap: True = points/mask là np.memmap read-only (không đọc cả file vào RAM)
+    OUTPUT:
+        LandmarkSequence
+    RAISES:
+        ValueError nếu file không đúng format / version
+    """
+    with open(path, 'rb') as f:
+        raw_header = f.read(_HEADER.size)
+        if len(raw_header) < _HEADER.size:
+            raise ValueError(f"Not a landmark sequence file: {path}")
+
+        magic, version, dtype_code, _, frames, joints, segment_count, meta_size, data_offset = _HEADER.unpack(raw_header)
+        if magic != MAGIC:
+            raise ValueError(f"Not a landmark sequence file: {path}")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported landmark sequence version {version}: {path}")
+        if dtype_code not in _DTYPES:
+            raise ValueError(f"Unsupported landmark sequence dtype code {dtype_code}: {path}")
+
+        header = json.loads(f.read(meta_size).decode('utf-8'))
+
+    dtype = _DTYPES[dtype_code]
+    points_shape = (frames, joints, len(LANDMARK_FIELDS))
+    mask_offset = data_offset + int(np.prod(points_shape)) * dtype.itemsize
+
+    if mmap and frames:
+        points = np.memmap(path, dtype=dtype, mode='r', offset=data_offset, shape=points_shape)
+        mask = np.memmap(path, dtype=np.uint8, mode='r', offset=mask_offset, shape=(frames, segment_count))
+    else:
+        with open(path, 'rb') as f:
+            f.seek(data_offset)
+            points = np.fromfile(f, dtype=dtype, count=int(np.prod(points_shape))).reshape(points_shape)
+            mask = np.fromfile(f, dtype=np.uint8, count=frames * segment_count).reshape(frames, segment_count)
+
+    segments = {name: (start, stop) for name, start, stop in header['segments']}
+    return LandmarkSequence(points, mask.view(bool), segments, header['meta'])
+
+
+def sequence_from_frames(
+    frames: Iterable[Union[LandmarkFrame, Dict[str, Any]]],
+    layout: Layout = HOLISTIC_LAYOUT,
+    meta: Optional[Dict[str, Any]] = None
+) -> LandmarkSequence:
+    """
+    Tạo sequence từ LandmarkFrames hoặc frame dicts (format JSON hiện có)
+
+    INPUT:
+        frames: list of
+            - LandmarkFrame (holistic: theo tên segment; hands: theo handedness)
+            - dict {'<segment>_landmarks': [{'x','y','z','visibility'}, ...] hoặc None}
+            - dict hands {'landmarks': [[...], ...], 'handedness': ['Left', ...]}
+        layout: list of (segment name, joints)
+        meta: Metadata (optional)
+    OUTPUT:
+        LandmarkSequence float32
+    """
+    frames = list(frames)
+    sequence = empty_landmark_sequence(len(frames), layout, meta)
+    names = list(sequence.segments)
+
+    for t, frame in enumerate(frames):
+        for name, points in _frame_segments(frame):
+            if name not in sequence.segments:
+                continue
+            start, stop = sequence.segments[name]
+            if len(points) != stop - start:
+                raise ValueError(f"Frame {t}: segment '{name}' has {len(points)} joints, expected {stop - start}")
+            sequence.points[t, start:stop] = points
+            sequence.mask[t, names.index(name)] = True
+
+    return sequence
+
+
+def infer_layout(frames: Iterable[Union[LandmarkFrame, Dict[str, Any]]]) -> List[Tuple[str, int]]:
+    """
+    Suy ra layout từ các segments xuất hiện trong frames (theo thứ tự xuất hiện)
+
+    INPUT:
+        frames: như sequence_from_frames()
+    OUTPUT:
+        list of (segment name, joints)
+    """
+    layout = {}
+    for frame in frames:
+        for name, points in _frame_segments(frame):
+            layout.setdefault(name, len(points))
+    return list(layout.items())
+
+
+def _frame_segments(frame: Union[LandmarkFrame, Dict[str, Any]]) -> List[Tuple[str, np.ndarray]]:
+    """Tách một frame thành list of (segment name, array (n, 4))"""
+    if isinstance(frame, LandmarkFrame):
+        if frame.kind == 'hands':
+            return _hand_segments(frame.iter_hands())
+        return [(name, frame.segment(name)) for name in frame.segments]
+
+    if 'landmarks' in frame and 'handedness' in frame:
+        hands = frame['landmarks'] or []
+        handedness = list(frame['handedness'] or [])
+        handedness += ['Unknown'] * (len(hands) - len(handedness))
+        return _hand_segments((hand_type, _dicts_to_array(hand)) for hand, hand_type in zip(hands, handedness))
+
+    return [
+        (key[:-len('_landmarks')], _dicts_to_array(value))
+        for key, value in frame.items()
+        if key.endswith('_landmarks') and value
+    ]
+
+
+def _hand_segments(hands: Iterable[Tuple[str, np.ndarray]]) -> List[Tuple[str, np.ndarray]]:
+    """
+    (handedness, points) -> ('left_hand' | 'right_hand', points)
+
+    Hands có handedness Left/Right giữ segment của mình; hand 'Unknown' hoặc
+    trùng handedness với hand trước lấy segment còn trống (không mất hand nào
+    khi frame có tối đa 2 hands).
+    """
+    segments: Dict[str, np.ndarray] = {}
+    unassigned = []
+    for hand_type, points in hands:
+        name = f'{hand_type.lower()}_hand'
+        if name in _HAND_SEGMENT_NAMES and name not in segments:
+            segments[name] = points
+        else:
+            unassigned.append(points)
+    for points in unassigned:
+        name = next((n for n in _HAND_SEGMENT_NAMES if n not in segments), None)
+        if name is not None:
+            segments[name] = points
+    return list(segments.items())
+
+
+def _dicts_to_array(landmarks: List[Dict[str, float]]) -> np.ndarray:
+    """list of {'x','y','z','visibility'} -> (n, 4) float32"""
+    return np.array(
+        [(lm['x'], lm['y'], lm.get('z', 0.0), lm.get('visibility', 1.0)) for lm in landmarks],
+        np.float32
+    )
+
+
+def sequence_to_frames(sequence: LandmarkSequence) -> List[Dict[str, Optional[List[Dict[str, float]]]]]:
+    """
+    Chuyển sequence về list of frame dicts (format JSON hiện có)
+
+    OUTPUT:
+        [{'<segment>_landmarks': list of {'x','y','z','visibility'} hoặc None, ...}, ...]
+    """
+    points = np.asarray(sequence.points, np.float32).tolist()
+    mask = np.asarray(sequence.mask).tolist()
+
+    frames = []
+    for frame_points, frame_mask in zip(points, mask):
+        frame = {}
+        for (name, (start, stop)), present in zip(sequence.segments.items(), frame_mask):
+            frame[f'{name}_landmarks'] = (
+                [dict(zip(LANDMARK_FIELDS, row)) for row in frame_points[start:stop]] if present else None
+            )
+        frames.append(frame)
+    return frames
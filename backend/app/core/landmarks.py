@@ -0,0 +1,224 @@
+"""
+Landmarks - Biểu diễn landmarks dạng NumPy array
+
+LandmarkFrame giữ toàn bộ landmarks của một frame trong một array (N, 4)
+float32 (x, y, z, visibility), chia thành các segments đặt tên ('hand_0',
+'pose', 'face', 'left_hand', ...). Dicts {'x','y','z','visibility'} chỉ được
+tạo khi cần (JSON response, code cũ dùng format dict).
+
+MediaPipe lưu toạ độ dạng float32 nên chuyển sang array không mất chính xác.
+"""
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+LANDMARK_FIELDS = ('x', 'y', 'z', 'visibility')
+
+# Slot cố định của mỗi bàn tay theo handedness (xem LandmarkFrame.hand_slots())
+HAND_SLOTS = {'Left': 0, 'Right': 1}
+
+# Các keys của format dict cũ theo loại extraction
+_LEGACY_KEYS = {
+    'hands': ('success', 'landmarks', 'handedness'),
+    'pose': ('success', 'landmarks'),
+    'face': ('success', 'landmarks'),
+    'holistic': ('success', 'face_landmarks', 'pose_landmarks', 'left_hand_landmarks', 'right_hand_landmarks')
+}
+
+
+class LandmarkFrame:
+    """
+    Landmarks của một frame
+
+    - points: float32 (N, 4) - x, y, z, visibility của tất cả segments
+    - segments: dict tên -> (start, stop) trong points, theo thứ tự
+    - handedness: list 'Left'/'Right' cho các hand segments ('hand_0', 'hand_1', ...)
+    - scores: list confidence (handedness score) của các hand segments
+    - kind: 'hands' | 'pose' | 'face' | 'holistic' - quyết định format dict cũ
+
+    Hỗ trợ đọc theo keys của format dict cũ (frame['landmarks'],
+    frame['left_hand_landmarks'], ...) và to_dict().
+    """
+
+    __slots__ = ('points', 'segments', 'handedness', 'kind', 'scores')
+
+    def __init__(
+        self,
+        points: np.ndarray,
+        segments: Dict[str, Tuple[int, int]],
+        handedness: Optional[List[str]] = None,
+        kind: str = 'hands',
+        scores: Optional[List[float]] = None
+    ):
+        self.points = points
+        self.segments = segments
+        self.handedness = handedness or []
+        self.kind = kind
+        self.scores = scores or []
+
+    @classmethod
+    def empty(cls, kind: str = 'hands') -> 'LandmarkFrame':
+        """Frame không detect được landmarks nào"""
+        return cls(np.zeros((0, 4), np.float32), {}, kind=kind)
+
+    @classmethod
+    def from_mediapipe(
+        cls,
+        landmark_lists: Sequence[Tuple[str, Any]],
+        kind: str,
+        handedness: Optional[List[str]] = None,
+        scores: Optional[List[float]] = None
+    ) -> 'LandmarkFrame':
+        """
+        Tạo frame từ MediaPipe NormalizedLandmarkList
+
+        INPUT:
+            landmark_lists: list of (segment name, NormalizedLandmarkList hoặc None)
+                - segments None bị bỏ qua
+            kind: 'hands' | 'pose' | 'face' | 'holistic'
+            handedness: list 'Left'/'Right' (hands)
+            scores: list handedness scores (hands)
+        OUTPUT:
+            LandmarkFrame
+        """
+        rows = []
+        segments = {}
+        for name, landmark_list in landmark_lists:
+            if landmark_list is None:
+                continue
+            start = len(rows)
+            rows.extend((lm.x, lm.y, lm.z, lm.visibility) for lm in landmark_list.landmark)
+            segments[name] = (start, len(rows))
+
+        points = np.array(rows, np.float32) if rows else np.zeros((0, 4), np.float32)
+        return cls(points, segments, handedness, kind, scores)
+
+    @classmethod
+    def from_segments(
+        cls,
+        segment_arrays: Sequence[Tuple[str, Optional[np.ndarray]]],
+        kind: str
+    ) -> 'LandmarkFrame':
+        """
+        Ghép các segments đã có dạng array thành một frame
+
+        INPUT:
+            segment_arrays: list of (segment name, float32 (n, 4) hoặc None)
+                - segments None bị bỏ qua
+            kind: 'hands' | 'pose' | 'face' | 'holistic'
+        OUTPUT:
+            LandmarkFrame
+        """
+        arrays = []
+        segments = {}
+        start = 0
+        for name, points in segment_arrays:
+            if points is None:
+                continue
+            arrays.append(points)
+            segments[name] = (start, start + len(points))
+            start += len(points)
+
+        points = np.concatenate(arrays).astype(np.float32, copy=False) if arrays else np.zeros((0, 4), np.float32)
+        return cls(points, segments, kind=kind)
+
+    @property
+    def success(self) -> bool:
+        """Có detect được landmarks không (holistic: luôn True như format cũ)"""
+        return self.kind == 'holistic' or bool(self.segments)
+
+    def segment(self, name: str) -> Optional[np.ndarray]:
+        """
+        Lấy landmarks của một segment
+
+        INPUT:
+            name: Tên segment ('hand_0', 'pose', 'face', 'left_hand', 'right_hand')
+        OUTPUT:
+            View float32 (n, 4) vào points, hoặc None nếu segment không có
+        """
+        bounds = self.segments.get(name)
+        if bounds is None:
+            return None
+        return self.points[bounds[0]:bounds[1]]
+
+    @property
+    def hand_count(self) -> int:
+        """Số hands detect được (kind 'hands')"""
+        return sum(1 for name in self.segments if name.startswith('hand_'))
+
+    def iter_hands(self) -> Iterator[Tuple[str, np.ndarray]]:
+        """
+        Duyệt các hands (kind 'hands')
+
+        OUTPUT:
+            Iterator of (hand_type 'Left'/'Right'/'Unknown', float32 (21, 4))
+        """
+        for i in range(self.hand_count):
+            hand_type = self.handedness[i] if i < len(self.handedness) else 'Unknown'
+            yield hand_type, self.segment(f'hand_{i}')
+
+    def hand_slots(self) -> Dict[int, int]:
+        """
+        Xếp hands vào các slots cố định theo handedness (HAND_SLOTS: Left 0, Right 1)
+
+        Hand 'Unknown' hoặc trùng handedness với hand trước lấy slot còn trống,
+        để cùng một bàn tay luôn ở cùng slot giữa các frames.
+
+        OUTPUT:
+            dict hand index -> slot (hands không còn slot bị bỏ)
+        """
+        slots: Dict[int, int] = {}
+        for i, (hand_type, _) in enumerate(self.iter_hands()):
+            slot = HAND_SLOTS.get(hand_type)
+            if slot is None or slot in slots.values():
+                slot = next((s for s in HAND_SLOTS.values() if s not in slots.values()), None)
+            if slot is not None:
+                slots[i] = slot
+        return slots
+
+    def segment_dicts(self, name: str) -> Optional[List[Dict[str, float]]]:
+        """Landmarks của segment dạng list of {'x','y','z','visibility'}, None nếu không có"""
+        points = self.segment(name)
+        if points is None:
+            return None
+        return [dict(zip(LANDMARK_FIELDS, row)) for row in points.tolist()]
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in _LEGACY_KEYS.get(self.kind, ()):
+            raise KeyError(key)
+
+        if key == 'success':
+            return self.success
+        if key == 'handedness':
+            return list(self.handedness) if self.segments else None
+        if key == 'landmarks':
+            if self.kind == 'hands':
+                return [self.segment_dicts(name) for name in self.segments] or None
+            return self.segment_dicts(self.kind)
+        # holistic: '<segment>_landmarks'
+        return self.segment_dicts(key[:-len('_landmarks')])
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self) -> Tuple[str, ...]:
+        return _LEGACY_KEYS.get(self.kind, ())
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Chuyển sang format dict cũ (dùng ở JSON boundary)
+
+        OUTPUT:
+            hands: {'success', 'landmarks', 'handedness'}
+            pose, face: {'success', 'landmarks'}
+            holistic: {'success', 'face_landmarks', 'pose_landmarks',
+                       'left_hand_landmarks', 'right_hand_landmarks'}
+        """
+        return {key: self[key] for key in self.keys()}
+
+    def __repr__(self) -> str:
+        segments = ', '.join(f'{name}={stop - start}' for name, (start, stop) in self.segments.items())
+        return f"LandmarkFrame(kind={self.kind!r}, {segments or 'empty'})"
@@ -0,0 +1,147 @@
+"""
+Model Export - Chuyển Keras model sang ONNX / TFLite để chạy bằng runtime nhẹ
+
+- export_tflite(): TFLite, quantization None | 'fp16' | 'int8'
+  ('int8' với representative data = full integer; không có = dynamic range)
+- export_onnx(): ONNX qua tf2onnx, quantization None | 'fp16' | 'int8'
+  (dynamic INT8 bằng onnxruntime.quantization)
+
+Chạy offline (script / notebook training), không phải trong request path.
+Sau khi export, đăng ký model với metadata backend / quantization:
+
+    result = export_tflite("models/vsl_recognition/model.keras",
+                           "models/vsl_recognition/model_int8.tflite",
+                           quantization='int8', representative_data=samples)
+    trained_model_registry.register_model(
+        "vsl_lstm", "v1-int8", "vsl_recognition", result['output_path'],
+        metadata={'backend': result['backend'], 'quantization': result['quantization'],
+                  'labels': labels})
+"""
+import logging
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+QUANTIZATION_MODES = (None, 'fp16', 'int8')
+
+
+def _check_quantization(quantization: Optional[str]):
+    if quantization not in QUANTIZATION_MODES:
+        raise ValueError(f"Unsupported quantization: {quantization}. Supported: fp16, int8")
+
+
+def _export_result(output_path: Path, backend: str, quantization: Optional[str]) -> Dict[str, Any]:
+    logger.info(f"Model exported ({backend}, quantization: {quantization or 'none'}): {output_path}")
+    return {
+        'success': True,
+        'output_path': str(output_path),
+        'backend': backend,
+        'quantization': quantization,
+        'error': None
+    }
+
+
+def _export_error(backend: str, quantization: Optional[str], error: Exception) -> Dict[str, Any]:
+    logger.error(f"Error exporting model to {backend}: {str(error)}")
+    return {
+        'success': False,
+        'output_path': None,
+        'backend': backend,
+        'quantization': quantization,
+        'error': str(error)
+    }
+
+
+def export_tflite(
+    keras_model_path: Union[str, Path],
+    output_path: Union[str, Path],
+    quantization: Optional[str] = None,
+    representative_data: Optional[Iterable[np.ndarray]] = None
+) -> Dict[str, Any]:
+    """
+    Export Keras model sang TFLite
+
+    INPUT:
+        keras_model_path: .keras / .h5 / SavedModel directory
+        output_path: File .tflite
+        quantization: None | 'fp16' | 'int8'
+        representative_data: Các input samples (mỗi sample (1, ...) float32) để
+            calibrate full INT8 (inputs/outputs int8). Không có thì 'int8' là
+            dynamic range quantization (chỉ weights int8)
+    OUTPUT:
+        {'success', 'output_path', 'backend': 'tflite', 'quantization', 'error'}
+    """
+    try:
+        _check_quantization(quantization)
+        import tensorflow as tf
+
+        model = tf.keras.models.load_model(str(keras_model_path), compile=False)
+        converter = tf.lite.TFLiteConverter.from_keras_model(model)
+        if quantization:
+            converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        if quantization == 'fp16':
+            converter.target_spec.supported_types = [tf.float16]
+        elif quantization == 'int8' and representative_data is not None:
+            samples = list(representative_data)
+            converter.representative_dataset = lambda: ([np.asarray(s, np.float32)] for s in samples)
+            converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+            converter.inference_input_type = tf.int8
+            converter.inference_output_type = tf.int8
+
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_path.write_bytes(converter.convert())
+        return _export_result(output_path, 'tflite', quantization)
+
+    except Exception as e:
+        return _export_error('tflite', quantization, e)
+
+
+def export_onnx(
+    keras_model_path: Union[str, Path],
+    output_path: Union[str, Path],
+    quantization: Optional[str] = None,
+    opset: int = 13
+) -> Dict[str, Any]:
+    """
+    Export Keras model sang ONNX (batch dimension dynamic)
+
+    INPUT:
+        keras_model_path: .keras / .h5 / SavedModel directory
+        output_path: File .onnx
+        quantization: None | 'fp16' (onnxconverter-common) | 'int8' (dynamic, onnxruntime)
+        opset: ONNX opset version
+    OUTPUT:
+        {'success', 'output_path', 'backend': 'onnx', 'quantization', 'error'}
+    """
+    try:
+        _check_quantization(quantization)
+        import tensorflow as tf
+        import tf2onnx
+        import onnx
+
+        model = tf.keras.models.load_model(str(keras_model_path), compile=False)
+        onnx_model, _ = tf2onnx.convert.from_keras(model, opset=opset)
+
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        if quantization == 'fp16':
+            from onnxconverter_common import float16
+            onnx_model = float16.convert_float_to_float16(onnx_model)
+
+        if quantization == 'int8':
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                float_path = Path(tmp_dir) / "model_fp32.onnx"
+                onnx.save(onnx_model, str(float_path))
+                quantize_dynamic(str(float_path), str(output_path), weight_type=QuantType.QInt8)
+        else:
+            onnx.save(onnx_model, str(output_path))
+        return _export_result(output_path, 'onnx', quantization)
+
+    except Exception as e:
+        return _export_error('onnx', quantization, e)
@@ -4,14 +4,21 @@ Model Manager - Quản lý các shared models (MediaPipe, OpenCV, etc.)
 Module này quản lý việc khởi tạo và cache các models dùng chung
 để tránh load model nhiều lần, tối ưu hiệu năng.
 """
-import cv2
-import mediapipe as mp
-from typing import Optional, Dict, Any
+import numpy as np
+import threading
+from contextlib import contextmanager
+from typing import Optional, Dict, Any, Tuple
 import logging
 from ..config import settings
+from .graph_pool import GraphPool
+from .landmarks import LandmarkFrame
 
 logger = logging.getLogger(__name__)
 
+# Graphs có thể warm-up lúc startup (settings.WARMUP_GRAPHS)
+WARMUP_GRAPHS = ('hands', 'holistic', 'pose', 'face')
+WARMUP_FRAME_SIZE = 256
+
 
 class ModelManager:
     """
@@ -45,6 +52,14 @@ class ModelManager:
         self._models['mp_face'] = None
         self._models['mp_holistic'] = None
 
+        # MediaPipe graphs are not thread-safe: one lock per graph so inference
+        # executor threads never call process() on the same graph concurrently
+        self._locks = {key: threading.Lock() for key in self._models}
+
+        # Pools of per-session / per-worker graphs (tracking state is per instance)
+        self._pools: Dict[str, GraphPool] = {}
+        self._pools_lock = threading.Lock()
+
         logger.info("Model manager initialized successfully")
 
     def get_hands_model(self):
@@ -59,15 +74,79 @@ class ModelManager:
             results = hands.process(image)
         """
         if self._models['mp_hands'] is None:
-            logger.info("Loading MediaPipe Hands model...")
-            self._models['mp_hands'] = mp.solutions.hands.Hands(
-                static_image_mode=False,
-                max_num_hands=2,
-                min_detection_confidence=settings.MEDIAPIPE_MIN_DETECTION_CONFIDENCE,
-                min_tracking_confidence=settings.MEDIAPIPE_MIN_TRACKING_CONFIDENCE
-            )
+            with self._locks['mp_hands']:
+                if self._models['mp_hands'] is None:
+                    logger.info("Loading MediaPipe Hands model...")
+                    self._models['mp_hands'] = self._create_hands_model()
         return self._models['mp_hands']
 
+    def _create_hands_model(self, static_image_mode: bool = False):
+        """
+        Tạo một MediaPipe Hands graph mới (có tracking state riêng)
+
+        INPUT:
+            static_image_mode: True = palm detection mọi lần process (không tracking)
+        OUTPUT: mediapipe.solutions.hands.Hands object
+        """
+        import mediapipe as mp
+        return mp.solutions.hands.Hands(
+            static_image_mode=static_image_mode,
+            max_num_hands=2,
+            min_detection_confidence=settings.MEDIAPIPE_MIN_DETECTION_CONFIDENCE,
+            min_tracking_confidence=settings.MEDIAPIPE_MIN_TRACKING_CONFIDENCE
+        )
+
+    def get_hands_pool(self, static_image_mode: bool = False) -> GraphPool:
+        """
+        Lấy pool các MediaPipe Hands graphs
+
+        INPUT:
+            static_image_mode: True = pool riêng các graphs không tracking
+                (full-frame detection, không giữ state giữa các lần process)
+        OUTPUT: GraphPool (checkout/checkin Hands instances)
+        USAGE:
+            pool = model_manager.get_hands_pool()
+            hands = pool.checkout(timeout=5)
+            try:
+                results = hands.process(image_rgb)
+            finally:
+                pool.checkin(hands)
+        """
+        name = 'hands_static' if static_image_mode else 'hands'
+        if name not in self._pools:
+            with self._pools_lock:
+                if name not in self._pools:
+                    self._pools[name] = GraphPool(
+                        name,
+                        lambda: self._create_hands_model(static_image_mode),
+                        max_size=settings.HANDS_POOL_MAX_SIZE,
+                        idle_timeout=settings.HANDS_POOL_IDLE_TIMEOUT,
+                        min_size=0 if static_image_mode else settings.HANDS_POOL_MIN_SIZE
+                    )
+        return self._pools[name]
+
+    @contextmanager
+    def hands_session(self, timeout: Optional[float] = None, static_image_mode: bool = False):
+        """
+        Mượn một Hands graph riêng cho một session / một video
+
+        INPUT:
+            timeout: Thời gian chờ khi pool đầy (default: settings.HANDS_POOL_CHECKOUT_TIMEOUT)
+            static_image_mode: True = graph không tracking (xem get_hands_pool())
+        OUTPUT:
+            Context manager trả về Hands graph
+        RAISES:
+            TimeoutError nếu không có graph nào rảnh
+        USAGE:
+            with model_manager.hands_session() as hands:
+                for frame in frames:
+                    model_manager.extract_hand_landmarks(frame, hands=hands)
+        """
+        if timeout is None:
+            timeout = settings.HANDS_POOL_CHECKOUT_TIMEOUT
+        with self.get_hands_pool(static_image_mode).lease(timeout) as hands:
+            yield hands
+
     def get_pose_model(self):
         """
         Lấy MediaPipe Pose model
@@ -79,13 +158,16 @@ class ModelManager:
             pose = manager.get_pose_model()
             results = pose.process(image)
         """
+        import mediapipe as mp
         if self._models['mp_pose'] is None:
-            logger.info("Loading MediaPipe Pose model...")
-            self._models['mp_pose'] = mp.solutions.pose.Pose(
-                static_image_mode=False,
-                min_detection_confidence=settings.MEDIAPIPE_MIN_DETECTION_CONFIDENCE,
-                min_tracking_confidence=settings.MEDIAPIPE_MIN_TRACKING_CONFIDENCE
-            )
+            with self._locks['mp_pose']:
+                if self._models['mp_pose'] is None:
+                    logger.info("Loading MediaPipe Pose model...")
+                    self._models['mp_pose'] = mp.solutions.pose.Pose(
+                        static_image_mode=False,
+                        min_detection_confidence=settings.MEDIAPIPE_MIN_DETECTION_CONFIDENCE,
+                        min_tracking_confidence=settings.MEDIAPIPE_MIN_TRACKING_CONFIDENCE
+                    )
         return self._models['mp_pose']
 
     def get_face_model(self):
@@ -100,15 +182,49 @@ class ModelManager:
             results = face.process(image)
         """
         if self._models['mp_face'] is None:
-            logger.info("Loading MediaPipe Face Mesh model...")
-            self._models['mp_face'] = mp.solutions.face_mesh.FaceMesh(
-                static_image_mode=False,
-                max_num_faces=1,
-                min_detection_confidence=settings.MEDIAPIPE_MIN_DETECTION_CONFIDENCE,
-                min_tracking_confidence=settings.MEDIAPIPE_MIN_TRACKING_CONFIDENCE
-            )
+            with self._locks['mp_face']:
+                if self._models['mp_face'] is None:
+                    logger.info("Loading MediaPipe Face Mesh model...")
+                    self._models['mp_face'] = self._create_face_model()
         return self._models['mp_face']
 
+    def _create_face_model(self, static_image_mode: bool = False):
+        """
+        Tạo một MediaPipe Face Mesh graph mới
+
+        INPUT:
+            static_image_mode: True = face detection mọi lần process (không tracking)
+        OUTPUT: mediapipe.solutions.face_mesh.FaceMesh object
+        """
+        import mediapipe as mp
+        return mp.solutions.face_mesh.FaceMesh(
+            static_image_mode=static_image_mode,
+            max_num_faces=1,
+            min_detection_confidence=settings.MEDIAPIPE_MIN_DETECTION_CONFIDENCE,
+            min_tracking_confidence=settings.MEDIAPIPE_MIN_TRACKING_CONFIDENCE
+        )
+
+    def get_face_pool(self) -> GraphPool:
+        """
+        Lấy pool các Face Mesh graphs static_image_mode=True (không tracking)
+
+        Dùng cho frames thưa của nhiều clients (realtime emotion): không có
+        tracking state nên frames của các sessions không lẫn vào nhau.
+
+        INPUT: None
+        OUTPUT: GraphPool (checkout/checkin FaceMesh instances)
+        """
+        if 'face_static' not in self._pools:
+            with self._pools_lock:
+                if 'face_static' not in self._pools:
+                    self._pools['face_static'] = GraphPool(
+                        'face_static',
+                        lambda: self._create_face_model(static_image_mode=True),
+                        max_size=settings.HANDS_POOL_MAX_SIZE,
+                        idle_timeout=settings.HANDS_POOL_IDLE_TIMEOUT
+                    )
+        return self._pools['face_static']
+
     def get_holistic_model(self):
         """
         Lấy MediaPipe Holistic model (tích hợp hands, pose, face)
@@ -120,22 +236,39 @@ class ModelManager:
             holistic = manager.get_holistic_model()
             results = holistic.process(image)
         """
+        import mediapipe as mp
         if self._models['mp_holistic'] is None:
-            logger.info("Loading MediaPipe Holistic model...")
-            self._models['mp_holistic'] = mp.solutions.holistic.Holistic(
-                static_image_mode=False,
-                min_detection_confidence=settings.MEDIAPIPE_MIN_DETECTION_CONFIDENCE,
-                min_tracking_confidence=settings.MEDIAPIPE_MIN_TRACKING_CONFIDENCE
-            )
+            with self._locks['mp_holistic']:
+                if self._models['mp_holistic'] is None:
+                    logger.info("Loading MediaPipe Holistic model...")
+                    self._models['mp_holistic'] = mp.solutions.holistic.Holistic(
+                        static_image_mode=False,
+                        min_detection_confidence=settings.MEDIAPIPE_MIN_DETECTION_CONFIDENCE,
+                        min_tracking_confidence=settings.MEDIAPIPE_MIN_TRACKING_CONFIDENCE
+                    )
         return self._models['mp_holistic']
 
-    def extract_hand_landmarks(self, image):
+    def extract_hand_landmarks(
+        self,
+        image,
+        is_rgb: bool = False,
+        hands=None,
+        roi: Optional[Tuple[int, int, int, int]] = None
+    ) -> LandmarkFrame:
         """
         Trích xuất hand landmarks từ image
 
         INPUT:
             image: numpy array (BGR format from cv2)
+            is_rgb: bool - True nếu image đã ở RGB (bỏ qua bước convert)
+            hands: Hands graph đã checkout từ hands_session() (optional).
+                Nếu None, mượn tạm một graph từ pool cho riêng lần gọi này
+                (không giữ tracking giữa các frames).
+            roi: (x0, y0, x1, y1) pixels (optional) - chỉ convert và inference
+                vùng crop này; toạ độ trả về vẫn normalized theo toàn frame
         OUTPUT:
+            LandmarkFrame (kind 'hands') - segments 'hand_0', 'hand_1', handedness
+            'Left'/'Right', scores (handedness score). Đọc được theo format dict cũ:
             {
                 'success': bool,
                 'landmarks': list of hand landmarks hoặc None,
@@ -144,58 +277,56 @@ class ModelManager:
         RAISES:
             Exception nếu có lỗi khi xử lý
         """
+        import cv2
         try:
-            hands = self.get_hands_model()
+            if roi is not None:
+                x0, y0, x1, y1 = roi
+                full_height, full_width = image.shape[:2]
+                image = image[y0:y1, x0:x1]
 
             # Convert BGR to RGB
-            image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+            image_rgb = image if is_rgb else cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
 
             # Process
-            results = hands.process(image_rgb)
-
-            if results.multi_hand_landmarks:
-                landmarks = []
-                handedness = []
-
-                for hand_landmarks in results.multi_hand_landmarks:
-                    # Convert landmarks to list of dicts
-                    landmark_list = []
-                    for lm in hand_landmarks.landmark:
-                        landmark_list.append({
-                            'x': lm.x,
-                            'y': lm.y,
-                            'z': lm.z,
-                            'visibility': getattr(lm, 'visibility', 1.0)
-                        })
-                    landmarks.append(landmark_list)
-
-                # Get handedness (Left/Right)
-                if results.multi_handedness:
-                    for hand in results.multi_handedness:
-                        handedness.append(hand.classification[0].label)
-
-                return {
-                    'success': True,
-                    'landmarks': landmarks,
-                    'handedness': handedness
-                }
+            if hands is None:
+                with self.hands_session() as pooled_hands:
+                    results = pooled_hands.process(image_rgb)
             else:
-                return {
-                    'success': False,
-                    'landmarks': None,
-                    'handedness': None
-                }
+                results = hands.process(image_rgb)
+
+            if not results.multi_hand_landmarks:
+                return LandmarkFrame.empty('hands')
+
+            # Get handedness (Left/Right)
+            classifications = [hand.classification[0] for hand in results.multi_handedness or []]
+
+            frame = LandmarkFrame.from_mediapipe(
+                [(f'hand_{i}', hand_landmarks) for i, hand_landmarks in enumerate(results.multi_hand_landmarks)],
+                kind='hands',
+                handedness=[c.label for c in classifications],
+                scores=[c.score for c in classifications]
+            )
+
+            if roi is not None:
+                # Crop coordinates -> full frame (z cùng scale với x)
+                crop_height, crop_width = image.shape[:2]
+                frame.points[:, 0] = (frame.points[:, 0] * crop_width + x0) / full_width
+                frame.points[:, 1] = (frame.points[:, 1] * crop_height + y0) / full_height
+                frame.points[:, 2] *= crop_width / full_width
+            return frame
         except Exception as e:
             logger.error(f"Error extracting hand landmarks: {str(e)}")
             raise
 
-    def extract_pose_landmarks(self, image):
+    def extract_pose_landmarks(self, image, is_rgb: bool = False) -> LandmarkFrame:
         """
         Trích xuất pose landmarks từ image
 
         INPUT:
             image: numpy array (BGR format from cv2)
+            is_rgb: bool - True nếu image đã ở RGB (bỏ qua bước convert)
         OUTPUT:
+            LandmarkFrame (kind 'pose') - segment 'pose'. Đọc được theo format dict cũ:
             {
                 'success': bool,
                 'landmarks': list of pose landmarks hoặc None
@@ -203,45 +334,70 @@ class ModelManager:
         RAISES:
             Exception nếu có lỗi khi xử lý
         """
+        import cv2
         try:
             pose = self.get_pose_model()
 
             # Convert BGR to RGB
-            image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+            image_rgb = image if is_rgb else cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
 
             # Process
-            results = pose.process(image_rgb)
-
-            if results.pose_landmarks:
-                landmarks = []
-                for lm in results.pose_landmarks.landmark:
-                    landmarks.append({
-                        'x': lm.x,
-                        'y': lm.y,
-                        'z': lm.z,
-                        'visibility': lm.visibility
-                    })
-
-                return {
-                    'success': True,
-                    'landmarks': landmarks
-                }
-            else:
-                return {
-                    'success': False,
-                    'landmarks': None
-                }
+            with self._locks['mp_pose']:
+                results = pose.process(image_rgb)
+
+            return LandmarkFrame.from_mediapipe([('pose', results.pose_landmarks)], kind='pose')
         except Exception as e:
             logger.error(f"Error extracting pose landmarks: {str(e)}")
             raise
 
-    def extract_holistic_landmarks(self, image):
+    def extract_face_landmarks(self, image, is_rgb: bool = False, static_image_mode: bool = False) -> LandmarkFrame:
+        """
+        Trích xuất face mesh landmarks (468 điểm) từ image
+
+        INPUT:
+            image: numpy array (BGR format from cv2)
+            is_rgb: bool - True nếu image đã ở RGB (bỏ qua bước convert)
+            static_image_mode: True = mượn graph không tracking từ get_face_pool()
+                (frames không liên tiếp / từ nhiều clients); False = shared
+                tracking graph (frames liên tiếp của một video)
+        OUTPUT:
+            LandmarkFrame (kind 'face') - segment 'face'. Đọc được theo format dict cũ:
+            {
+                'success': bool,
+                'landmarks': list of face landmarks hoặc None
+            }
+        RAISES:
+            Exception nếu có lỗi khi xử lý
+        """
+        import cv2
+        try:
+            # Convert BGR to RGB
+            image_rgb = image if is_rgb else cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+
+            # Process
+            if static_image_mode:
+                with self.get_face_pool().lease(settings.HANDS_POOL_CHECKOUT_TIMEOUT) as face:
+                    results = face.process(image_rgb)
+            else:
+                face = self.get_face_model()
+                with self._locks['mp_face']:
+                    results = face.process(image_rgb)
+
+            face_landmarks = results.multi_face_landmarks[0] if results.multi_face_landmarks else None
+            return LandmarkFrame.from_mediapipe([('face', face_landmarks)], kind='face')
+        except Exception as e:
+            logger.error(f"Error extracting face landmarks: {str(e)}")
+            raise
+
+    def extract_holistic_landmarks(self, image) -> LandmarkFrame:
         """
         Trích xuất tất cả landmarks (hands, pose, face) từ image
 
         INPUT:
             image: numpy array (BGR format from cv2)
         OUTPUT:
+            LandmarkFrame (kind 'holistic') - segments 'face', 'pose', 'left_hand',
+            'right_hand' (chỉ các phần detect được). Đọc được theo format dict cũ:
             {
                 'success': bool,
                 'face_landmarks': list hoặc None,
@@ -252,6 +408,7 @@ class ModelManager:
         RAISES:
             Exception nếu có lỗi khi xử lý
         """
+        import cv2
         try:
             holistic = self.get_holistic_model()
 
@@ -259,29 +416,63 @@ class ModelManager:
             image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
 
             # Process
-            results = holistic.process(image_rgb)
-
-            def landmarks_to_list(landmarks):
-                if landmarks is None:
-                    return None
-                return [{
-                    'x': lm.x,
-                    'y': lm.y,
-                    'z': lm.z,
-                    'visibility': getattr(lm, 'visibility', 1.0)
-                } for lm in landmarks.landmark]
-
-            return {
-                'success': True,
-                'face_landmarks': landmarks_to_list(results.face_landmarks),
-                'pose_landmarks': landmarks_to_list(results.pose_landmarks),
-                'left_hand_landmarks': landmarks_to_list(results.left_hand_landmarks),
-                'right_hand_landmarks': landmarks_to_list(results.right_hand_landmarks)
-            }
+            with self._locks['mp_holistic']:
+                results = holistic.process(image_rgb)
+
+            return LandmarkFrame.from_mediapipe(
+                [
+                    ('face', results.face_landmarks),
+                    ('pose', results.pose_landmarks),
+                    ('left_hand', results.left_hand_landmarks),
+                    ('right_hand', results.right_hand_landmarks)
+                ],
+                kind='holistic'
+            )
         except Exception as e:
             logger.error(f"Error extracting holistic landmarks: {str(e)}")
             raise
 
+    def warmup_graph(self, name: str) -> int:
+        """
+        Tạo sẵn graph và chạy một frame giả qua nó (graph construction +
+        TFLite delegate setup không rơi vào request đầu tiên)
+
+        INPUT:
+            name: 'hands' (pre-build settings.HANDS_POOL_MIN_SIZE graphs trong pool;
+                với HAND_ROI_TRACKING thêm một graph trong pool 'hands_static'
+                cho full-frame re-detection) | 'holistic' | 'pose' | 'face'
+        OUTPUT:
+            Số graphs đã warm-up
+        RAISES:
+            ValueError nếu name không hỗ trợ
+        """
+        frame = np.zeros((WARMUP_FRAME_SIZE, WARMUP_FRAME_SIZE, 3), np.uint8)
+        if name == 'hands':
+            warmup = lambda hands: self.extract_hand_landmarks(frame, is_rgb=True, hands=hands)
+            count = self.get_hands_pool().prewarm(warmup=warmup)
+            if settings.HAND_ROI_TRACKING:
+                # min_size=0 pool - prewarm(None) would build nothing
+                count += self.get_hands_pool(static_image_mode=True).prewarm(count=1, warmup=warmup)
+            return count
+        if name == 'holistic':
+            self.extract_holistic_landmarks(frame)
+        elif name == 'pose':
+            self.extract_pose_landmarks(frame, is_rgb=True)
+        elif name == 'face':
+            self.extract_face_landmarks(frame, is_rgb=True)
+        else:
+            raise ValueError(f"Unknown graph: {name}. Supported: {', '.join(WARMUP_GRAPHS)}")
+        return 1
+
+    def get_pool_metrics(self) -> Dict[str, Any]:
+        """
+        Lấy metrics của các graph pools
+
+        INPUT: None
+        OUTPUT: {pool_name: GraphPool.get_metrics()}
+        """
+        return {name: pool.get_metrics() for name, pool in self._pools.items()}
+
     def release_models(self):
         """
         Giải phóng tất cả models khỏi bộ nhớ
@@ -295,6 +486,8 @@ class ModelManager:
                 if hasattr(self._models[key], 'close'):
                     self._models[key].close()
                 self._models[key] = None
+        for pool in self._pools.values():
+            pool.close_all()
         logger.info("All models released")
 
 
@@ -0,0 +1,292 @@
+"""
+Model Runtime - Backend inference cho trained models (Keras / ONNX Runtime / TFLite)
+
+Load full TensorFlow chỉ để chạy inference làm startup chậm và tốn RAM. Models
+có thể được export (xem model_export.py) và chạy bằng runtime nhẹ hơn:
+
+- 'keras': tf.keras.models.load_model (.keras, .h5, SavedModel directory)
+- 'onnx': onnxruntime.InferenceSession, CPUExecutionProvider (.onnx)
+- 'tflite': tflite_runtime / tf.lite Interpreter (.tflite), hỗ trợ models
+  quantize INT8 (inputs/outputs được quantize/dequantize tự động) và FP16
+
+Mọi runtime có cùng interface: predict(inputs (B, ...) float32) -> outputs
+(B, ...) float32. Các thư viện được import lazy khi load model.
+
+Backend của một model được lưu trong registry metadata ('backend'); nếu không
+có thì suy ra từ phần mở rộng của model file (detect_backend()).
+"""
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+import numpy as np
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+RUNTIME_BACKENDS = ('keras', 'onnx', 'tflite')
+
+_SUFFIX_BACKENDS = {
+    '.keras': 'keras',
+    '.h5': 'keras',
+    '.onnx': 'onnx',
+    '.tflite': 'tflite'
+}
+
+
+def detect_backend(model_path: Union[str, Path]) -> str:
+    """
+    Suy ra backend từ model file
+
+    INPUT:
+        model_path: Đường dẫn model (file hoặc SavedModel directory)
+    OUTPUT:
+        'keras' | 'onnx' | 'tflite'
+    RAISES:
+        ValueError nếu không nhận ra định dạng
+    """
+    path = Path(model_path)
+    backend = _SUFFIX_BACKENDS.get(path.suffix.lower())
+    if backend is None and (path / "saved_model.pb").exists():
+        backend = 'keras'
+    if backend is None:
+        raise ValueError(f"Cannot detect runtime backend for model file: {path.name}")
+    return backend
+
+
+class ModelRuntime:
+    """
+    Interface chung của các runtime backends
+    """
+
+    backend = ''
+
+    def __init__(self, model_path: Path, num_threads: int = 0):
+        """
+        INPUT:
+            model_path: Đường dẫn model
+            num_threads: Số intra-op threads (0 = mặc định của runtime)
+        """
+        self.model_path = Path(model_path)
+        self.num_threads = num_threads
+
+    def predict(self, inputs: np.ndarray) -> np.ndarray:
+        """
+        Chạy inference cho một batch
+
+        INPUT:
+            inputs: float32 (B, ...) - batch inputs
+        OUTPUT:
+            float32 (B, ...) - output đầu tiên của model
+        """
+        raise NotImplementedError
+
+    def get_info(self) -> Dict[str, Any]:
+        """
+        OUTPUT:
+            {'backend', 'model_path', 'num_threads', 'quantization'}
+        """
+        return {
+            'backend': self.backend,
+            'model_path': str(self.model_path),
+            'num_threads': self.num_threads,
+            'quantization': self.quantization
+        }
+
+    @property
+    def quantization(self) -> Optional[str]:
+        """'int8' | 'fp16' | None (float32) - suy ra từ model khi runtime hỗ trợ"""
+        return None
+
+    def close(self):
+        """Giải phóng model"""
+
+
+class KerasRuntime(ModelRuntime):
+    """
+    Full TensorFlow / Keras model
+    """
+
+    backend = 'keras'
+
+    def __init__(self, model_path: Path, num_threads: int = 0):
+        super().__init__(model_path, num_threads)
+        try:
+            import tensorflow as tf
+        except ImportError:
+            raise ImportError("Runtime backend 'keras' requires tensorflow (pip install tensorflow)")
+
+        if num_threads:
+            try:
+                tf.config.threading.set_intra_op_parallelism_threads(num_threads)
+            except RuntimeError:
+                # TensorFlow already initialized - thread pools are fixed for the process
+                logger.warning("TensorFlow already initialized, intra-op thread count unchanged")
+        self._model = tf.keras.models.load_model(str(self.model_path), compile=False)
+
+    def predict(self, inputs: np.ndarray) -> np.ndarray:
+        outputs = self._model(inputs.astype(np.float32, copy=False), training=False)
+        if isinstance(outputs, (list, tuple)):
+            outputs = outputs[0]
+        return np.asarray(outputs)
+
+    def close(self):
+        self._model = None
+
+
+class OnnxRuntime(ModelRuntime):
+    """
+    ONNX Runtime, CPU execution provider
+    """
+
+    backend = 'onnx'
+
+    def __init__(self, model_path: Path, num_threads: int = 0):
+        super().__init__(model_path, num_threads)
+        try:
+            import onnxruntime as ort
+        except ImportError:
+            raise ImportError("Runtime backend 'onnx' requires onnxruntime (pip install onnxruntime)")
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+            options.inter_op_num_threads = 1
+        self._session = ort.InferenceSession(
+            str(self.model_path), sess_options=options, providers=['CPUExecutionProvider']
+        )
+        model_input = self._session.get_inputs()[0]
+        self._input_name = model_input.name
+        self._input_type = model_input.type
+
+    @property
+    def quantization(self) -> Optional[str]:
+        # Dynamic INT8 quantization keeps float inputs; fp16 models take float16 inputs
+        return 'fp16' if self._input_type == 'tensor(float16)' else None
+
+    def predict(self, inputs: np.ndarray) -> np.ndarray:
+        dtype = np.float16 if self._input_type == 'tensor(float16)' else np.float32
+        outputs = self._session.run(None, {self._input_name: inputs.astype(dtype, copy=False)})
+        return outputs[0].astype(np.float32, copy=False)
+
+    def close(self):
+        self._session = None
+
+
+class TFLiteRuntime(ModelRuntime):
+    """
+    TFLite interpreter (tflite_runtime nếu có, không thì tf.lite)
+
+    Interpreter không thread-safe: predict() được serialize bằng lock; input
+    được resize khi batch size thay đổi.
+    """
+
+    backend = 'tflite'
+
+    def __init__(self, model_path: Path, num_threads: int = 0):
+        super().__init__(model_path, num_threads)
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            try:
+                from tensorflow.lite import Interpreter
+            except ImportError:
+                raise ImportError(
+                    "Runtime backend 'tflite' requires tflite-runtime or tensorflow (pip install tflite-runtime)"
+                )
+
+        self._interpreter = Interpreter(model_path=str(self.model_path), num_threads=num_threads or None)
+        self._interpreter.allocate_tensors()
+        self._input = self._interpreter.get_input_details()[0]
+        self._output = self._interpreter.get_output_details()[0]
+        self._lock = threading.Lock()
+
+    @property
+    def quantization(self) -> Optional[str]:
+        if self._input['dtype'] in (np.int8, np.uint8):
+            return 'int8'
+        if self._input['dtype'] == np.float16:
+            return 'fp16'
+        return None
+
+    def predict(self, inputs: np.ndarray) -> np.ndarray:
+        with self._lock:
+            interpreter = self._interpreter
+            if tuple(self._input['shape']) != inputs.shape:
+                interpreter.resize_tensor_input(self._input['index'], list(inputs.shape))
+                interpreter.allocate_tensors()
+                self._input = interpreter.get_input_details()[0]
+                self._output = interpreter.get_output_details()[0]
+
+            interpreter.set_tensor(self._input['index'], _quantize(inputs, self._input))
+            interpreter.invoke()
+            return _dequantize(interpreter.get_tensor(self._output['index']), self._output)
+
+    def close(self):
+        self._interpreter = None
+
+
+def _quantize(values: np.ndarray, details: Dict[str, Any]) -> np.ndarray:
+    """float32 -> dtype của tensor (INT8 models: theo scale / zero point)"""
+    dtype = details['dtype']
+    scale, zero_point = details['quantization']
+    if dtype in (np.int8, np.uint8) and scale:
+        info = np.iinfo(dtype)
+        return np.clip(np.rint(values / scale + zero_point), info.min, info.max).astype(dtype)
+    return values.astype(dtype, copy=False)
+
+
+def _dequantize(values: np.ndarray, details: Dict[str, Any]) -> np.ndarray:
+    """Output tensor -> float32"""
+    scale, zero_point = details['quantization']
+    if details['dtype'] in (np.int8, np.uint8) and scale:
+        return (values.astype(np.float32) - zero_point) * scale
+    return values.astype(np.float32, copy=False)
+
+
+_RUNTIMES = {
+    'keras': KerasRuntime,
+    'onnx': OnnxRuntime,
+    'tflite': TFLiteRuntime
+}
+
+
+def load_runtime(
+    model_path: Union[str, Path],
+    backend: Optional[str] = None,
+    num_threads: Optional[int] = None
+) -> ModelRuntime:
+    """
+    Load model bằng runtime backend tương ứng
+
+    INPUT:
+        model_path: Đường dẫn model
+        backend: 'keras' | 'onnx' | 'tflite' | None / 'auto'
+            (default: settings.MODEL_RUNTIME_BACKEND, 'auto' = theo model file)
+        num_threads: Số intra-op threads (default: settings.MODEL_RUNTIME_THREADS)
+    OUTPUT:
+        ModelRuntime
+    RAISES:
+        ValueError nếu backend không hỗ trợ
+        ImportError nếu thư viện của backend chưa được cài
+    USAGE:
+        runtime = load_runtime("models/vsl_recognition/model.tflite")
+        probabilities = runtime.predict(features[None])
+    """
+    backend = backend or settings.MODEL_RUNTIME_BACKEND
+    if backend == 'auto':
+        backend = detect_backend(model_path)
+    if backend not in _RUNTIMES:
+        raise ValueError(f"Unsupported runtime backend: {backend}. Supported: {', '.join(RUNTIME_BACKENDS)}")
+    if num_threads is None:
+        num_threads = settings.MODEL_RUNTIME_THREADS
+
+    runtime = _RUNTIMES[backend](Path(model_path), num_threads)
+    logger.info(
+        f"Model loaded with {backend} runtime: {Path(model_path).name} "
+        f"(threads: {num_threads or 'default'}, quantization: {runtime.quantization or 'none'})"
+    )
+    return runtime
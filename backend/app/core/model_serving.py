@@ -0,0 +1,319 @@
+"""
+Model Serving - Hot-swap trained models theo active entry trong TrainedModelRegistry
+
+Mỗi model_type có một loader (do module đăng ký, core không import modules):
+
+    model_server.register('vsl_recognition', loader=load_fn, warmup=warmup_fn)
+
+- Lần đầu dùng: load đồng bộ active model
+- Khi active entry thay đổi (set_active_model trong process, hoặc registry file
+  bị sửa - watcher thread kiểm tra mỗi MODEL_WATCH_INTERVAL giây): load model
+  mới trong background thread, warm-up bằng input giả, rồi swap atomically.
+  Load / warm-up lỗi thì giữ model cũ.
+- Requests đang chạy giữ model cũ tới khi xong (acquire() đếm reference); model
+  cũ được release (close()) khi không còn request nào dùng.
+
+USAGE:
+    with model_server.acquire('vsl_recognition') as model:
+        prediction = model.predict_from_sequence(sequence)
+"""
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from ..config import settings
+from .trained_model_registry import trained_model_registry
+
+logger = logging.getLogger(__name__)
+
+
+class ModelHandle:
+    """
+    Một version model đang được serve, đếm số requests đang dùng
+    """
+
+    def __init__(self, model_type: str, model: Any, entry: Optional[Dict[str, Any]]):
+        self.model_type = model_type
+        self.model = model
+        self.model_id = entry['id'] if entry else None
+        self.loaded_at = time.time()
+        self.refcount = 0
+        self.retired = False
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            self.refcount += 1
+
+    def release(self):
+        with self._lock:
+            self.refcount -= 1
+            idle = self.retired and self.refcount == 0
+        if idle:
+            self._close()
+
+    def retire(self):
+        """Đánh dấu version cũ sau khi swap - close ngay nếu đang rảnh"""
+        with self._lock:
+            self.retired = True
+            idle = self.refcount == 0
+        if idle:
+            self._close()
+
+    def _close(self):
+        model, self.model = self.model, None
+        if model is None:
+            return
+        close = getattr(model, 'close', None)
+        if close is not None:
+            try:
+                close()
+            except Exception as e:
+                logger.error(f"Error releasing {self.model_type} model {self.model_id}: {str(e)}")
+        logger.info(f"Released {self.model_type} model {self.model_id}")
+
+
+class ModelServer:
+    """
+    Registry-driven hot-swap cho các model types đã đăng ký loader
+    """
+
+    def __init__(self, registry=None, watch_interval: Optional[float] = None):
+        """
+        INPUT:
+            registry: TrainedModelRegistry (default: trained_model_registry)
+            watch_interval: Giây giữa 2 lần kiểm tra registry (default:
+                settings.MODEL_WATCH_INTERVAL, 0 = không chạy watcher)
+        """
+        self.registry = registry or trained_model_registry
+        self.watch_interval = settings.MODEL_WATCH_INTERVAL if watch_interval is None else watch_interval
+
+        self._loaders: Dict[str, Callable[[Optional[Dict[str, Any]]], Any]] = {}
+        self._warmups: Dict[str, Optional[Callable[[Any], None]]] = {}
+        self._handles: Dict[str, ModelHandle] = {}
+        self._loading: Dict[str, Optional[str]] = {}
+        self._swaps: Dict[str, int] = {}
+        self._errors: Dict[str, Optional[str]] = {}
+        self._failed: Dict[str, Optional[str]] = {}  # model_id that failed to load (not retried)
+        self._load_locks: Dict[str, threading.Lock] = {}  # first load, per model type
+        self._lock = threading.Lock()
+
+        self._watcher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.registry.add_listener(self._on_registry_change)
+
+    def register(
+        self,
+        model_type: str,
+        loader: Callable[[Optional[Dict[str, Any]]], Any],
+        warmup: Optional[Callable[[Any], None]] = None
+    ):
+        """
+        Đăng ký loader cho một model type
+
+        INPUT:
+            model_type: Loại model trong registry (vd: 'vsl_recognition')
+            loader: Hàm nhận registry entry (None nếu chưa có active model) -> model
+            warmup: Hàm chạy inference giả trên model mới trước khi swap (optional)
+        """
+        self._loaders[model_type] = loader
+        self._warmups[model_type] = warmup
+        self._swaps.setdefault(model_type, 0)
+        self._load_locks.setdefault(model_type, threading.Lock())
+
+    def _current(self, model_type: str) -> ModelHandle:
+        """
+        Handle hiện tại (load đồng bộ lần đầu)
+
+        Loader chạy dưới load lock của model type, không giữ self._lock:
+        get_status() và registry listeners không bị chặn trong lúc load.
+        """
+        handle = self._handles.get(model_type)
+        if handle is None:
+            if model_type not in self._loaders:
+                raise KeyError(f"No model loader registered for '{model_type}'")
+            with self._load_locks[model_type]:
+                handle = self._handles.get(model_type)
+                if handle is None:
+                    entry = self.registry.get_active_model(model_type)
+                    handle = ModelHandle(model_type, self._loaders[model_type](entry), entry)
+                    with self._lock:
+                        self._handles[model_type] = handle
+                    # The active entry may have changed while the first version was loading
+                    self._on_registry_change(model_type)
+        return handle
+
+    @contextmanager
+    def acquire(self, model_type: str) -> Iterator[Any]:
+        """
+        Dùng model hiện tại cho một request (model không bị release trong lúc dùng)
+
+        INPUT:
+            model_type: Loại model
+        OUTPUT:
+            context manager trả về model
+        RAISES:
+            KeyError nếu model type chưa được register()
+        """
+        handle = None
+        while handle is None:
+            with self._lock:
+                handle = self._handles.get(model_type)
+                if handle is not None:
+                    handle.acquire()
+            if handle is None:
+                self._current(model_type)
+        try:
+            yield handle.model
+        finally:
+            handle.release()
+
+    @property
+    def model_types(self):
+        """Các model types đã register()"""
+        return list(self._loaders)
+
+    def preload(self, model_type: str):
+        """
+        Load active model và chạy warm-up (startup - trước request đầu tiên)
+
+        INPUT:
+            model_type: Loại model
+        RAISES:
+            KeyError nếu model type chưa được register(); lỗi của loader / warm-up
+        """
+        warmup = self._warmups.get(model_type)
+        with self.acquire(model_type) as model:
+            if warmup is not None:
+                warmup(model)
+
+    def proxy(self, model_type: str) -> 'ModelProxy':
+        """
+        Object gọi method của model hiện tại (mỗi lời gọi acquire riêng) - dùng
+        cho các objects sống lâu (realtime sessions) để luôn thấy model mới nhất
+        """
+        return ModelProxy(self, model_type)
+
+    def check(self):
+        """
+        Kiểm tra registry và bắt đầu reload các model types có active entry mới
+        """
+        self.registry.reload_if_changed()
+        for model_type in list(self._loaders):
+            self._on_registry_change(model_type)
+
+    def _on_registry_change(self, model_type: str):
+        """Reload trong background nếu active entry khác version đang serve"""
+        if model_type not in self._loaders:
+            return
+        entry = self.registry.get_active_model(model_type)
+        model_id = entry['id'] if entry else None
+        with self._lock:
+            handle = self._handles.get(model_type)
+            if handle is None or handle.model_id == model_id or self._failed.get(model_type, '') == model_id:
+                return
+            if model_type in self._loading:
+                # Another version is loading - checked again once it finishes
+                return
+            self._loading[model_type] = model_id
+
+        threading.Thread(
+            target=self._reload, args=(model_type, entry),
+            name=f"model-load-{model_type}", daemon=True
+        ).start()
+
+    def _reload(self, model_type: str, entry: Optional[Dict[str, Any]]):
+        """Load + warm-up model mới, rồi swap (chạy trong background thread)"""
+        model_id = entry['id'] if entry else None
+        started_at = time.time()
+        try:
+            model = self._loaders[model_type](entry)
+            warmup = self._warmups.get(model_type)
+            if warmup is not None:
+                warmup(model)
+        except Exception as e:
+            logger.error(f"Error loading {model_type} model {model_id}, keeping current version: {str(e)}")
+            with self._lock:
+                self._errors[model_type] = str(e)
+                self._failed[model_type] = model_id
+                self._loading.pop(model_type, None)
+            self._on_registry_change(model_type)
+            return
+
+        with self._lock:
+            old = self._handles.get(model_type)
+            self._handles[model_type] = ModelHandle(model_type, model, entry)
+            self._swaps[model_type] += 1
+            self._errors[model_type] = None
+            self._failed.pop(model_type, None)
+            self._loading.pop(model_type, None)
+        if old is not None:
+            old.retire()
+        logger.info(f"Swapped {model_type} model to {model_id} (load + warm-up: {time.time() - started_at:.2f}s)")
+
+        # The active entry may have changed again while this version was loading
+        self._on_registry_change(model_type)
+
+    def start(self):
+        """Khởi động watcher thread (no-op nếu watch_interval = 0)"""
+        if self.watch_interval <= 0 or self._watcher is not None:
+            return
+        self._stop.clear()
+        self._watcher = threading.Thread(target=self._watch, name="model-watcher", daemon=True)
+        self._watcher.start()
+        logger.info(f"Model registry watcher started (interval: {self.watch_interval}s)")
+
+    def _watch(self):
+        while not self._stop.wait(self.watch_interval):
+            try:
+                self.check()
+            except Exception as e:
+                logger.error(f"Error checking model registry: {str(e)}")
+
+    def stop(self):
+        """Dừng watcher thread"""
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join(timeout=5)
+            self._watcher = None
+
+    def get_status(self) -> Dict[str, Dict[str, Any]]:
+        """
+        OUTPUT:
+            {model_type: {'model_id', 'loaded_at', 'in_flight', 'loading', 'swaps', 'last_error'}}
+        """
+        with self._lock:
+            return {
+                model_type: {
+                    'model_id': handle.model_id if handle else None,
+                    'loaded_at': handle.loaded_at if handle else None,
+                    'in_flight': handle.refcount if handle else 0,
+                    'loading': model_type in self._loading,
+                    'swaps': self._swaps.get(model_type, 0),
+                    'last_error': self._errors.get(model_type)
+                }
+                for model_type in self._loaders
+                for handle in [self._handles.get(model_type)]
+            }
+
+
+class ModelProxy:
+    """
+    Forward method calls tới model đang được serve (xem ModelServer.proxy())
+    """
+
+    def __init__(self, server: ModelServer, model_type: str):
+        self._server = server
+        self._model_type = model_type
+
+    def __getattr__(self, name: str):
+        def call(*args, **kwargs):
+            with self._server.acquire(self._model_type) as model:
+                return getattr(model, name)(*args, **kwargs)
+        return call
+
+
+# Global model server
+model_server = ModelServer()
@@ -0,0 +1,130 @@
+"""
+Inference Resolution - Downscale frames trước khi đưa vào MediaPipe
+
+MediaPipe trả về toạ độ normalized [0, 1] nên downscale không cần map lại
+landmarks; palm detector / landmark model tự resize về 192-256px bên trong,
+vì vậy convert màu + đưa frame 1080p vào graph chỉ tốn thêm chi phí.
+
+- downscale_for_inference(): resize về target width (không bao giờ upscale)
+- InferenceResolution: width cố định hoặc adaptive theo latency budget
+  (giảm width khi latency vượt budget, tăng lại khi còn dư)
+"""
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from .utils import resize_image
+
+logger = logging.getLogger(__name__)
+
+
+def downscale_for_inference(image: np.ndarray, width: Optional[int]) -> Tuple[np.ndarray, float]:
+    """
+    Resize image về width (giữ tỷ lệ) nếu image rộng hơn
+
+    INPUT:
+        image: numpy array (H, W, C)
+        width: Target width, None/0 = giữ nguyên
+    OUTPUT:
+        (image, scale) - scale = width mới / width gốc (<= 1.0)
+    """
+    image_width = image.shape[1]
+    if not width or image_width <= width:
+        return image, 1.0
+    return resize_image(image, width=width), width / image_width
+
+
+class InferenceResolution:
+    """
+    Inference width của một realtime session
+
+    Adaptive mode: latency mỗi frame được làm mượt bằng EMA; EMA > budget thì
+    width giảm theo step, EMA < headroom * budget thì width tăng lại. Mỗi lần
+    đổi width phải cách nhau ít nhất cooldown frames để EMA ổn định.
+    """
+
+    def __init__(
+        self,
+        width: int,
+        adaptive: bool = False,
+        latency_budget: float = 0.05,
+        min_width: int = 256,
+        step: float = 0.8,
+        headroom: float = 0.6,
+        cooldown: int = 10,
+        smoothing: float = 0.2
+    ):
+        """
+        INPUT:
+            width: Width ban đầu (cũng là width tối đa), 0 = không resize
+            adaptive: Tự điều chỉnh width theo latency
+            latency_budget: Latency mục tiêu mỗi frame (giây)
+            min_width: Width nhỏ nhất khi adaptive
+            step: Hệ số nhân width khi giảm (chia khi tăng)
+            headroom: Tăng width khi latency < headroom * budget
+            cooldown: Số frames tối thiểu giữa 2 lần đổi width
+            smoothing: Hệ số EMA của latency
+        """
+        self.max_width = width
+        self.width = width
+        self.adaptive = adaptive and width > 0
+        self.latency_budget = latency_budget
+        self.min_width = min(min_width, width) if width else min_width
+        self.step = step
+        self.headroom = headroom
+        self.cooldown = cooldown
+        self.smoothing = smoothing
+
+        self.latency: Optional[float] = None
+        self._frames_since_change = 0
+
+    def apply(self, image: np.ndarray) -> Tuple[np.ndarray, float]:
+        """
+        Downscale image theo width hiện tại
+
+        OUTPUT:
+            (image, scale) - xem downscale_for_inference()
+        """
+        return downscale_for_inference(image, self.width)
+
+    def record(self, latency: float):
+        """
+        Ghi nhận latency của một frame và điều chỉnh width (adaptive mode)
+
+        INPUT:
+            latency: Thời gian xử lý frame (giây)
+        """
+        if not self.adaptive:
+            return
+
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency += self.smoothing * (latency - self.latency)
+
+        self._frames_since_change += 1
+        if self._frames_since_change < self.cooldown:
+            return
+
+        if self.latency > self.latency_budget and self.width > self.min_width:
+            new_width = max(self.min_width, int(self.width * self.step))
+        elif self.latency < self.headroom * self.latency_budget and self.width < self.max_width:
+            new_width = min(self.max_width, int(round(self.width / self.step)))
+        else:
+            return
+
+        logger.debug(f"Inference width {self.width} -> {new_width} (latency {self.latency * 1000:.1f}ms)")
+        self.width = new_width
+        self._frames_since_change = 0
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        OUTPUT:
+            {'width', 'adaptive', 'latency_ms'}
+        """
+        return {
+            'width': self.width,
+            'adaptive': self.adaptive,
+            'latency_ms': round(self.latency * 1000, 2) if self.latency is not None else None
+        }
@@ -0,0 +1,164 @@
+"""
+Telemetry - Debug logging có sampling cho các hot paths (realtime frames, HTTP requests)
+
+Log mỗi frame ở 30 fps x N clients tốn CPU (format string) và disk I/O đáng kể.
+Thay vào đó:
+- FrameTelemetry (mỗi realtime session): chỉ log 1 trong sample_every frames,
+  và không quá max_per_second dòng/giây cho mỗi session
+- Log dạng key=value với lazy %-formatting: message chỉ được format khi thực
+  sự được ghi
+- Bật/tắt và chỉnh tham số lúc runtime qua telemetry.configure()
+  (endpoint /telemetry trong main.py), không cần restart
+
+Khi tắt, chi phí mỗi frame chỉ là một lần kiểm tra attribute.
+"""
+import itertools
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from ..config import settings
+
+logger = logging.getLogger("app.telemetry")
+
+
+class Telemetry:
+    """
+    Cấu hình telemetry dùng chung (thay đổi được lúc runtime)
+
+    - enabled: Bật sampled frame telemetry
+    - sample_every: Log 1 trong N frames của mỗi session
+    - max_per_second: Số dòng log tối đa mỗi giây của một session
+    - request_logging: Log một dòng cho mỗi HTTP request (middleware)
+    """
+
+    def __init__(self):
+        self.enabled = settings.TELEMETRY_ENABLED
+        self.sample_every = settings.TELEMETRY_SAMPLE_EVERY
+        self.max_per_second = settings.TELEMETRY_MAX_PER_SECOND
+        self.request_logging = settings.REQUEST_LOGGING
+        self._session_ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def configure(
+        self,
+        enabled: Optional[bool] = None,
+        sample_every: Optional[int] = None,
+        max_per_second: Optional[float] = None,
+        request_logging: Optional[bool] = None
+    ) -> Dict[str, Any]:
+        """
+        Cập nhật cấu hình (các tham số None giữ nguyên)
+
+        OUTPUT:
+            dict - Cấu hình sau khi cập nhật (xem get_status())
+        RAISES:
+            ValueError nếu sample_every < 1 hoặc max_per_second <= 0
+        """
+        if sample_every is not None and sample_every < 1:
+            raise ValueError("sample_every must be >= 1")
+        if max_per_second is not None and max_per_second <= 0:
+            raise ValueError("max_per_second must be > 0")
+
+        with self._lock:
+            if enabled is not None:
+                self.enabled = enabled
+            if sample_every is not None:
+                self.sample_every = sample_every
+            if max_per_second is not None:
+                self.max_per_second = max_per_second
+            if request_logging is not None:
+                self.request_logging = request_logging
+
+        logger.info(
+            "telemetry configured enabled=%s sample_every=%d max_per_second=%s request_logging=%s",
+            self.enabled, self.sample_every, self.max_per_second, self.request_logging
+        )
+        return self.get_status()
+
+    def frame_telemetry(self, channel: str) -> 'FrameTelemetry':
+        """
+        Tạo FrameTelemetry cho một realtime session
+
+        INPUT:
+            channel: Tên luồng (vd: 'hand_tracking')
+        OUTPUT:
+            FrameTelemetry
+        """
+        return FrameTelemetry(self, channel, next(self._session_ids))
+
+    def get_status(self) -> Dict[str, Any]:
+        """
+        OUTPUT:
+            {'enabled', 'sample_every', 'max_per_second', 'request_logging'}
+        """
+        return {
+            'enabled': self.enabled,
+            'sample_every': self.sample_every,
+            'max_per_second': self.max_per_second,
+            'request_logging': self.request_logging
+        }
+
+
+class FrameTelemetry:
+    """
+    Sampled frame logging của một realtime session (không thread-safe - mỗi
+    session xử lý frames tuần tự)
+    """
+
+    __slots__ = ('_config', 'channel', 'session_id', 'frame_count', 'logged_count', '_last_logged')
+
+    def __init__(self, config: Telemetry, channel: str, session_id: int):
+        self._config = config
+        self.channel = channel
+        self.session_id = session_id
+        self.frame_count = 0
+        self.logged_count = 0
+        self._last_logged = 0.0
+
+    def should_log(self) -> bool:
+        """
+        Đếm frame và quyết định có log frame này không
+
+        OUTPUT:
+            True nếu telemetry bật, frame rơi vào sample và chưa vượt rate limit
+        """
+        self.frame_count += 1
+        config = self._config
+        if not config.enabled or self.frame_count % config.sample_every:
+            return False
+
+        now = time.monotonic()
+        if now - self._last_logged < 1.0 / config.max_per_second:
+            return False
+        self._last_logged = now
+        self.logged_count += 1
+        return True
+
+    def record(self, result: Dict[str, Any]):
+        """
+        Log một realtime response nếu được sample
+
+        INPUT:
+            result: dict - response (success, hands_detected, processing_time,
+                inference_scale, frames_dropped, error)
+        """
+        if not self.should_log():
+            return
+        logger.info(
+            "%s session=%d frame=%d success=%s hands=%s processing_ms=%.1f inference_scale=%s dropped=%s error=%s",
+            self.channel,
+            self.session_id,
+            self.frame_count,
+            result.get('success'),
+            result.get('hands_detected'),
+            (result.get('processing_time') or 0.0) * 1000,
+            result.get('inference_scale'),
+            result.get('frames_dropped'),
+            result.get('error')
+        )
+
+
+# Global telemetry configuration
+telemetry = Telemetry()
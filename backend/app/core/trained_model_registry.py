@@ -6,9 +6,10 @@ Module này quản lý việc lưu trữ, tải và tracking các trained models
 import json
 import logging
 from pathlib import Path
-from typing import Optional, Dict, List, Any
+from typing import Callable, Optional, Dict, List, Any
 from datetime import datetime
 from ..config import settings
+from .model_runtime import detect_backend
 
 logger = logging.getLogger(__name__)
 
@@ -31,7 +32,52 @@ class TrainedModelRegistry:
             registry_path = settings.MODELS_DIR / "model_registry.json"
 
         self.registry_path = registry_path
+        self._mtime = self._file_mtime()
         self.registry = self._load_registry()
+        self._listeners: List[Callable[[str], None]] = []
+
+    def _file_mtime(self) -> Optional[float]:
+        try:
+            return self.registry_path.stat().st_mtime
+        except OSError:
+            return None
+
+    def reload_if_changed(self) -> bool:
+        """
+        Load lại registry nếu file bị thay đổi từ bên ngoài (process / tool khác)
+
+        OUTPUT:
+            True nếu registry được load lại
+        """
+        mtime = self._file_mtime()
+        if mtime == self._mtime:
+            return False
+        self._mtime = mtime
+        self.registry = self._load_registry()
+        logger.info("Model registry reloaded from disk")
+        return True
+
+    def add_listener(self, callback: Callable[[str], None]):
+        """
+        Đăng ký callback(model_type) được gọi khi active model của một type thay đổi
+
+        Được gọi sau set_active_model(), register_model(is_active=True) và
+        delete_model() của active model. Các thay đổi từ process khác được phát
+        hiện qua reload_if_changed() (_save_registry() cập nhật mtime nên
+        watcher bỏ qua các lần ghi của chính process này).
+
+        INPUT:
+            callback: Hàm nhận model_type (phải nhanh - chạy trong thread thay đổi registry)
+        """
+        self._listeners.append(callback)
+
+    def _notify(self, model_type: str):
+        """Báo cho listeners rằng active model của model_type đã thay đổi"""
+        for callback in self._listeners:
+            try:
+                callback(model_type)
+            except Exception as e:
+                logger.error(f"Error in registry listener: {str(e)}")
 
     def _load_registry(self) -> Dict:
         """
@@ -62,6 +108,7 @@ class TrainedModelRegistry:
             self.registry_path.parent.mkdir(parents=True, exist_ok=True)
             with open(self.registry_path, 'w', encoding='utf-8') as f:
                 json.dump(self.registry, f, indent=2, ensure_ascii=False)
+            self._mtime = self._file_mtime()
         except Exception as e:
             logger.error(f"Error saving registry: {str(e)}")
             raise
@@ -85,8 +132,10 @@ class TrainedModelRegistry:
             model_type: Loại model ("vsl_recognition", "gesture", "emotion", etc.)
             model_path: Đường dẫn đến model file
             metrics: Dictionary chứa metrics (accuracy, f1_score, etc.)
-            is_active: Model có đang active không
-            metadata: Thông tin bổ sung
+            is_active: Model có đang active không (True: deactivate các models
+                khác cùng type, như set_active_model)
+            metadata: Thông tin bổ sung. 'backend' (runtime: keras | onnx | tflite,
+                xem model_runtime.py) được suy ra từ model file nếu không có
         OUTPUT:
             {
                 'success': bool,
@@ -97,6 +146,13 @@ class TrainedModelRegistry:
         try:
             model_id = f"{model_name}_{model_version}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
 
+            metadata = dict(metadata or {})
+            if 'backend' not in metadata:
+                try:
+                    metadata['backend'] = detect_backend(model_path)
+                except ValueError:
+                    logger.warning(f"Unknown runtime backend for {model_path}, loaded with MODEL_RUNTIME_BACKEND")
+
             model_entry = {
                 "id": model_id,
                 "model_name": model_name,
@@ -105,14 +161,20 @@ class TrainedModelRegistry:
                 "model_path": model_path,
                 "metrics": metrics or {},
                 "is_active": is_active,
-                "metadata": metadata or {},
+                "metadata": metadata,
                 "created_at": datetime.now().isoformat()
             }
 
+            if is_active:
+                for model in self.registry["models"]:
+                    if model["model_type"] == model_type:
+                        model["is_active"] = False
             self.registry["models"].append(model_entry)
             self._save_registry()
 
             logger.info(f"Model registered: {model_id}")
+            if is_active:
+                self._notify(model_type)
             return {
                 "success": True,
                 "model_id": model_id,
@@ -197,6 +259,7 @@ class TrainedModelRegistry:
             self._save_registry()
 
             logger.info(f"Model {model_id} set as active")
+            self._notify(target_model["model_type"])
             return {
                 "success": True,
                 "message": f"Model {model_id} is now active"
@@ -255,17 +318,20 @@ class TrainedModelRegistry:
                 'success': bool,
                 'message': str
             }
-        NOTE: Chỉ xóa registry entry, không xóa model file
+        NOTE: Chỉ xóa registry entry, không xóa model file. Xóa active model
+            thì type đó không còn active model (listeners được báo)
         """
         try:
-            initial_count = len(self.registry["models"])
+            deleted = self.get_model(model_id)
             self.registry["models"] = [
                 m for m in self.registry["models"] if m["id"] != model_id
             ]
 
-            if len(self.registry["models"]) < initial_count:
+            if deleted is not None:
                 self._save_registry()
                 logger.info(f"Model {model_id} removed from registry")
+                if deleted["is_active"]:
+                    self._notify(deleted["model_type"])
                 return {
                     "success": True,
                     "message": f"Model {model_id} removed successfully"
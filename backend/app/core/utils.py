@@ -3,17 +3,43 @@ Core Utility Functions
 Các hàm tiện ích dùng chung cho toàn bộ ứng dụng
 """
 import os
-import cv2
 import numpy as np
 import logging
+import queue
+import threading
 from pathlib import Path
-from typing import Optional, Tuple, Union
+from typing import TYPE_CHECKING, Iterator, NamedTuple, Optional, Tuple, Union
 from datetime import datetime
 import hashlib
 import json
 
+from fastapi import UploadFile
+from starlette.concurrency import run_in_threadpool
+
+from ..config import settings
+
+if TYPE_CHECKING:
+    import cv2  # imported lazily at runtime (heavy, not needed by most endpoints)
+
 logger = logging.getLogger(__name__)
 
+# Đánh dấu decoder thread đã đọc hết video
+_END_OF_VIDEO = object()
+
+# Kích thước mỗi chunk khi ghi upload xuống disk
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+class UploadTooLargeError(ValueError):
+    """Upload vượt quá giới hạn kích thước (settings.MAX_UPLOAD_SIZE)"""
+
+
+class SavedUpload(NamedTuple):
+    """Kết quả lưu upload xuống disk"""
+    path: str
+    sha256: str  # Hex digest của nội dung file
+    size: int  # bytes
+
 
 def validate_file_extension(filename: str, allowed_extensions: set) -> bool:
     """
@@ -76,6 +102,69 @@ def save_uploaded_file(file_content: bytes, filename: str, save_dir: Path) -> st
         raise
 
 
+async def save_upload_stream(
+    upload: UploadFile,
+    save_dir: Path,
+    max_size: Optional[int] = None
+) -> SavedUpload:
+    """
+    Ghi uploaded file xuống disk theo từng chunk (không đọc hết vào bộ nhớ)
+
+    Nội dung được hash SHA-256 trong lúc ghi. Upload vượt max_size bị huỷ
+    ngay khi vượt giới hạn và file dở dang bị xoá.
+
+    INPUT:
+        upload: FastAPI UploadFile
+        save_dir: Thư mục lưu file
+        max_size: Kích thước tối đa (bytes, default: settings.MAX_UPLOAD_SIZE)
+    OUTPUT:
+        SavedUpload(path, sha256, size)
+    RAISES:
+        UploadTooLargeError nếu file vượt quá max_size
+        Exception nếu không lưu được file
+    USAGE:
+        saved = await save_upload_stream(file, settings.RAW_DATA_DIR / "videos")
+        result = await inference_executor.run(service.recognize_from_video, saved.path)
+    """
+    if max_size is None:
+        max_size = settings.MAX_UPLOAD_SIZE
+
+    # Reject early when the client declared the size
+    if upload.size is not None and upload.size > max_size:
+        raise UploadTooLargeError(f"Maximum size: {max_size / (1024*1024):.0f}MB")
+
+    return await run_in_threadpool(_copy_upload_to_disk, upload.file, upload.filename, save_dir, max_size)
+
+
+def _copy_upload_to_disk(source, filename: str, save_dir: Path, max_size: int) -> SavedUpload:
+    """Copy file object vào save_dir theo chunks (blocking - chạy trên threadpool)"""
+    save_dir.mkdir(parents=True, exist_ok=True)
+    file_path = save_dir / generate_unique_filename(filename)
+    digest = hashlib.sha256()
+    size = 0
+
+    try:
+        with open(file_path, "wb") as f:
+            while True:
+                chunk = source.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+
+                size += len(chunk)
+                if size > max_size:
+                    raise UploadTooLargeError(f"Maximum size: {max_size / (1024*1024):.0f}MB")
+
+                digest.update(chunk)
+                f.write(chunk)
+    except Exception as e:
+        file_path.unlink(missing_ok=True)
+        logger.error(f"Error saving upload {filename}: {str(e)}")
+        raise
+
+    logger.info(f"File saved: {file_path} ({size} bytes)")
+    return SavedUpload(str(file_path), digest.hexdigest(), size)
+
+
 def load_image(image_path: Union[str, Path]) -> Optional[np.ndarray]:
     """
     Load image từ file
@@ -85,6 +174,7 @@ def load_image(image_path: Union[str, Path]) -> Optional[np.ndarray]:
     OUTPUT:
         numpy array (BGR format) hoặc None nếu lỗi
     """
+    import cv2
     try:
         image = cv2.imread(str(image_path))
         if image is None:
@@ -106,6 +196,7 @@ def save_image(image: np.ndarray, save_path: Union[str, Path]) -> bool:
     OUTPUT:
         bool: True nếu lưu thành công
     """
+    import cv2
     try:
         Path(save_path).parent.mkdir(parents=True, exist_ok=True)
         success = cv2.imwrite(str(save_path), image)
@@ -135,6 +226,7 @@ def resize_image(
         numpy array: Image đã resize
     NOTE: Phải cung cấp ít nhất width hoặc height
     """
+    import cv2
     h, w = image.shape[:2]
 
     if width is None and height is None:
@@ -151,42 +243,198 @@ def resize_image(
     return cv2.resize(image, (width, height), interpolation=cv2.INTER_AREA)
 
 
-def extract_frames_from_video(
+def iter_sampled_frames(
+    cap: 'cv2.VideoCapture',
+    sample_rate: int = 1,
+    start_frame: int = 0,
+    stop_frame: Optional[int] = None,
+    seek_threshold: Optional[int] = None
+) -> Iterator[Tuple[int, np.ndarray]]:
+    """
+    Duyệt các frames được sample (frame_index % sample_rate == 0) của video
+
+    Frames bị bỏ qua chỉ được grab() (demux, không decode/convert màu), chỉ
+    frames được giữ lại mới retrieve(). Khi khoảng cách tới frame sample tiếp
+    theo >= seek_threshold, seek thẳng tới đó (decoder bắt đầu lại từ keyframe
+    gần nhất) thay vì grab từng frame.
+
+    INPUT:
+        cap: cv2.VideoCapture đã mở
+        sample_rate: Lấy 1 frame mỗi N frames
+        start_frame: Frame bắt đầu (seek tới vị trí này nếu > 0)
+        stop_frame: Frame kết thúc (không bao gồm), None = hết video
+        seek_threshold: Số frames tối thiểu để seek thay vì grab
+            (default: settings.VIDEO_SEEK_THRESHOLD, 0 = không seek)
+    OUTPUT:
+        Iterator of (frame_index, frame BGR)
+    """
+    import cv2
+    if seek_threshold is None:
+        seek_threshold = settings.VIDEO_SEEK_THRESHOLD
+
+    if start_frame > 0:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+
+    frame_index = start_frame
+    while stop_frame is None or frame_index < stop_frame:
+        if frame_index % sample_rate == 0:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            yield frame_index, frame
+            frame_index += 1
+            continue
+
+        next_sample = frame_index + sample_rate - frame_index % sample_rate
+        if seek_threshold and next_sample - frame_index >= seek_threshold:
+            # Skip ahead without demuxing the frames in between
+            cap.set(cv2.CAP_PROP_POS_FRAMES, next_sample)
+            frame_index = next_sample
+        else:
+            if not cap.grab():
+                break
+            frame_index += 1
+
+
+class VideoFrame(NamedTuple):
+    """Một frame được sample từ video"""
+    index: int  # Số thứ tự frame trong video
+    timestamp: float  # Thời điểm trong video (seconds)
+    image: np.ndarray  # BGR
+
+
+def iter_video_frames(
     video_path: Union[str, Path],
     sample_rate: int = 1,
-    max_frames: Optional[int] = None
-) -> list:
+    max_frames: Optional[int] = None,
+    resize_width: Optional[int] = None,
+    prefetch: Optional[int] = None
+) -> Iterator[VideoFrame]:
     """
-    Trích xuất frames từ video
+    Duyệt frames của video (streaming, bộ nhớ không phụ thuộc độ dài video)
+
+    Với prefetch > 0, một decoder thread decode trước tối đa `prefetch` frames
+    vào bounded queue trong khi caller đang xử lý frame hiện tại.
 
     INPUT:
         video_path: Đường dẫn đến video file
         sample_rate: Lấy 1 frame mỗi N frames (default: 1 = lấy tất cả)
         max_frames: Số frames tối đa (optional)
+        resize_width: Resize frames về width này, giữ tỷ lệ (optional)
+        prefetch: Số frames decode trước (default: settings.VIDEO_PREFETCH_FRAMES,
+            0 = decode trên thread của caller)
     OUTPUT:
-        list of numpy arrays (frames)
+        Iterator of VideoFrame(index, timestamp, image)
     RAISES:
-        Exception nếu không đọc được video
+        ValueError nếu không mở được video (khi bắt đầu duyệt)
+    USAGE:
+        for frame in iter_video_frames(path, sample_rate=5, resize_width=640):
+            landmarks = model_manager.extract_holistic_landmarks(frame.image)
     """
+    if prefetch is None:
+        prefetch = settings.VIDEO_PREFETCH_FRAMES
+
+    frames = _decode_video_frames(video_path, sample_rate, max_frames, resize_width)
+    if prefetch > 0:
+        frames = _prefetch_frames(frames, prefetch)
+    return frames
+
+
+def _decode_video_frames(
+    video_path: Union[str, Path],
+    sample_rate: int,
+    max_frames: Optional[int],
+    resize_width: Optional[int]
+) -> Iterator[VideoFrame]:
+    """Decode và sample frames trên thread hiện tại"""
+    import cv2
+    cap = cv2.VideoCapture(str(video_path))
+    if not cap.isOpened():
+        raise ValueError(f"Cannot open video file: {video_path}")
+
     try:
-        cap = cv2.VideoCapture(str(video_path))
-        frames = []
-        frame_count = 0
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        for count, (index, frame) in enumerate(iter_sampled_frames(cap, sample_rate), start=1):
+            if resize_width and frame.shape[1] != resize_width:
+                frame = resize_image(frame, width=resize_width)
 
-        while True:
-            ret, frame = cap.read()
-            if not ret:
+            yield VideoFrame(index, index / fps if fps > 0 else 0.0, frame)
+
+            if max_frames and count >= max_frames:
                 break
+    finally:
+        cap.release()
 
-            if frame_count % sample_rate == 0:
-                frames.append(frame)
 
-                if max_frames and len(frames) >= max_frames:
-                    break
+def _prefetch_frames(frames: Iterator[VideoFrame], prefetch: int) -> Iterator[VideoFrame]:
+    """
+    Chạy iterator `frames` trên decoder thread, giữ tối đa `prefetch` frames
+
+    Caller dừng sớm (break / close generator) thì decoder thread cũng dừng.
+    Exception trong decoder thread được raise lại ở phía caller.
+    """
+    buffer = queue.Queue(maxsize=prefetch)
+    stopped = threading.Event()
+
+    def put(item) -> bool:
+        while not stopped.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def decode():
+        try:
+            for frame in frames:
+                if not put(frame):
+                    return
+            put(_END_OF_VIDEO)
+        except Exception as e:
+            put(e)
+        finally:
+            frames.close()
+
+    decoder = threading.Thread(target=decode, name="video-decoder", daemon=True)
+    decoder.start()
+    try:
+        while True:
+            item = buffer.get()
+            if item is _END_OF_VIDEO:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stopped.set()
+        decoder.join()
 
-            frame_count += 1
 
-        cap.release()
+def extract_frames_from_video(
+    video_path: Union[str, Path],
+    sample_rate: int = 1,
+    max_frames: Optional[int] = None
+) -> list:
+    """
+    Trích xuất frames từ video
+
+    NOTE: Giữ toàn bộ frames trong bộ nhớ - với video dài dùng iter_video_frames()
+
+    INPUT:
+        video_path: Đường dẫn đến video file
+        sample_rate: Lấy 1 frame mỗi N frames (default: 1 = lấy tất cả)
+        max_frames: Số frames tối đa (optional)
+    OUTPUT:
+        list of numpy arrays (frames)
+    RAISES:
+        Exception nếu không đọc được video
+    """
+    try:
+        frames = [
+            frame.image
+            for frame in iter_video_frames(video_path, sample_rate, max_frames, prefetch=0)
+        ]
         logger.info(f"Extracted {len(frames)} frames from video")
         return frames
     except Exception as e:
@@ -209,6 +457,7 @@ def get_video_info(video_path: Union[str, Path]) -> dict:
             'duration': float (seconds)
         }
     """
+    import cv2
     try:
         cap = cv2.VideoCapture(str(video_path))
 
@@ -241,6 +490,7 @@ def calculate_distance(point1: dict, point2: dict) -> float:
         point2: {'x': float, 'y': float, 'z': float}
     OUTPUT:
         float: Khoảng cách
+    NOTE: Với nhiều điểm / cả sequence dùng core/geometry.py (vectorized)
     """
     dx = point1['x'] - point2['x']
     dy = point1['y'] - point2['y']
@@ -257,6 +507,7 @@ def normalize_landmarks(landmarks: list, reference_point: Optional[dict] = None)
         reference_point: Điểm tham chiếu (optional, default: điểm đầu tiên)
     OUTPUT:
         list: Normalized landmarks
+    NOTE: Với arrays (T, N, 3) dùng core/geometry.py::normalize_to_reference
     """
     if not landmarks:
         return []
@@ -0,0 +1,113 @@
+"""
+Startup Warm-up - Tạo sẵn MediaPipe graphs và served models trước request đầu tiên
+
+Graph construction + TFLite delegate setup tốn vài trăm ms mỗi graph; nếu để
+lazy thì frame realtime / video đầu tiên sau deploy phải chịu. Warm-up chạy
+trong background thread lúc startup (app vẫn trả lời /health), lần lượt:
+
+- Graphs trong settings.WARMUP_GRAPHS (hands: HANDS_POOL_MIN_SIZE graphs trong pool)
+- Các models đã đăng ký với model_server (load active model + warm-up)
+
+Mỗi bước chạy một frame / input giả. Trạng thái được báo qua /ready
+(503 tới khi mọi bước thành công).
+"""
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class StartupWarmup:
+    """
+    Các bước warm-up lúc startup và readiness state
+    """
+
+    def __init__(self):
+        self.state = 'pending'  # pending | running | ready | failed
+        self.steps: List[Dict[str, Any]] = []
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.state == 'ready'
+
+    def _plan(self) -> List[Tuple[str, Callable[[], Any]]]:
+        """Danh sách (tên bước, hàm) theo cấu hình"""
+        from .model_manager import model_manager
+        from .model_serving import model_server
+
+        graphs = [name.strip() for name in settings.WARMUP_GRAPHS.split(',') if name.strip()]
+        steps = [(f"graph:{name}", lambda name=name: model_manager.warmup_graph(name)) for name in graphs]
+        steps += [
+            (f"model:{model_type}", lambda model_type=model_type: model_server.preload(model_type))
+            for model_type in model_server.model_types
+        ]
+        return steps
+
+    def start(self):
+        """
+        Chạy warm-up trong background thread (hoặc đánh dấu ready ngay nếu
+        settings.STARTUP_WARMUP tắt)
+        """
+        if not settings.STARTUP_WARMUP:
+            self.state = 'ready'
+            self.started_at = self.finished_at = time.time()
+            return
+        self.state = 'running'
+        self._thread = threading.Thread(target=self.run, name="startup-warmup", daemon=True)
+        self._thread.start()
+
+    def run(self):
+        """Chạy tuần tự các bước warm-up (bước lỗi không chặn các bước sau)"""
+        self.state = 'running'
+        self.started_at = time.time()
+        self.steps = []
+        failed = False
+
+        for name, step in self._plan():
+            started_at = time.perf_counter()
+            record = {'name': name, 'success': True, 'duration_ms': 0.0, 'error': None}
+            try:
+                step()
+            except Exception as e:
+                logger.error(f"Warm-up step {name} failed: {str(e)}")
+                record['success'] = False
+                record['error'] = str(e)
+                failed = True
+            record['duration_ms'] = round((time.perf_counter() - started_at) * 1000, 1)
+            self.steps.append(record)
+
+        self.finished_at = time.time()
+        self.state = 'failed' if failed else 'ready'
+        logger.info(f"Startup warm-up {self.state} in {self.finished_at - self.started_at:.2f}s ({len(self.steps)} steps)")
+
+    def wait(self, timeout: Optional[float] = None):
+        """Chờ warm-up thread kết thúc (shutdown)"""
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def get_status(self) -> Dict[str, Any]:
+        """
+        OUTPUT:
+            {'ready', 'state', 'steps': [{'name', 'success', 'duration_ms', 'error'}],
+             'duration': float seconds hoặc None}
+        """
+        duration = None
+        if self.started_at is not None and self.finished_at is not None:
+            duration = round(self.finished_at - self.started_at, 3)
+        return {
+            'ready': self.ready,
+            'state': self.state,
+            'steps': list(self.steps),
+            'duration': duration
+        }
+
+
+# Global startup warm-up
+startup_warmup = StartupWarmup()
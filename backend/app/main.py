@@ -4,15 +4,17 @@ VSL Application Backend
 
 Ứng dụng AI hỗ trợ người khiếm thính giao tiếp qua ngôn ngữ VSL
 """
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
 import logging
 import time
 from pathlib import Path
+from typing import Optional
 
 from .config import settings
+from .core.telemetry import telemetry
 from .database.db import init_db, engine
 from .database import models
 
@@ -53,16 +55,16 @@ app.add_middleware(
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
     """
-    Log all incoming requests và response time
+    Log incoming requests và response time (một dòng, lazy formatting;
+    tắt lúc runtime qua /telemetry)
     """
     start_time = time.time()
 
-    logger.info(f"Request: {request.method} {request.url.path}")
-
     response = await call_next(request)
 
     process_time = time.time() - start_time
-    logger.info(f"Completed in {process_time:.3f}s - Status: {response.status_code}")
+    if telemetry.request_logging:
+        logger.info("%s %s - %d in %.3fs", request.method, request.url.path, response.status_code, process_time)
 
     response.headers["X-Process-Time"] = str(process_time)
     return response
@@ -93,14 +95,26 @@ async def startup_event():
     """
     logger.info("Starting VSL Application Backend...")
 
+    # Create necessary directories (before the SQLite database file is created)
+    settings.create_directories()
+    logger.info("Directories created")
+
     # Initialize database
     logger.info("Initializing database...")
     init_db()
     logger.info("Database initialized successfully")
 
-    # Create necessary directories
-    settings.create_directories()
-    logger.info("Directories created")
+    # Drop cached keypoints extracted with a different MediaPipe configuration
+    from .core.keypoint_cache import keypoint_cache
+    keypoint_cache.purge_stale()
+
+    # Swap in models activated in the registry without a restart
+    from .core.model_serving import model_server
+    model_server.start()
+
+    # Pre-build graphs / served models in the background (readiness: /ready)
+    from .core.warmup import startup_warmup
+    startup_warmup.start()
 
     logger.info("Application startup complete!")
 
@@ -113,7 +127,22 @@ async def shutdown_event():
     """
     logger.info("Shutting down VSL Application Backend...")
 
-    # Release models
+    # Stop warm-up and inference workers, then release models
+    from .core.warmup import startup_warmup
+    startup_warmup.wait(timeout=30)
+
+    from .core.executor import inference_executor
+    inference_executor.shutdown(wait=True)
+
+    from .core.batching import shutdown_batchers
+    shutdown_batchers()
+
+    from .core.model_serving import model_server
+    model_server.stop()
+
+    from .modules.vsl_recognition.video_keypoints import shutdown_shard_pool
+    shutdown_shard_pool()
+
     from .core.model_manager import model_manager
     model_manager.release_models()
 
@@ -174,6 +203,72 @@ async def health_check():
     }
 
 
+# Readiness endpoint
+@app.get("/ready")
+async def readiness_check():
+    """
+    Readiness check - 200 khi startup warm-up (graphs, models) đã xong, 503 nếu
+    đang chạy hoặc thất bại. Khác /health (process còn sống).
+    """
+    from .core.warmup import startup_warmup
+
+    status = startup_warmup.get_status()
+    status["timestamp"] = time.time()
+    return JSONResponse(status_code=200 if status["ready"] else 503, content=status)
+
+
+# Metrics endpoint
+@app.get("/metrics")
+async def metrics():
+    """
+    Runtime metrics (inference executor queue depth, wait time, graph pools, keypoint cache, ...)
+    """
+    from .core.batching import get_batcher_metrics
+    from .core.executor import inference_executor
+    from .core.keypoint_cache import keypoint_cache
+    from .core.model_manager import model_manager
+    from .core.model_serving import model_server
+
+    return {
+        "executor": inference_executor.get_metrics(),
+        "graph_pools": model_manager.get_pool_metrics(),
+        "keypoint_cache": keypoint_cache.get_metrics(),
+        "batching": get_batcher_metrics(),
+        "models": model_server.get_status(),
+        "timestamp": time.time()
+    }
+
+
+# Telemetry endpoints
+@app.get("/telemetry")
+async def get_telemetry():
+    """
+    Cấu hình debug telemetry hiện tại (sampled realtime frame logging, request logging)
+    """
+    return telemetry.get_status()
+
+
+@app.put("/telemetry")
+async def update_telemetry(
+    enabled: Optional[bool] = None,
+    sample_every: Optional[int] = None,
+    max_per_second: Optional[float] = None,
+    request_logging: Optional[bool] = None
+):
+    """
+    Bật/tắt và chỉnh telemetry lúc runtime (query params, tham số bỏ trống giữ nguyên)
+
+    - enabled: Log sampled realtime frames
+    - sample_every: Log 1 trong N frames mỗi session
+    - max_per_second: Số dòng log tối đa mỗi giây mỗi session
+    - request_logging: Log một dòng cho mỗi HTTP request
+    """
+    try:
+        return telemetry.configure(enabled, sample_every, max_per_second, request_logging)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 # API Info endpoint
 @app.get(f"{settings.API_V1_PREFIX}/info")
 async def api_info():
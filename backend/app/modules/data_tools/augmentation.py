@@ -4,11 +4,18 @@ Data Augmentation Service - Group 4
 STUDENT TODO: Implement data augmentation
 """
 import logging
-from typing import Dict, Any, Optional, List
+from typing import Callable, Dict, Any, Optional, List, Tuple
 from pathlib import Path
 
+import numpy as np
+
+from ...core.utils import generate_unique_filename, iter_video_frames
+
 logger = logging.getLogger(__name__)
 
+# Frame transform của một augmentation type: (transform(frame) -> frame cùng kích thước, hệ số nhân FPS output)
+FrameTransform = Tuple[Callable[[np.ndarray], np.ndarray], float]
+
 
 def augment_video(video_path: str, augmentation_types: List[str], options: Optional[Dict] = None) -> Dict[str, Any]:
     """
@@ -36,6 +43,10 @@ def augment_video(video_path: str, augmentation_types: List[str], options: Optio
         4. Update database (training_data table)
         5. Return results
 
+        Bước 1-3: tạo một FrameTransform cho mỗi augmentation type rồi gọi
+        write_augmented_videos() - video được decode một lần dạng stream và mỗi
+        frame được ghi ngay, nên bộ nhớ không phụ thuộc độ dài video.
+
     AUGMENTATION TYPES:
         - rotate: Random rotation (-15 to +15 degrees)
         - flip: Horizontal flip
@@ -63,6 +74,67 @@ def augment_video(video_path: str, augmentation_types: List[str], options: Optio
     }
 
 
+def write_augmented_videos(
+    video_path: str,
+    transforms: Dict[str, FrameTransform],
+    output_dir: Path,
+    fourcc: str = 'mp4v'
+) -> List[str]:
+    """
+    Decode video một lần (stream) và ghi mỗi frame qua từng transform vào
+    VideoWriter riêng - bộ nhớ không phụ thuộc độ dài video
+
+    INPUT:
+        video_path: str - Path to original video
+        transforms: dict augmentation type -> FrameTransform
+        output_dir: Thư mục output
+        fourcc: Video codec của output
+    OUTPUT:
+        list paths của các augmented videos (theo thứ tự transforms)
+    RAISES:
+        ValueError nếu không mở được video hoặc VideoWriter (codec không có)
+    """
+    import cv2
+    cap = cv2.VideoCapture(str(video_path))
+    if not cap.isOpened():
+        raise ValueError(f"Cannot open video file: {video_path}")
+    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    cap.release()
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    writers = []
+    augmented_paths = []
+    try:
+        for aug_type, (transform, fps_factor) in transforms.items():
+            output_path = output_dir / generate_unique_filename(Path(video_path).name, prefix=aug_type)
+            writer = cv2.VideoWriter(str(output_path), cv2.VideoWriter_fourcc(*fourcc), fps * fps_factor, (width, height))
+            if not writer.isOpened():
+                raise ValueError(f"Cannot open video writer for {output_path.name} (codec: {fourcc})")
+            writers.append((transform, writer))
+            augmented_paths.append(str(output_path))
+
+        if writers:
+            for frame in iter_video_frames(video_path):
+                for transform, writer in writers:
+                    writer.write(transform(frame.image))
+    except Exception:
+        # Don't leave partial / empty outputs behind
+        for _, writer in writers:
+            writer.release()
+        writers = []
+        for path in augmented_paths:
+            Path(path).unlink(missing_ok=True)
+        raise
+    finally:
+        for _, writer in writers:
+            writer.release()
+
+    logger.info(f"Augmented video {video_path} into {len(augmented_paths)} versions")
+    return augmented_paths
+
+
 def augment_image(image_path: str, augmentation_types: List[str], count: int = 5) -> Dict[str, Any]:
     """
     Augment image data
@@ -8,6 +8,7 @@ from typing import List, Optional
 from ...database.db import get_db
 from ...database.schemas import APIResponse
 from ...core.utils import create_response
+from ...core.executor import inference_executor
 from . import augmentation, custom_tools
 
 router = APIRouter(prefix="/tools", tags=["Data & Tools"])
@@ -69,7 +70,7 @@ async def batch_augment_endpoint(
             'options': {}
         }
 
-        result = augmentation.batch_augment_directory(data_dir, data_type, config)
+        result = await inference_executor.run(augmentation.batch_augment_directory, data_dir, data_type, config)
 
         return create_response(
             success=result['success'],
@@ -207,7 +208,7 @@ async def benchmark_model_endpoint(
     - Return metrics
     """
     try:
-        result = custom_tools.benchmark_model(model_path, test_data_dir)
+        result = await inference_executor.run(custom_tools.benchmark_model, model_path, test_data_dir)
 
         return create_response(
             success=True,
@@ -8,7 +8,8 @@ from typing import Optional
 from ...database.db import get_db
 from ...database.schemas import AudioToTextResponse, TextToAudioRequest, APIResponse
 from ...config import settings
-from ...core.utils import save_uploaded_file, validate_file_extension, create_response
+from ...core.utils import save_upload_stream, UploadTooLargeError, validate_file_extension, create_response
+from ...core.executor import inference_executor
 from . import stt_service, tts_service
 
 router = APIRouter(prefix="/speech", tags=["Speech Processing"])
@@ -44,15 +45,10 @@ async def audio_to_text_endpoint(
             )
 
         # Save file
-        file_content = await file.read()
-        file_path = save_uploaded_file(
-            file_content,
-            file.filename,
-            settings.RAW_DATA_DIR / "audio"
-        )
+        upload = await save_upload_stream(file, settings.RAW_DATA_DIR / "audio")
 
         # Call STT service
-        result = stt_service.audio_to_text(file_path)
+        result = await inference_executor.run(stt_service.audio_to_text, upload.path)
 
         return create_response(
             success=result['success'],
@@ -60,6 +56,12 @@ async def audio_to_text_endpoint(
             data=result
         )
 
+    except UploadTooLargeError as e:
+        return create_response(
+            success=False,
+            message="File too large",
+            error=str(e)
+        )
     except Exception as e:
         return create_response(
             success=False,
@@ -96,7 +98,7 @@ async def text_to_audio_endpoint(
             'language': request.language
         }
 
-        result = tts_service.text_to_audio(request.text, options)
+        result = await inference_executor.run(tts_service.text_to_audio, request.text, options)
 
         return create_response(
             success=result['success'],
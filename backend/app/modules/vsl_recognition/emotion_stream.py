@@ -0,0 +1,152 @@
+"""
+Emotion Stream - Nhận diện cảm xúc với face mesh chạy thưa trên realtime session
+
+Biểu cảm khuôn mặt thay đổi chậm hơn nhiều so với handshape, nên face mesh
+(468 điểm) không cần chạy mỗi frame như Hands. EmotionTracker là scheduler
+mixed-rate:
+
+- Hands chạy mọi frame (service._detect_hand_keypoints)
+- Face mesh + emotion model chỉ chạy mỗi `interval` frames; schedule 'hands'
+  chỉ chạy khi frame có hands (không ký thì không cần cảm xúc)
+- Giữa các lần chạy, emotion state được giữ nguyên; mỗi prediction mới được
+  trộn vào state bằng EMA (alpha) để label không nhảy theo từng lần chạy
+- State hết hạn khi không thấy mặt quá `hold` giây (phát event emotion None)
+- Face mesh dùng graph static_image_mode=True mượn từ pool
+  (model_manager.get_face_pool()): frames thưa của nhiều sessions không đi
+  qua chung một tracking graph
+
+Emotion events chỉ được phát khi label (sau EMA) thay đổi hoặc state hết hạn:
+    {'type': 'emotion', 'emotion', 'confidence', 'timestamp'}
+"""
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from ...config import settings
+from ...core.model_manager import model_manager
+
+EMOTION_SCHEDULES = ('interval', 'hands')
+
+
+class EmotionTracker:
+    """
+    Emotion state của một realtime session (face mesh mỗi `interval` frames)
+    """
+
+    def __init__(
+        self,
+        predict_fn: Callable[[list], Dict[str, Any]],
+        interval: Optional[int] = None,
+        schedule: Optional[str] = None,
+        alpha: Optional[float] = None,
+        hold: Optional[float] = None,
+        manager=None
+    ):
+        """
+        INPUT:
+            predict_fn: Hàm nhận face landmarks (list of {'x','y','z','visibility'})
+                -> {'emotion', 'confidence', 'probabilities' (optional)}
+                (service.detect_emotion)
+            interval: Chạy face mesh mỗi N frames (default: settings.EMOTION_FACE_INTERVAL)
+            schedule: 'interval' | 'hands' (default: settings.EMOTION_SCHEDULE)
+            alpha: Trọng số EMA của prediction mới, 1 = không smoothing
+                (default: settings.EMOTION_SMOOTHING_ALPHA)
+            hold: Giây giữ emotion state sau lần cuối thấy mặt, 0 = giữ mãi
+                (default: settings.EMOTION_HOLD_SECONDS)
+            manager: ModelManager - extract_face_landmarks (default: model_manager)
+        RAISES:
+            ValueError nếu schedule không hỗ trợ hoặc alpha ngoài (0, 1]
+        """
+        self.predict_fn = predict_fn
+        self.interval = max(1, interval or settings.EMOTION_FACE_INTERVAL)
+        self.schedule = schedule or settings.EMOTION_SCHEDULE
+        if self.schedule not in EMOTION_SCHEDULES:
+            raise ValueError(f"Unknown emotion schedule: {self.schedule}. Supported: {', '.join(EMOTION_SCHEDULES)}")
+        self.alpha = settings.EMOTION_SMOOTHING_ALPHA if alpha is None else alpha
+        if not 0 < self.alpha <= 1:
+            raise ValueError("alpha must be in (0, 1]")
+        self.hold = settings.EMOTION_HOLD_SECONDS if hold is None else hold
+        self.manager = manager or model_manager
+
+        self._scores: Dict[str, float] = {}
+        self._emotion: Optional[str] = None
+        self._last_face: Optional[float] = None
+        self._frames_since_face = self.interval  # run on the first eligible frame
+        self.face_runs = 0
+
+    def due(self, hands_present: bool) -> bool:
+        """Frame hiện tại có cần chạy face mesh không"""
+        if self.schedule == 'hands' and not hands_present:
+            return False
+        return self._frames_since_face >= self.interval
+
+    def update(
+        self,
+        image,
+        hands_present: bool,
+        is_rgb: bool = False,
+        timestamp: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Xử lý một frame: chạy face mesh + emotion model nếu tới lượt
+
+        INPUT:
+            image: numpy array (BGR, hoặc RGB nếu is_rgb) - frame đã đưa vào Hands
+            hands_present: Frame có hands không (schedule 'hands')
+            is_rgb: bool - True nếu image đã ở RGB
+            timestamp: seconds (default: time.time())
+        OUTPUT:
+            list emotion events (rỗng nếu không chạy hoặc label không đổi)
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        self._frames_since_face += 1
+        events = self._expire(timestamp)
+        if not self.due(hands_present):
+            return events
+        self._frames_since_face = 0
+        self.face_runs += 1
+
+        face_landmarks = self.manager.extract_face_landmarks(image, is_rgb=is_rgb, static_image_mode=True)['landmarks']
+        if not face_landmarks:
+            # No face in this frame - hold the current state until it expires
+            return events
+        self._last_face = timestamp
+        return events + self._apply(self.predict_fn(face_landmarks), timestamp)
+
+    def _expire(self, timestamp: float) -> List[Dict[str, Any]]:
+        """Xoá state nếu không thấy mặt quá `hold` giây (event emotion None)"""
+        if self.hold <= 0 or self._last_face is None or timestamp - self._last_face <= self.hold:
+            return []
+        self._scores = {}
+        self._last_face = None
+        if self._emotion is None:
+            return []
+        self._emotion = None
+        return [self._event(timestamp)]
+
+    def _apply(self, prediction: Dict[str, Any], timestamp: float) -> List[Dict[str, Any]]:
+        """Trộn prediction vào state (EMA), phát event nếu label thay đổi"""
+        scores = prediction.get('probabilities')
+        if not scores and prediction.get('emotion'):
+            scores = {prediction['emotion']: float(prediction.get('confidence', 0.0))}
+        if not scores:
+            return []
+
+        for label in set(self._scores) | set(scores):
+            self._scores[label] = (
+                (1 - self.alpha) * self._scores.get(label, 0.0) + self.alpha * float(scores.get(label, 0.0))
+            )
+        emotion = max(self._scores, key=self._scores.get)
+        if emotion == self._emotion:
+            return []
+        self._emotion = emotion
+        return [self._event(timestamp)]
+
+    @property
+    def state(self) -> Dict[str, Any]:
+        """Emotion hiện tại: {'emotion' (None nếu chưa có), 'confidence'}"""
+        confidence = self._scores.get(self._emotion, 0.0) if self._emotion else 0.0
+        return {'emotion': self._emotion, 'confidence': round(confidence, 4)}
+
+    def _event(self, timestamp: float) -> Dict[str, Any]:
+        return {'type': 'emotion', **self.state, 'timestamp': timestamp}
@@ -0,0 +1,162 @@
+"""
+Realtime Frame Protocol - Giải mã frames từ WebSocket hand tracking
+
+Hỗ trợ 2 chế độ truyền frame:
+- Text mode (client cũ): base64 string hoặc data URL ("data:image/jpeg;base64,...")
+- Binary mode: client gửi bytes qua `send(ArrayBuffer)`, gồm 2 loại:
+    1. Ảnh đã encode (JPEG / WebP / PNG) - nhận diện qua magic bytes
+    2. Raw frame (BGR / RGB / RGBA / I420 / NV12) với header 12 bytes
+
+Binary mode được negotiate qua WebSocket subprotocol BINARY_SUBPROTOCOL.
+Frame được decode trực tiếp từ message buffer (np.frombuffer), không copy thêm.
+"""
+import base64
+import struct
+from typing import Tuple
+
+import numpy as np
+
+# WebSocket subprotocol client gửi khi muốn dùng binary frames
+BINARY_SUBPROTOCOL = "vsl.frames.v1"
+
+# Raw frame header: magic (4s), version (B), pixel_format (B), width (H), height (H), reserved (H)
+RAW_FRAME_MAGIC = b"VSLF"
+RAW_FRAME_VERSION = 1
+RAW_FRAME_HEADER = struct.Struct("<4sBBHHH")
+
+# Pixel formats cho raw frames
+PIXEL_FORMAT_BGR = 0
+PIXEL_FORMAT_RGB = 1
+PIXEL_FORMAT_RGBA = 2
+PIXEL_FORMAT_I420 = 3
+PIXEL_FORMAT_NV12 = 4
+
+# Magic bytes của các định dạng ảnh encode
+_JPEG_MAGIC = b"\xff\xd8"
+_PNG_MAGIC = b"\x89PNG"
+_RIFF_MAGIC = b"RIFF"
+_WEBP_MAGIC = b"WEBP"
+
+
+def decode_base64_frame(frame_base64: str) -> np.ndarray:
+    """
+    Decode base64 frame (text mode) thành BGR image
+
+    INPUT:
+        frame_base64: str - Base64 string hoặc data URL
+    OUTPUT:
+        numpy array (BGR format)
+    RAISES:
+        binascii.Error nếu base64 không hợp lệ
+        ValueError nếu không decode được ảnh
+    """
+    import cv2
+    # Handle data URL format (data:image/jpeg;base64,xxxxx)
+    _, separator, payload = frame_base64.partition(',')
+    if not separator:
+        payload = frame_base64
+
+    image_bytes = base64.b64decode(payload)
+    image = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_COLOR)
+
+    if image is None:
+        raise ValueError("Failed to decode image from base64")
+
+    return image
+
+
+def decode_binary_frame(frame_bytes: bytes) -> Tuple[np.ndarray, bool]:
+    """
+    Decode binary frame (binary mode)
+
+    INPUT:
+        frame_bytes: bytes - Ảnh encode (JPEG/WebP/PNG) hoặc raw frame có header
+    OUTPUT:
+        (image, is_rgb):
+            image: numpy array HxWx3 uint8
+            is_rgb: bool - True nếu image đã ở RGB (bỏ qua bước BGR->RGB)
+    RAISES:
+        ValueError nếu frame không hợp lệ
+    """
+    import cv2
+    if frame_bytes.startswith(RAW_FRAME_MAGIC):
+        return _decode_raw_frame(frame_bytes)
+
+    if not _is_encoded_image(frame_bytes):
+        raise ValueError("Unsupported binary frame: expected JPEG/WebP/PNG or raw frame header")
+
+    image = cv2.imdecode(np.frombuffer(frame_bytes, np.uint8), cv2.IMREAD_COLOR)
+    if image is None:
+        raise ValueError("Failed to decode binary image frame")
+
+    return image, False
+
+
+def encode_raw_frame_header(width: int, height: int, pixel_format: int = PIXEL_FORMAT_RGB) -> bytes:
+    """
+    Tạo header cho raw frame (dùng cho client Python / testing)
+
+    INPUT:
+        width, height: Kích thước frame
+        pixel_format: Một trong các PIXEL_FORMAT_*
+    OUTPUT:
+        bytes - 12 bytes header, nối trước pixel data
+    """
+    return RAW_FRAME_HEADER.pack(RAW_FRAME_MAGIC, RAW_FRAME_VERSION, pixel_format, width, height, 0)
+
+
+def _is_encoded_image(frame_bytes: bytes) -> bool:
+    """Kiểm tra magic bytes của JPEG / PNG / WebP"""
+    if frame_bytes.startswith(_JPEG_MAGIC) or frame_bytes.startswith(_PNG_MAGIC):
+        return True
+    return frame_bytes.startswith(_RIFF_MAGIC) and frame_bytes[8:12] == _WEBP_MAGIC
+
+
+def _decode_raw_frame(frame_bytes: bytes) -> Tuple[np.ndarray, bool]:
+    """
+    Decode raw frame có header
+
+    Pixel data được đọc trực tiếp từ message buffer (zero-copy) với BGR/RGB.
+    RGBA và YUV cần 1 lần convert sang RGB.
+    """
+    import cv2
+    if len(frame_bytes) < RAW_FRAME_HEADER.size:
+        raise ValueError("Raw frame too short for header")
+
+    _, version, pixel_format, width, height, _ = RAW_FRAME_HEADER.unpack_from(frame_bytes)
+    if version != RAW_FRAME_VERSION:
+        raise ValueError(f"Unsupported raw frame version: {version}")
+    if width == 0 or height == 0:
+        raise ValueError("Raw frame has zero width or height")
+
+    offset = RAW_FRAME_HEADER.size
+    payload_size = len(frame_bytes) - offset
+
+    if pixel_format in (PIXEL_FORMAT_BGR, PIXEL_FORMAT_RGB, PIXEL_FORMAT_RGBA):
+        channels = 4 if pixel_format == PIXEL_FORMAT_RGBA else 3
+        expected = width * height * channels
+        _check_payload_size(payload_size, expected)
+        pixels = np.frombuffer(frame_bytes, np.uint8, count=expected, offset=offset)
+        image = pixels.reshape(height, width, channels)
+
+        if pixel_format == PIXEL_FORMAT_RGBA:
+            return cv2.cvtColor(image, cv2.COLOR_RGBA2RGB), True
+        return image, pixel_format == PIXEL_FORMAT_RGB
+
+    if pixel_format in (PIXEL_FORMAT_I420, PIXEL_FORMAT_NV12):
+        if width % 2 or height % 2:
+            raise ValueError("YUV420 frames require even width and height")
+        expected = width * height * 3 // 2
+        _check_payload_size(payload_size, expected)
+        yuv = np.frombuffer(frame_bytes, np.uint8, count=expected, offset=offset)
+        yuv = yuv.reshape(height * 3 // 2, width)
+        code = cv2.COLOR_YUV2RGB_I420 if pixel_format == PIXEL_FORMAT_I420 else cv2.COLOR_YUV2RGB_NV12
+        return cv2.cvtColor(yuv, code), True
+
+    raise ValueError(f"Unsupported raw pixel format: {pixel_format}")
+
+
+def _check_payload_size(actual: int, expected: int):
+    """Raw frame phải có đúng số bytes theo header"""
+    if actual != expected:
+        raise ValueError(f"Raw frame payload size mismatch: expected {expected} bytes, got {actual}")
@@ -0,0 +1,276 @@
+"""
+Gesture Stream - Nhận diện gesture theo sliding window trên realtime session
+
+- frame_features(): features của một frame (tính một lần khi frame đến)
+- FeatureRingBuffer: ring buffer (capacity, F) chứa features của các frames
+  gần nhất - mỗi window chỉ là một lần copy các rows cuối, không tính lại
+  features cho cả window
+- SlidingWindowRecognizer: mỗi `stride` frames chạy model trên window
+  `window_size` frames gần nhất và phát gesture events:
+    {'type': 'gesture', 'event': 'start' | 'end', 'label', 'confidence',
+     'start_time', 'end_time'}
+
+Latency bị chặn bởi stride frames + một lần inference: gesture được báo
+'start' ngay khi window đầu tiên vượt ngưỡng, không chờ người ký dừng tay.
+
+Với micro-batcher (core/batching.py), windows của mọi sessions được gom vào
+một forward pass (predict_windows); push() khi đó trả về Future của events.
+"""
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+from ...config import settings
+from ...core.geometry import normalize_hand
+from ...core.landmarks import HAND_SLOTS, LandmarkFrame
+
+HAND_KEYPOINTS = 21
+
+# 2 hands x 21 keypoints x (x, y, z) + 2 cờ có/không có hand
+FEATURE_SIZE = len(HAND_SLOTS) * HAND_KEYPOINTS * 3 + len(HAND_SLOTS)
+
+
+def frame_features(frame: LandmarkFrame) -> np.ndarray:
+    """
+    Features của một frame: hands normalize theo cổ tay / kích thước bàn tay
+
+    INPUT:
+        frame: LandmarkFrame (kind 'hands')
+    OUTPUT:
+        float32 (FEATURE_SIZE,) - slot không có hand = 0, cờ = 0
+    """
+    features = np.zeros(FEATURE_SIZE, np.float32)
+    keypoints = features[:-len(HAND_SLOTS)].reshape(len(HAND_SLOTS), HAND_KEYPOINTS, 3)
+    flags = features[-len(HAND_SLOTS):]
+
+    slots = frame.hand_slots()
+    if slots:
+        indices = list(slots)
+        hands = np.stack([frame.segment(f'hand_{i}')[:, :3] for i in indices])
+        normalized = normalize_hand(hands)
+        for row, i in enumerate(indices):
+            keypoints[slots[i]] = normalized[row]
+            flags[slots[i]] = 1.0
+    return features
+
+
+def predict_windows(
+    model,
+    windows: Sequence[np.ndarray],
+    window_size: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """
+    Predict một batch windows bằng một lần model.predict_batch()
+
+    Mọi windows được đưa về đúng window_size frames (ngắn hơn: pad 0 ở đầu -
+    cùng features với frames không có hand; dài hơn: giữ các frames cuối), nên
+    prediction của một window không phụ thuộc các windows khác trong batch.
+
+    INPUT:
+        model: Object có predict_batch(features (B, T, F)) (VSLRecognitionModel)
+        windows: list of (T_i, F)
+        window_size: Số frames mỗi window (default: settings.GESTURE_WINDOW_SIZE)
+    OUTPUT:
+        list predictions theo thứ tự windows
+    """
+    window_size = window_size or settings.GESTURE_WINDOW_SIZE
+    batch = np.zeros((len(windows), window_size, windows[0].shape[1]), np.float32)
+    for i, window in enumerate(windows):
+        window = window[-window_size:]
+        batch[i, window_size - len(window):] = window
+    return model.predict_batch(batch)
+
+
+class FeatureRingBuffer:
+    """
+    Ring buffer features + timestamps của các frames gần nhất
+    """
+
+    def __init__(self, capacity: int, feature_size: int = FEATURE_SIZE):
+        """
+        INPUT:
+            capacity: Số frames tối đa giữ lại
+            feature_size: Kích thước feature vector mỗi frame
+        """
+        self.capacity = capacity
+        self._features = np.zeros((capacity, feature_size), np.float32)
+        self._timestamps = np.zeros(capacity, np.float64)
+        self._next = 0
+        self.count = 0
+
+    def push(self, features: np.ndarray, timestamp: float):
+        """Thêm features của một frame (ghi đè frame cũ nhất khi đầy)"""
+        self._features[self._next] = features
+        self._timestamps[self._next] = timestamp
+        self._next = (self._next + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def window(self, size: int, pad: bool = False) -> np.ndarray:
+        """
+        Features của `size` frames gần nhất theo thứ tự thời gian
+
+        INPUT:
+            size: Số frames
+            pad: True = luôn trả về đủ `size` rows (thiếu thì pad 0 ở đầu)
+        OUTPUT:
+            float32 (size, F) nếu pad, ngược lại (min(size, count), F)
+        """
+        features = self._features[self._window_indices(size)]
+        if pad and len(features) < size:
+            padded = np.zeros((size, self._features.shape[1]), np.float32)
+            padded[size - len(features):] = features
+            return padded
+        return features
+
+    def window_start_time(self, size: int) -> float:
+        """Timestamp của frame đầu tiên trong window"""
+        indices = self._window_indices(size)
+        return float(self._timestamps[indices[0]]) if len(indices) else 0.0
+
+    def _window_indices(self, size: int) -> np.ndarray:
+        size = min(size, self.count)
+        return (np.arange(self._next - size, self._next)) % self.capacity
+
+    def clear(self):
+        """Xoá toàn bộ frames"""
+        self._next = 0
+        self.count = 0
+
+
+class SlidingWindowRecognizer:
+    """
+    Gesture recognition theo sliding window của một realtime session
+
+    Trạng thái: đang có gesture (label, start_time, confidence cao nhất) hoặc
+    không. Hysteresis: bắt đầu khi confidence >= threshold, kết thúc khi
+    confidence < end_threshold, window không có hand, hoặc model chuyển
+    sang label khác (khi đó phát 'end' rồi 'start' label mới).
+    """
+
+    def __init__(
+        self,
+        model,
+        window_size: Optional[int] = None,
+        stride: Optional[int] = None,
+        threshold: Optional[float] = None,
+        end_threshold: Optional[float] = None,
+        min_frames: Optional[int] = None,
+        batcher=None
+    ):
+        """
+        INPUT:
+            model: Object có predict_from_array(features (T, F)) ->
+                {'predicted_text', 'confidence', ...} (VSLRecognitionModel)
+            window_size: Số frames mỗi window (default: settings.GESTURE_WINDOW_SIZE)
+            stride: Chạy model mỗi N frames (default: settings.GESTURE_WINDOW_STRIDE)
+            threshold: Confidence để bắt đầu gesture (default: settings.GESTURE_CONFIDENCE_THRESHOLD)
+            end_threshold: Confidence dưới mức này thì kết thúc gesture (default: threshold / 2)
+            min_frames: Số frames tối thiểu trước lần predict đầu tiên (default: window_size / 2)
+            batcher: MicroBatcher (optional) - windows được predict theo batch
+                cùng các sessions khác (batch_fn: predict_windows)
+        """
+        self.model = model
+        self.window_size = window_size or settings.GESTURE_WINDOW_SIZE
+        self.stride = max(1, stride or settings.GESTURE_WINDOW_STRIDE)
+        self.threshold = settings.GESTURE_CONFIDENCE_THRESHOLD if threshold is None else threshold
+        self.end_threshold = self.threshold / 2 if end_threshold is None else end_threshold
+        self.min_frames = min_frames or max(1, self.window_size // 2)
+        self.batcher = batcher
+
+        self.buffer = FeatureRingBuffer(self.window_size)
+        self._frames_since_predict = 0
+        self._active: Optional[Dict[str, Any]] = None
+        self._last_timestamp = 0.0
+
+    def push(
+        self,
+        frame: LandmarkFrame,
+        timestamp: Optional[float] = None
+    ) -> Union[List[Dict[str, Any]], 'Future[List[Dict[str, Any]]]']:
+        """
+        Thêm một frame, chạy model nếu đủ stride
+
+        INPUT:
+            frame: LandmarkFrame (kind 'hands')
+            timestamp: seconds (default: time.time())
+        OUTPUT:
+            list gesture events (thường rỗng), hoặc Future của list đó nếu
+            window được gửi tới batcher. Caller phải chờ Future xong trước
+            khi push frame tiếp theo (state được cập nhật khi có kết quả).
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        self.buffer.push(frame_features(frame), timestamp)
+        self._last_timestamp = timestamp
+        self._frames_since_predict += 1
+
+        if self._frames_since_predict < self.stride or self.buffer.count < self.min_frames:
+            return []
+        self._frames_since_predict = 0
+
+        # Always window_size frames: the model sees the same input with or without the batcher
+        window = self.buffer.window(self.window_size, pad=True)
+        if not window[:, -len(HAND_SLOTS):].any():
+            # No hands in the whole window - nothing to classify
+            return self._end(timestamp)
+
+        window_start = self.buffer.window_start_time(self.window_size)
+        if self.batcher is None:
+            return self._apply(self.model.predict_from_array(window), window_start, timestamp)
+
+        events: Future = Future()
+
+        def on_prediction(prediction: Future):
+            try:
+                events.set_result(self._apply(prediction.result(), window_start, timestamp))
+            except Exception as e:
+                events.set_exception(e)
+
+        self.batcher.submit(window).add_done_callback(on_prediction)
+        return events
+
+    def _apply(self, prediction: Dict[str, Any], window_start: float, timestamp: float) -> List[Dict[str, Any]]:
+        """Cập nhật trạng thái theo prediction của window"""
+        label = prediction.get('predicted_text')
+        confidence = float(prediction.get('confidence', 0.0))
+        return self._update(label, confidence, window_start, timestamp)
+
+    def flush(self) -> List[Dict[str, Any]]:
+        """Kết thúc gesture đang mở (khi session đóng)"""
+        return self._end(self._last_timestamp)
+
+    def _update(self, label: Optional[str], confidence: float, window_start: float, timestamp: float) -> List[Dict[str, Any]]:
+        """Cập nhật trạng thái gesture theo prediction của window mới nhất"""
+        active = self._active
+        if active is not None:
+            if label == active['label'] and confidence >= self.end_threshold:
+                active['confidence'] = max(active['confidence'], confidence)
+                return []
+            events = self._end(timestamp)
+        else:
+            events = []
+
+        if label and confidence >= self.threshold:
+            self._active = {'label': label, 'confidence': confidence, 'start_time': window_start}
+            events.append(self._event('start', self._active, None))
+        return events
+
+    def _end(self, timestamp: float) -> List[Dict[str, Any]]:
+        """Kết thúc gesture đang mở (nếu có)"""
+        if self._active is None:
+            return []
+        active, self._active = self._active, None
+        return [self._event('end', active, timestamp)]
+
+    @staticmethod
+    def _event(event: str, gesture: Dict[str, Any], end_time: Optional[float]) -> Dict[str, Any]:
+        return {
+            'type': 'gesture',
+            'event': event,
+            'label': gesture['label'],
+            'confidence': round(gesture['confidence'], 4),
+            'start_time': gesture['start_time'],
+            'end_time': end_time
+        }
@@ -2,46 +2,81 @@
 VSL Recognition Models - ML Models
 
 STUDENT TODO: Implement model loading và inference
+
+Models được load qua runtime abstraction (core/model_runtime.py): Keras,
+ONNX Runtime hoặc TFLite (INT8/FP16) tuỳ registry metadata 'backend'.
 """
 import logging
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 import numpy as np
 
+from ...core.model_runtime import ModelRuntime, load_runtime
+
 logger = logging.getLogger(__name__)
 
 
+def _load_runtime(
+    model_path: Optional[Path],
+    backend: Optional[str],
+    num_threads: Optional[int]
+) -> Optional[ModelRuntime]:
+    """
+    Load model bằng runtime backend; None nếu không có model_path (chưa train model)
+
+    RAISES:
+        FileNotFoundError nếu model file không tồn tại; lỗi của runtime nếu file
+        hỏng (model_server giữ version đang serve thay vì swap sang placeholder)
+    """
+    if model_path is None:
+        return None
+    if not Path(model_path).exists():
+        raise FileNotFoundError(f"Model file not found: {model_path}")
+    try:
+        return load_runtime(model_path, backend=backend, num_threads=num_threads)
+    except Exception as e:
+        logger.error(f"Error loading model {model_path}: {str(e)}")
+        raise
+
+
 class VSLRecognitionModel:
     """
     Wrapper class cho VSL recognition model
 
     STUDENT TODO:
-    - Load trained model (TensorFlow/PyTorch)
+    - Train model (TensorFlow/PyTorch) và export (core/model_export.py)
     - Implement predict() method
     - Handle model caching
     """
 
-    def __init__(self, model_path: Optional[Path] = None):
+    def __init__(
+        self,
+        model_path: Optional[Path] = None,
+        backend: Optional[str] = None,
+        num_threads: Optional[int] = None,
+        labels: Optional[List[str]] = None,
+        landmark_profile: Optional[str] = None
+    ):
         """
         Khởi tạo model
 
         INPUT:
-            model_path: Path - Đường dẫn đến model file
-
-        STUDENT TODO:
-            - Load model từ file
-            - Initialize model architecture
-            - Load weights
+            model_path: Path - Đường dẫn đến model file (.keras / .onnx / .tflite)
+            backend: Runtime backend - 'keras' | 'onnx' | 'tflite' | 'auto'
+                (default: settings.MODEL_RUNTIME_BACKEND)
+            num_threads: Số intra-op threads (default: settings.MODEL_RUNTIME_THREADS)
+            labels: Tên class theo thứ tự output của model (registry metadata 'labels')
+            landmark_profile: Landmarks model cần - 'hands' | 'hands_pose' | 'holistic'
+                (registry metadata 'landmark_profile', None = settings.LANDMARK_PROFILE)
+        RAISES:
+            FileNotFoundError / lỗi của runtime nếu model_path không load được
         """
         self.model_path = model_path
-        self.model = None
+        self.labels = labels or []
+        self.landmark_profile = landmark_profile
+        self.model = _load_runtime(model_path, backend, num_threads)
         print(f"[VSLRecognitionModel] Initialized with path: {model_path}")
 
-        # TODO: Load actual model
-        # Example:
-        # import tensorflow as tf
-        # self.model = tf.keras.models.load_model(model_path)
-
     def predict_from_sequence(self, landmarks_sequence: list) -> Dict[str, Any]:
         """
         Predict từ sequence of landmarks
@@ -81,6 +116,65 @@ class VSLRecognitionModel:
             'probabilities': {}
         }
 
+    def predict_from_array(self, features: np.ndarray) -> Dict[str, Any]:
+        """
+        Predict từ một window features đã tính sẵn (realtime sliding window)
+
+        INPUT:
+            features: numpy array (T, F) float32 - features của T frames liên tiếp
+                (xem gesture_stream.frame_features: 2 hands x 21 keypoints x 3
+                đã normalize + 2 cờ có/không có hand)
+
+        OUTPUT:
+            Giống predict_from_sequence()
+
+        NOTE: Batch size 1 - realtime sessions dùng predict_batch() qua
+            micro-batcher (core/batching.py)
+        """
+        return self.predict_batch(features[None])[0]
+
+    def predict_batch(self, features: np.ndarray) -> List[Dict[str, Any]]:
+        """
+        Predict cho một batch windows trong một lần forward pass
+
+        INPUT:
+            features: numpy array (B, T, F) float32 - B windows cùng độ dài
+                (windows ngắn hơn được pad 0 ở đầu = frames không có hand)
+
+        OUTPUT:
+            list B dicts, mỗi dict giống predict_from_sequence()
+
+        NOTE: Được gọi liên tục từ realtime sessions - không print / log ở đây
+        """
+        if self.model is None or not self.labels:
+            # TODO: Train, export and register a model (with 'labels' metadata)
+            return [
+                {
+                    'predicted_text': "PLACEHOLDER",
+                    'confidence': 0.0,
+                    'probabilities': {}
+                }
+                for _ in range(len(features))
+            ]
+
+        # One forward pass for the whole batch - output (B, num_classes) probabilities
+        probabilities = self.model.predict(features)
+        predictions = []
+        for row in probabilities:
+            best = int(np.argmax(row))
+            predictions.append({
+                'predicted_text': self.labels[best],
+                'confidence': float(row[best]),
+                'probabilities': dict(zip(self.labels, row.tolist()))
+            })
+        return predictions
+
+    def close(self):
+        """Giải phóng runtime (model_server gọi khi version này không còn được dùng)"""
+        if self.model is not None:
+            self.model.close()
+            self.model = None
+
 
 class GestureRecognitionModel:
     """
@@ -91,13 +185,24 @@ class GestureRecognitionModel:
     - Implement single-frame gesture prediction
     """
 
-    def __init__(self, model_path: Optional[Path] = None):
+    def __init__(
+        self,
+        model_path: Optional[Path] = None,
+        backend: Optional[str] = None,
+        num_threads: Optional[int] = None
+    ):
+        """
+        INPUT:
+            model_path: Path - Đường dẫn đến model file (.keras / .onnx / .tflite)
+            backend: Runtime backend (default: settings.MODEL_RUNTIME_BACKEND)
+            num_threads: Số intra-op threads (default: settings.MODEL_RUNTIME_THREADS)
+        RAISES:
+            FileNotFoundError / lỗi của runtime nếu model_path không load được
+        """
         self.model_path = model_path
-        self.model = None
+        self.model = _load_runtime(model_path, backend, num_threads)
         print(f"[GestureRecognitionModel] Initialized with path: {model_path}")
 
-        # TODO: Load model
-
     def predict(self, landmarks: Dict) -> Dict[str, Any]:
         """
         Predict gesture từ landmarks
@@ -114,7 +219,7 @@ class GestureRecognitionModel:
 
         STUDENT TODO:
             - Preprocess landmarks
-            - Run inference
+            - Run inference: self.model.predict(features[None])[0]
             - Return prediction
         """
         print("[GestureRecognitionModel] predict called")
@@ -136,13 +241,24 @@ class EmotionRecognitionModel:
     - Implement emotion prediction
     """
 
-    def __init__(self, model_path: Optional[Path] = None):
+    def __init__(
+        self,
+        model_path: Optional[Path] = None,
+        backend: Optional[str] = None,
+        num_threads: Optional[int] = None
+    ):
+        """
+        INPUT:
+            model_path: Path - Đường dẫn đến model file (.keras / .onnx / .tflite)
+            backend: Runtime backend (default: settings.MODEL_RUNTIME_BACKEND)
+            num_threads: Số intra-op threads (default: settings.MODEL_RUNTIME_THREADS)
+        RAISES:
+            FileNotFoundError / lỗi của runtime nếu model_path không load được
+        """
         self.model_path = model_path
-        self.model = None
+        self.model = _load_runtime(model_path, backend, num_threads)
         print(f"[EmotionRecognitionModel] Initialized with path: {model_path}")
 
-        # TODO: Load model
-
     def predict(self, face_landmarks: list) -> Dict[str, Any]:
         """
         Predict emotion từ face landmarks
@@ -159,7 +275,7 @@ class EmotionRecognitionModel:
 
         STUDENT TODO:
             - Extract features từ face landmarks
-            - Run inference
+            - Run inference: self.model.predict(features[None])[0]
             - Return emotion prediction
         """
         print("[EmotionRecognitionModel] predict called")
@@ -0,0 +1,275 @@
+"""
+Realtime Session - Quản lý state của một WebSocket hand tracking connection
+
+Latest-frame-wins backpressure:
+- Receiver task đọc liên tục từ socket và chỉ giữ frame MỚI NHẤT
+- Worker xử lý frame mới nhất, các frame cũ bị bỏ qua (đếm dropped)
+=> Latency luôn bị chặn bởi ~1 lần inference, không tăng theo độ dài queue
+
+Mỗi session giữ một Hands graph riêng từ pool của ModelManager, để tracking
+state của các clients không bị trộn lẫn, và (tuỳ chọn) một smoothing filter
+cùng một ROI tracker (crop-and-track), inference resolution (cố định hoặc
+adaptive theo latency), response encoder (format compact / delta),
+sliding-window gesture recognizer và emotion tracker (face mesh thưa).
+
+Client kết thúc stream bằng text message {"type": "end"} (END_OF_STREAM):
+gesture đang mở được đóng (finish()) và gửi event 'end' trước khi đóng socket.
+"""
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Dict, List, Optional, Union
+
+from fastapi import WebSocket
+
+from ...config import settings
+from ...core.model_manager import model_manager
+from ...core.resolution import InferenceResolution
+from ...core.telemetry import telemetry
+from . import service
+from .response_codec import ResponseEncoder
+from .roi_tracking import HandRoiTracker
+from .smoothing import HandLandmarkSmoother
+
+logger = logging.getLogger(__name__)
+
+END_OF_STREAM = 'end'
+_FLAG_VALUES = {'1': True, 'true': True, 'yes': True, 'on': True, '0': False, 'false': False, 'no': False, 'off': False}
+
+
+def _parse_flag(name: str, value: Union[bool, str, None], default: bool) -> bool:
+    """
+    Đọc bool option từ query param ('1'/'0', 'true'/'false', 'yes'/'no', 'on'/'off')
+
+    RAISES:
+        ValueError nếu giá trị không hợp lệ
+    """
+    if value is None or value == '':
+        return default
+    if isinstance(value, bool):
+        return value
+    if value.lower() not in _FLAG_VALUES:
+        raise ValueError(f"Invalid {name} value: {value}. Use true/false")
+    return _FLAG_VALUES[value.lower()]
+
+
+class LatestFrameSlot:
+    """
+    Slot chứa đúng 1 frame đang chờ xử lý
+
+    put() ghi đè frame chưa xử lý (frame cũ bị drop), get() chờ frame tiếp theo.
+    Chỉ dùng trong cùng một event loop (không thread-safe).
+    """
+
+    def __init__(self):
+        self._message: Optional[Dict[str, Any]] = None
+        self._received_at = 0.0
+        self._event = asyncio.Event()
+        self._closed = False
+        self.received_count = 0
+        self.dropped_count = 0
+
+    def put(self, message: Dict[str, Any]):
+        """
+        Đặt frame mới vào slot
+
+        INPUT:
+            message: dict - ASGI websocket.receive message ('text' hoặc 'bytes')
+        SIDE EFFECTS: Frame chưa xử lý trước đó bị drop
+        """
+        if self._message is not None:
+            self.dropped_count += 1
+        self._message = message
+        self._received_at = time.time()
+        self.received_count += 1
+        self._event.set()
+
+    async def get(self) -> Optional[Dict[str, Any]]:
+        """
+        Chờ và lấy frame mới nhất
+
+        OUTPUT:
+            message dict, hoặc None nếu slot đã đóng và không còn frame
+        """
+        await self._event.wait()
+        if not self._closed:
+            self._event.clear()
+        message, self._message = self._message, None
+        return message
+
+    @property
+    def received_at(self) -> float:
+        """Thời điểm nhận frame vừa được get()"""
+        return self._received_at
+
+    def close(self):
+        """Đóng slot - get() trả về None khi hết frame"""
+        self._closed = True
+        self._event.set()
+
+
+async def receive_latest_frames(websocket: WebSocket, slot: LatestFrameSlot):
+    """
+    Receiver task: đọc frames từ WebSocket vào slot cho tới khi client ngắt kết nối
+
+    INPUT:
+        websocket: WebSocket đã accept
+        slot: LatestFrameSlot của connection
+    SIDE EFFECTS: Đóng slot khi socket đóng hoặc lỗi
+    """
+    try:
+        while True:
+            message = await websocket.receive()
+            if message['type'] == 'websocket.disconnect':
+                break
+            slot.put(message)
+    except Exception as e:
+        logger.error(f"[WebSocket] Receiver error: {str(e)}")
+    finally:
+        slot.close()
+
+
+def is_end_of_stream(message: Dict[str, Any]) -> bool:
+    """
+    Message có phải {"type": "end"} không (frames base64 không bao giờ bắt đầu bằng '{')
+
+    INPUT:
+        message: dict - ASGI websocket.receive message
+    """
+    text = message.get('text')
+    if not text or not text.lstrip().startswith('{'):
+        return False
+    try:
+        control = json.loads(text)
+    except ValueError:
+        return False
+    return isinstance(control, dict) and control.get('type') == END_OF_STREAM
+
+
+class HandTrackingSession:
+    """
+    State của một realtime hand tracking connection
+
+    - slot: LatestFrameSlot chứa frame mới nhất
+    - Hands graph riêng checkout từ pool trong open(), trả lại trong close()
+    - smoother: HandLandmarkSmoother (None = gửi keypoints thô)
+    - tracker: HandRoiTracker (None = inference trên toàn frame mỗi frame)
+    - resolution: InferenceResolution - width đưa vào MediaPipe
+    - encoder: ResponseEncoder (None = JSON format cũ qua send_json)
+    - telemetry: FrameTelemetry - sampled debug logging của session
+    - recognizer: SlidingWindowRecognizer (None = chỉ gửi keypoints), tạo trong open()
+    - emotion: EmotionTracker (None = không chạy face mesh), tạo trong open()
+
+    open(), process() và close() là blocking. process() chạy qua inference_executor;
+    open() (có thể chờ graph tới HANDS_POOL_CHECKOUT_TIMEOUT) và close() chạy trên
+    thread riêng (asyncio.to_thread) để không chiếm worker của các sessions đang chạy.
+    """
+
+    def __init__(
+        self,
+        smoothing: Optional[str] = None,
+        roi_tracking: Union[bool, str, None] = None,
+        response_format: Optional[str] = None,
+        delta: Union[bool, str, None] = None,
+        recognition: Union[bool, str, None] = None,
+        emotion: Union[bool, str, None] = None
+    ):
+        """
+        INPUT:
+            smoothing: 'none' | 'one_euro' | 'kalman' (default: settings.LANDMARK_SMOOTHING)
+            roi_tracking: bool hoặc '1'/'0', 'true'/'false', ... (default: settings.HAND_ROI_TRACKING)
+            response_format: 'json' | 'flat' | 'binary' | 'msgpack' (default: settings.REALTIME_RESPONSE_FORMAT)
+            delta: Gửi keypoints dạng delta (format compact), bool hoặc '1'/'0', ... (default: False)
+            recognition: Nhận diện gesture theo sliding window, bool hoặc '1'/'0', ...
+                (default: settings.REALTIME_GESTURE_RECOGNITION)
+            emotion: Nhận diện cảm xúc (face mesh mỗi EMOTION_FACE_INTERVAL frames),
+                bool hoặc '1'/'0', ... (default: settings.REALTIME_EMOTION_RECOGNITION)
+        RAISES:
+            ValueError nếu smoothing method, roi_tracking, response format, delta,
+            recognition hoặc emotion không hợp lệ
+        """
+        smoothing = smoothing or settings.LANDMARK_SMOOTHING
+        roi_tracking = _parse_flag('roi_tracking', roi_tracking, settings.HAND_ROI_TRACKING)
+        response_format = response_format or settings.REALTIME_RESPONSE_FORMAT
+        delta = _parse_flag('delta', delta, False)
+        self.recognition = _parse_flag('recognition', recognition, settings.REALTIME_GESTURE_RECOGNITION)
+        self.emotion_recognition = _parse_flag('emotion', emotion, settings.REALTIME_EMOTION_RECOGNITION)
+
+        self.slot = LatestFrameSlot()
+        self.smoother = HandLandmarkSmoother(smoothing) if smoothing != 'none' else None
+        self.tracker = HandRoiTracker() if roi_tracking else None
+        self.encoder = ResponseEncoder(response_format, delta) if response_format != 'json' else None
+        self.telemetry = telemetry.frame_telemetry('hand_tracking')
+        self.recognizer = None
+        self.emotion = None
+        self.resolution = InferenceResolution(
+            settings.REALTIME_INFERENCE_WIDTH,
+            adaptive=settings.REALTIME_ADAPTIVE_RESOLUTION,
+            latency_budget=settings.REALTIME_LATENCY_BUDGET_MS / 1000,
+            min_width=settings.REALTIME_MIN_INFERENCE_WIDTH
+        )
+        self._hands = None
+
+    def open(self):
+        """
+        Checkout Hands graph cho session (và load gesture model nếu bật recognition,
+        tạo emotion tracker nếu bật emotion)
+
+        RAISES:
+            TimeoutError nếu pool đầy quá settings.HANDS_POOL_CHECKOUT_TIMEOUT
+        """
+        if self.recognition and self.recognizer is None:
+            self.recognizer = service.create_gesture_recognizer()
+        if self.emotion_recognition and self.emotion is None:
+            self.emotion = service.create_emotion_tracker()
+        self._hands = model_manager.get_hands_pool().checkout(settings.HANDS_POOL_CHECKOUT_TIMEOUT)
+
+    def process(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Xử lý một frame message (text: base64, bytes: binary frame)
+
+        INPUT:
+            message: dict - ASGI websocket.receive message
+        OUTPUT:
+            dict - Realtime hand keypoints response (xem service.detect_hand_keypoints_realtime)
+        """
+        if message.get('bytes') is not None:
+            return service.detect_hand_keypoints_from_bytes(
+                message['bytes'], hands=self._hands, smoother=self.smoother,
+                tracker=self.tracker, resolution=self.resolution, encoder=self.encoder,
+                recognizer=self.recognizer, emotion=self.emotion
+            )
+        return service.detect_hand_keypoints_realtime(
+            message['text'], hands=self._hands, smoother=self.smoother,
+            tracker=self.tracker, resolution=self.resolution, encoder=self.encoder,
+            recognizer=self.recognizer, emotion=self.emotion
+        )
+
+    def encode(self, result: Dict[str, Any]) -> Union[Dict[str, Any], str, bytes]:
+        """
+        Serialize response theo format của session
+
+        OUTPUT:
+            dict (JSON format cũ - send_json), str (send_text) hoặc bytes (send_bytes)
+        """
+        if self.encoder is None:
+            return result
+        return self.encoder.dumps(result)
+
+    def finish(self) -> List[Dict[str, Any]]:
+        """
+        Kết thúc stream (client gửi END_OF_STREAM)
+
+        OUTPUT:
+            list gesture events - 'end' của gesture đang mở (rỗng nếu không có)
+        """
+        if self.recognizer is None:
+            return []
+        return self.recognizer.flush()
+
+    def close(self):
+        """Trả Hands graph về pool"""
+        if self._hands is not None:
+            hands, self._hands = self._hands, None
+            model_manager.get_hands_pool().checkin(hands)
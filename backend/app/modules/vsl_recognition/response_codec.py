@@ -0,0 +1,263 @@
+"""
+Realtime Response Codec - Encode hand keypoint responses gọn cho WebSocket
+
+Format mặc định ('json') gửi 42 dicts {'id','x','y','z'} mỗi frame qua
+send_json. Các format compact encode thẳng từ LandmarkFrame arrays, không tạo
+dicts cho từng keypoint:
+
+- 'flat': JSON, keypoints mỗi hand là list int [x0, y0, z0, x1, ...] đã
+  quantize (toạ độ * KEYPOINT_QUANTIZATION, int16)
+- 'binary': binary message - header RESPONSE_HEADER + handedness codes +
+  int16 keypoints (int8 nếu là delta frame)
+- 'msgpack': như 'flat' nhưng serialize bằng MessagePack (optional dependency)
+
+Delta mode (?delta=1): keypoints được gửi dạng hiệu so với frame có hands
+gần nhất đã gửi (trên giá trị đã quantize nên không tích luỹ sai số).
+Keyframe (giá trị tuyệt đối) được gửi khi frame đầu tiên, khi số hands /
+handedness thay đổi, mỗi DELTA_KEYFRAME_INTERVAL frames, và (binary) khi
+delta không vừa int8. Error responses không thay đổi delta state.
+
+Binary message layout (little-endian):
+    header RESPONSE_HEADER: magic 'VSLK' (4s), version (B), flags (B),
+        hand_count (B), reserved (B), sequence (I), timestamp (d),
+        processing_time (f), inference_scale (f, NaN nếu không có),
+        frames_dropped (I)
+    handedness: hand_count bytes - index vào HAND_TYPES
+    keypoints: hand_count * 21 * 3 - int16 (keyframe) hoặc int8 (delta)
+    error: UTF-8 message (chỉ khi flags không có FLAG_SUCCESS)
+"""
+import json
+import math
+import struct
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+
+from ...core.landmarks import LandmarkFrame
+
+RESPONSE_FORMATS = ('json', 'flat', 'binary', 'msgpack')
+
+# Toạ độ normalized * 10000 -> int16 (độ chính xác 1e-4 như format JSON cũ)
+KEYPOINT_QUANTIZATION = 10000
+HAND_KEYPOINTS = 21
+
+# Handedness codes trong binary message
+HAND_TYPES = ('Unknown', 'Left', 'Right')
+_HAND_TYPE_CODES = {name: code for code, name in enumerate(HAND_TYPES)}
+
+# Số frames tối đa giữa 2 keyframes trong delta mode
+DELTA_KEYFRAME_INTERVAL = 30
+
+RESPONSE_MAGIC = b"VSLK"
+RESPONSE_VERSION = 1
+RESPONSE_HEADER = struct.Struct("<4sBBBBIdffI")
+
+# Binary header flags
+FLAG_SUCCESS = 0x01
+FLAG_KEYFRAME = 0x02
+FLAG_DELTA = 0x04
+
+_INT16 = np.iinfo(np.int16)
+_INT8 = np.iinfo(np.int8)
+
+
+class ResponseEncoder:
+    """
+    Encoder response của một realtime session (giữ delta state)
+
+    Gọi encode_hands() trong service khi format keypoints, rồi dumps() ở
+    router khi gửi (sau khi thêm 'frames_dropped').
+    """
+
+    def __init__(self, response_format: str = 'flat', delta: bool = False):
+        """
+        INPUT:
+            response_format: 'flat' | 'binary' | 'msgpack'
+            delta: Gửi keypoints dạng delta giữa các frames
+        RAISES:
+            ValueError nếu format không hỗ trợ, hoặc msgpack chưa được cài
+        """
+        if response_format not in RESPONSE_FORMATS or response_format == 'json':
+            raise ValueError(
+                f"Unsupported response format: {response_format}. Supported: {', '.join(RESPONSE_FORMATS)}"
+            )
+        if response_format == 'msgpack':
+            try:
+                import msgpack
+            except ImportError:
+                raise ValueError("Response format 'msgpack' requires the msgpack package (pip install msgpack)")
+            self._packb = msgpack.packb
+
+        self.format = response_format
+        self.delta = delta
+        self.reset()
+
+    @property
+    def binary(self) -> bool:
+        """True nếu dumps() trả về bytes (gửi bằng send_bytes)"""
+        return self.format != 'flat'
+
+    def reset(self):
+        """Xoá delta state - frame tiếp theo là keyframe"""
+        self._previous: Optional[np.ndarray] = None
+        self._previous_hand_types: Optional[List[str]] = None
+        self._frames_since_keyframe = 0
+        self._sequence = 0
+        self._keyframe = True
+        self._hand_codes = b""
+        self._payload: Optional[np.ndarray] = None
+
+    def encode_hands(self, frame: LandmarkFrame) -> Union[List[Dict[str, Any]], np.ndarray]:
+        """
+        Quantize keypoints của frame (cập nhật delta state)
+
+        INPUT:
+            frame: LandmarkFrame (kind 'hands')
+        OUTPUT:
+            'flat' / 'msgpack': list of {'hand_type', 'keypoints': list int (63,)}
+            'binary': int16/int8 array (hands, 21, 3)
+        """
+        hand_types = [hand_type for hand_type, _ in frame.iter_hands()]
+        if hand_types:
+            points = np.stack([points[:, :3] for _, points in frame.iter_hands()])
+        else:
+            points = np.zeros((0, HAND_KEYPOINTS, 3), np.float32)
+        quantized = np.clip(np.rint(points * KEYPOINT_QUANTIZATION), _INT16.min, _INT16.max).astype(np.int16)
+
+        payload = quantized
+        keyframe = (
+            not self.delta
+            or self._previous is None
+            or hand_types != self._previous_hand_types
+            or self._frames_since_keyframe >= DELTA_KEYFRAME_INTERVAL
+        )
+        if not keyframe:
+            delta = quantized.astype(np.int32) - self._previous
+            # Binary delta frames dùng int8 - delta lớn hơn thì gửi keyframe
+            if self.format != 'binary' or (delta.min(initial=0) >= _INT8.min and delta.max(initial=0) <= _INT8.max):
+                payload = delta.astype(np.int8 if self.format == 'binary' else np.int32)
+            else:
+                keyframe = True
+
+        self._keyframe = keyframe
+        self._frames_since_keyframe = 0 if keyframe else self._frames_since_keyframe + 1
+        self._previous = quantized.astype(np.int32)
+        self._previous_hand_types = hand_types
+        self._hand_codes = bytes(_HAND_TYPE_CODES.get(hand_type, 0) for hand_type in hand_types)
+
+        if self.format == 'binary':
+            self._payload = payload
+            return payload
+        return [
+            {'hand_type': hand_type, 'keypoints': keypoints.ravel().tolist()}
+            for hand_type, keypoints in zip(hand_types, payload)
+        ]
+
+    def dumps(self, result: Dict[str, Any]) -> Union[str, bytes]:
+        """
+        Serialize response (sau encode_hands nếu result thành công)
+
+        INPUT:
+            result: dict - response của service (+ 'frames_dropped')
+        OUTPUT:
+            str ('flat') hoặc bytes ('binary', 'msgpack')
+        """
+        self._sequence += 1
+        success = bool(result.get('success'))
+
+        if self.format == 'binary':
+            return self._dumps_binary(result, success)
+
+        message = dict(result)
+        message['sequence'] = self._sequence
+        message['quantization'] = KEYPOINT_QUANTIZATION
+        if success:
+            message['keyframe'] = self._keyframe
+        if self.format == 'msgpack':
+            return self._packb(message)
+        return json.dumps(message, separators=(',', ':'))
+
+    def _dumps_binary(self, result: Dict[str, Any], success: bool) -> bytes:
+        """Binary message - xem layout ở đầu module"""
+        inference_scale = result.get('inference_scale')
+        flags = 0
+        hand_codes = b""
+        body = b""
+        if success:
+            flags |= FLAG_SUCCESS
+            flags |= FLAG_KEYFRAME if self._keyframe else FLAG_DELTA
+            hand_codes = self._hand_codes
+            body = self._payload.tobytes()
+        else:
+            body = str(result.get('error') or '').encode('utf-8')
+
+        header = RESPONSE_HEADER.pack(
+            RESPONSE_MAGIC,
+            RESPONSE_VERSION,
+            flags,
+            len(hand_codes),
+            0,
+            self._sequence & 0xFFFFFFFF,
+            float(result.get('timestamp') or 0.0),
+            float(result.get('processing_time') or 0.0),
+            math.nan if inference_scale is None else float(inference_scale),
+            int(result.get('frames_dropped') or 0)
+        )
+        return header + hand_codes + body
+
+
+def decode_binary_response(message: bytes, previous: Optional[np.ndarray] = None) -> Dict[str, Any]:
+    """
+    Decode binary response (dùng cho client Python / testing)
+
+    INPUT:
+        message: bytes - binary response
+        previous: int16 keypoints (hands, 21, 3) của keyframe/frame trước (delta frames)
+    OUTPUT:
+        dict {'success', 'keyframe', 'sequence', 'timestamp', 'processing_time',
+              'inference_scale', 'frames_dropped', 'hand_types',
+              'quantized': int16 (hands, 21, 3), 'keypoints': float32 (hands, 21, 3),
+              'error'}
+    RAISES:
+        ValueError nếu message không hợp lệ
+    """
+    if len(message) < RESPONSE_HEADER.size or not message.startswith(RESPONSE_MAGIC):
+        raise ValueError("Invalid binary response")
+
+    (_, version, flags, hand_count, _, sequence, timestamp,
+     processing_time, inference_scale, frames_dropped) = RESPONSE_HEADER.unpack_from(message)
+    if version != RESPONSE_VERSION:
+        raise ValueError(f"Unsupported binary response version: {version}")
+
+    offset = RESPONSE_HEADER.size
+    decoded = {
+        'success': bool(flags & FLAG_SUCCESS),
+        'keyframe': bool(flags & FLAG_KEYFRAME),
+        'sequence': sequence,
+        'timestamp': timestamp,
+        'processing_time': processing_time,
+        'inference_scale': None if math.isnan(inference_scale) else inference_scale,
+        'frames_dropped': frames_dropped,
+        'hand_types': [],
+        'quantized': np.zeros((0, HAND_KEYPOINTS, 3), np.int16),
+        'keypoints': np.zeros((0, HAND_KEYPOINTS, 3), np.float32),
+        'error': None
+    }
+    if not decoded['success']:
+        decoded['error'] = message[offset:].decode('utf-8')
+        return decoded
+
+    decoded['hand_types'] = [HAND_TYPES[code] for code in message[offset:offset + hand_count]]
+    offset += hand_count
+    shape = (hand_count, HAND_KEYPOINTS, 3)
+    if flags & FLAG_DELTA:
+        if previous is None:
+            raise ValueError("Delta response requires the previous keypoints")
+        delta = np.frombuffer(message, np.int8, count=int(np.prod(shape)), offset=offset).reshape(shape)
+        quantized = (previous.astype(np.int32) + delta).astype(np.int16)
+    else:
+        quantized = np.frombuffer(message, np.int16, count=int(np.prod(shape)), offset=offset).reshape(shape)
+
+    decoded['quantized'] = quantized
+    decoded['keypoints'] = quantized.astype(np.float32) / KEYPOINT_QUANTIZATION
+    return decoded
@@ -0,0 +1,186 @@
+"""
+ROI Tracking - Crop-and-track hand detection cho realtime sessions
+
+Thay vì đưa cả frame (720p+) vào Hands graph mỗi frame, HandRoiTracker crop
+vùng quanh bounding box của hands ở frame trước (cộng margin) và chỉ convert
+BGR->RGB + inference trên vùng đó. Toạ độ được map ngược về toàn frame trong
+model_manager.extract_hand_landmarks(roi=...).
+
+Full-frame detection chạy lại khi:
+- Chưa có ROI (frame đầu, frame trước không có hand)
+- Đủ full_detection_interval frames kể từ lần full detection trước
+  (để phát hiện hand mới xuất hiện ngoài ROI)
+- Tracking trong ROI thất bại (chạy lại full detection ngay trên frame hiện
+  tại): số hands giảm, hoặc bounding box của một hand chạm mép crop (hand
+  đang ra khỏi ROI, landmarks có thể bị cắt). Handedness score không phải
+  tracking confidence nên không dùng để quyết định.
+
+Tracking nội bộ của MediaPipe (static_image_mode=False) dùng toạ độ normalized
+theo ảnh đầu vào, nên một graph chỉ được thấy một crop geometry:
+- Crops chạy trên Hands graph của session; graph được reset khi crop
+  geometry (pixel ROI) thay đổi. ROI được giữ cố định khi hands vẫn nằm gọn
+  bên trong nên reset (~20 ms) chỉ xảy ra khi hands di chuyển ra gần mép ROI.
+- Full-frame detection chạy trên graph static_image_mode=True mượn từ pool
+  riêng (model_manager.hands_session(static_image_mode=True)), không đụng
+  tới tracking state của crop graph.
+
+ROI lưu dạng normalized nên vẫn đúng khi inference resolution thay đổi giữa
+các frames (core/resolution.py).
+"""
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from ...config import settings
+from ...core.landmarks import LandmarkFrame
+from ...core.model_manager import model_manager
+
+Box = Tuple[float, float, float, float]
+
+
+class HandRoiTracker:
+    """
+    State crop-and-track của một realtime hand tracking session
+    """
+
+    def __init__(
+        self,
+        full_detection_interval: Optional[int] = None,
+        margin: Optional[float] = None,
+        edge_margin: Optional[float] = None
+    ):
+        """
+        INPUT:
+            full_detection_interval: Số frames tối đa giữa 2 lần full-frame detection
+                (default: settings.HAND_ROI_FULL_DETECTION_INTERVAL)
+            margin: Margin quanh bounding box, tính theo cạnh lớn của box
+                (default: settings.HAND_ROI_MARGIN)
+            edge_margin: Hand có bounding box cách mép crop ít hơn tỉ lệ này
+                (theo kích thước crop) thì full detection lại
+                (default: settings.HAND_ROI_EDGE_MARGIN)
+        """
+        self.full_detection_interval = max(1, full_detection_interval or settings.HAND_ROI_FULL_DETECTION_INTERVAL)
+        self.margin = settings.HAND_ROI_MARGIN if margin is None else margin
+        self.edge_margin = settings.HAND_ROI_EDGE_MARGIN if edge_margin is None else edge_margin
+        self.reset()
+
+    def reset(self):
+        """Xoá ROI - frame tiếp theo chạy full detection"""
+        self._roi: Optional[Box] = None
+        self._crop: Optional[Tuple[int, int, int, int]] = None  # pixel ROI crop graph đang track
+        self._hand_count = 0
+        self._frames_since_full = 0
+        self.full_detections = 0
+        self.roi_detections = 0
+        self.tracking_failures = 0
+        self.graph_resets = 0
+
+    def detect(self, image: np.ndarray, is_rgb: bool = False, hands=None) -> LandmarkFrame:
+        """
+        Detect hands của một frame (ROI hoặc full frame)
+
+        INPUT:
+            image: numpy array (H, W, 3) - BGR, hoặc RGB nếu is_rgb
+            is_rgb: bool - True nếu image đã ở RGB
+            hands: Hands graph của session (dùng cho crops)
+        OUTPUT:
+            LandmarkFrame (kind 'hands') - toạ độ normalized theo toàn frame
+        """
+        height, width = image.shape[:2]
+        roi = self._roi if self._frames_since_full < self.full_detection_interval else None
+
+        frame = None
+        if roi is not None:
+            pixel_roi = (
+                int(roi[0] * width), int(roi[1] * height),
+                int(np.ceil(roi[2] * width)), int(np.ceil(roi[3] * height))
+            )
+            if pixel_roi != self._crop and hands is not None:
+                # New crop geometry - drop tracking state of the previous input
+                hands.reset()
+                self.graph_resets += 1
+                self._crop = pixel_roi
+            frame = model_manager.extract_hand_landmarks(image, is_rgb=is_rgb, hands=hands, roi=pixel_roi)
+            self.roi_detections += 1
+            self._frames_since_full += 1
+            if frame.hand_count < self._hand_count or self._clipped(frame, pixel_roi, width, height):
+                self.tracking_failures += 1
+                frame = None
+
+        if frame is None:
+            with model_manager.hands_session(static_image_mode=True) as detector:
+                frame = model_manager.extract_hand_landmarks(image, is_rgb=is_rgb, hands=detector)
+            self.full_detections += 1
+            self._frames_since_full = 0
+            roi = None
+
+        self._hand_count = frame.hand_count
+        self._roi = self._next_roi(frame, width, height, roi)
+        return frame
+
+    def _clipped(self, frame: LandmarkFrame, pixel_roi: Tuple[int, int, int, int], width: int, height: int) -> bool:
+        """
+        Có hand nào chạm mép crop không (bỏ qua các mép trùng mép frame)
+
+        OUTPUT:
+            True nếu bounding box của một hand cách mép crop < edge_margin
+        """
+        x0, y0, x1, y1 = pixel_roi
+        border_x = self.edge_margin * (x1 - x0)
+        border_y = self.edge_margin * (y1 - y0)
+        for _, points in frame.iter_hands():
+            hx0, hy0 = points[:, 0].min() * width, points[:, 1].min() * height
+            hx1, hy1 = points[:, 0].max() * width, points[:, 1].max() * height
+            if ((x0 > 0 and hx0 - x0 < border_x) or (y0 > 0 and hy0 - y0 < border_y)
+                    or (x1 < width and x1 - hx1 < border_x) or (y1 < height and y1 - hy1 < border_y)):
+                return True
+        return False
+
+    def _next_roi(self, frame: LandmarkFrame, width: int, height: int, current: Optional[Box]) -> Optional[Box]:
+        """
+        ROI cho frame tiếp theo: bounding box của tất cả hands + margin
+
+        OUTPUT:
+            (x0, y0, x1, y1) normalized, None nếu không có hand (full detection)
+        """
+        if not frame.hand_count:
+            return None
+
+        xy = frame.points[:, :2]
+        (x0, y0), (x1, y1) = xy.min(axis=0), xy.max(axis=0)
+
+        # Margin theo cạnh lớn của box (pixels), quy về normalized theo từng trục
+        pad = self.margin * max((x1 - x0) * width, (y1 - y0) * height)
+        pad_x, pad_y = pad / width, pad / height
+
+        # Giữ ROI hiện tại nếu hands vẫn cách mép ROI ít nhất nửa margin
+        if current is not None:
+            cx0, cy0, cx1, cy1 = current
+            if (x0 - pad_x / 2 >= cx0 and y0 - pad_y / 2 >= cy0
+                    and x1 + pad_x / 2 <= cx1 and y1 + pad_y / 2 <= cy1):
+                return current
+
+        roi = (
+            max(0.0, float(x0 - pad_x)),
+            max(0.0, float(y0 - pad_y)),
+            min(1.0, float(x1 + pad_x)),
+            min(1.0, float(y1 + pad_y))
+        )
+        if (roi[2] - roi[0]) * width < 2 or (roi[3] - roi[1]) * height < 2:
+            return None
+        return roi
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Thống kê của tracker
+
+        OUTPUT:
+            {'full_detections', 'roi_detections', 'tracking_failures', 'graph_resets', 'roi'}
+        """
+        return {
+            'full_detections': self.full_detections,
+            'roi_detections': self.roi_detections,
+            'tracking_failures': self.tracking_failures,
+            'graph_resets': self.graph_resets,
+            'roi': self._roi
+        }
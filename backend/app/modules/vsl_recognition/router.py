@@ -1,19 +1,25 @@
 """
 VSL Recognition Router - API Endpoints
 """
-from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Query, WebSocket, WebSocketDisconnect
 from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 from typing import Optional
+import asyncio
 import time
+from concurrent.futures import Future
 import logging
 from pathlib import Path
 
 from ...database.db import get_db
 from ...database.schemas import VSLRecognitionResponse, APIResponse
 from ...config import settings
-from ...core.utils import save_uploaded_file, validate_file_extension, create_response
+from ...core.utils import save_upload_stream, UploadTooLargeError, validate_file_extension, create_response
+from ...core.executor import inference_executor
+from ...core.landmark_profiles import LANDMARK_PROFILES
 from . import service
+from .frame_protocol import BINARY_SUBPROTOCOL
+from .realtime_session import HandTrackingSession, is_end_of_stream, receive_latest_frames
 
 logger = logging.getLogger(__name__)
 
@@ -23,6 +29,7 @@ router = APIRouter(prefix="/vsl", tags=["VSL Recognition"])
 @router.post("/recognize-video", response_model=APIResponse)
 async def recognize_video(
     file: UploadFile = File(...),
+    landmark_profile: Optional[str] = Query(None),
     db: Session = Depends(get_db)
 ):
     """
@@ -30,6 +37,8 @@ async def recognize_video(
 
     **INPUT:**
     - file: Video file (mp4, avi, mov, mkv)
+    - landmark_profile: hands | hands_pose | holistic (optional, default: profile
+      của model đang serve, rồi settings.LANDMARK_PROFILE)
 
     **OUTPUT:**
     - success: bool
@@ -53,16 +62,20 @@ async def recognize_video(
                 error="Invalid file type"
             )
 
+        if landmark_profile is not None and landmark_profile not in LANDMARK_PROFILES:
+            return create_response(
+                success=False,
+                message=f"Invalid landmark profile. Allowed: {', '.join(LANDMARK_PROFILES)}",
+                error="Invalid landmark profile"
+            )
+
         # Save uploaded file
-        file_content = await file.read()
-        file_path = save_uploaded_file(
-            file_content,
-            file.filename,
-            settings.RAW_DATA_DIR / "videos"
-        )
+        upload = await save_upload_stream(file, settings.RAW_DATA_DIR / "videos")
 
         # Call recognition service
-        result = service.recognize_from_video(file_path)
+        result = await inference_executor.run(
+            service.recognize_from_video, upload.path, {'landmark_profile': landmark_profile}
+        )
 
         processing_time = time.time() - start_time
         result['processing_time'] = processing_time
@@ -73,6 +86,12 @@ async def recognize_video(
             data=result
         )
 
+    except UploadTooLargeError as e:
+        return create_response(
+            success=False,
+            message="File too large",
+            error=str(e)
+        )
     except Exception as e:
         return create_response(
             success=False,
@@ -112,15 +131,10 @@ async def recognize_image(
             )
 
         # Save uploaded file
-        file_content = await file.read()
-        file_path = save_uploaded_file(
-            file_content,
-            file.filename,
-            settings.RAW_DATA_DIR / "images"
-        )
+        upload = await save_upload_stream(file, settings.RAW_DATA_DIR / "images")
 
         # Call recognition service
-        result = service.recognize_from_image(file_path)
+        result = await inference_executor.run(service.recognize_from_image, upload.path)
 
         return create_response(
             success=result['success'],
@@ -128,6 +142,12 @@ async def recognize_image(
             data=result
         )
 
+    except UploadTooLargeError as e:
+        return create_response(
+            success=False,
+            message="File too large",
+            error=str(e)
+        )
     except Exception as e:
         return create_response(
             success=False,
@@ -226,6 +246,7 @@ async def hand_tracking_video(
     file: UploadFile = File(...),
     sample_rate: int = 5,
     max_frames: int = None,
+    parallel: bool = False,
     db: Session = Depends(get_db)
 ):
     """
@@ -235,6 +256,7 @@ async def hand_tracking_video(
     - file: Video file (mp4, avi, mov, mkv)
     - sample_rate: Process 1 frame every N frames (default: 5)
     - max_frames: Maximum frames to process (default: None = all frames)
+    - parallel: Split the video across worker processes (default: False)
 
     **OUTPUT:**
     - success: bool
@@ -243,6 +265,7 @@ async def hand_tracking_video(
         - hands_detected_frames: int
         - sample_frames: list - Sample of frames with keypoint data
         - summary: dict - Summary statistics
+        - cache_hit: bool - Same clip was processed before with the same settings
         - processing_time: float
 
     **STUDENT TODO:**
@@ -264,26 +287,24 @@ async def hand_tracking_video(
                 error=f"Allowed: {', '.join(settings.ALLOWED_VIDEO_EXTENSIONS)}"
             )
 
-        # Save uploaded file
-        file_content = await file.read()
-        if len(file_content) > settings.MAX_UPLOAD_SIZE:
+        # Save uploaded file (streamed to disk, aborted once MAX_UPLOAD_SIZE is exceeded)
+        try:
+            upload = await save_upload_stream(file, settings.RAW_DATA_DIR / "videos")
+        except UploadTooLargeError as e:
             return create_response(
                 success=False,
                 message="File too large",
-                error=f"Maximum size: {settings.MAX_UPLOAD_SIZE / (1024*1024):.0f}MB"
+                error=str(e)
             )
 
-        file_path = save_uploaded_file(
-            file_content,
-            file.filename,
-            settings.RAW_DATA_DIR / "videos"
-        )
-
         # Process video and extract hand keypoints
-        result = service.process_video_hand_keypoints(
-            str(file_path),
+        result = await inference_executor.run(
+            service.process_video_hand_keypoints,
+            upload.path,
             sample_rate=sample_rate,
-            max_frames=max_frames
+            max_frames=max_frames,
+            parallel=parallel,
+            content_hash=upload.sha256
         )
 
         processing_time = time.time() - start_time
@@ -314,8 +335,28 @@ async def hand_tracking_realtime(websocket: WebSocket):
     Frontend sends camera frames, backend returns hand keypoint locations.
 
     **PROTOCOL:**
-    - Frontend sends: base64-encoded JPEG frames
+    - Text mode (default): frontend sends base64-encoded JPEG frames
+      (data URL or plain base64) as text messages
+    - Binary mode: client requests subprotocol "vsl.frames.v1" and sends
+      binary messages - either encoded JPEG/WebP/PNG bytes or raw frames
+      with a 12-byte header (see frame_protocol.py). The server accepts the
+      subprotocol when offered; text messages are still accepted in both modes.
     - Backend sends: JSON with hand keypoint coordinates
+    - End of stream: client sends the text message {"type": "end"}; the server
+      ends any open gesture (sends its 'end' event) and closes with code 1000
+    - Query params: smoothing=none|one_euro|kalman - temporal keypoint filter
+      for this session (default: settings.LANDMARK_SMOOTHING);
+      roi_tracking=true|false - crop-and-track around the previous hands,
+      full-frame detection only every N frames or when tracking is lost
+      (default: settings.HAND_ROI_TRACKING);
+      format=json|flat|binary|msgpack - response encoding (default:
+      settings.REALTIME_RESPONSE_FORMAT, see response_codec.py);
+      delta=true|false - compact formats send keypoint deltas between keyframes;
+      recognition=true|false - sliding-window gesture recognition (default:
+      settings.REALTIME_GESTURE_RECOGNITION, see gesture_stream.py);
+      emotion=true|false - emotion detection with face mesh every
+      EMOTION_FACE_INTERVAL frames (default: settings.REALTIME_EMOTION_RECOGNITION,
+      see emotion_stream.py)
 
     **OUTPUT FORMAT:**
     {
@@ -330,42 +371,132 @@ async def hand_tracking_realtime(websocket: WebSocket):
                 ]
             }
         ],
+        'timestamp': float,
+        'inference_scale': float,  # inference width / frame width (see REALTIME_INFERENCE_WIDTH)
+        'frames_dropped': int  # frames skipped because a newer one arrived
+    }
+    Compact formats ('flat' JSON text, 'binary' / 'msgpack' binary messages)
+    carry int16-quantized keypoints [x0, y0, z0, ...] per hand instead of
+    dicts - see response_codec.py for the layouts.
+
+    **GESTURE EVENTS** (recognition=true): sent as separate JSON messages right
+    after the frame response, at most GESTURE_WINDOW_STRIDE frames after the
+    window that triggered them:
+    {
+        'type': 'gesture',
+        'event': 'start' | 'end',
+        'label': str,
+        'confidence': float,
+        'start_time': float,
+        'end_time': float | None  # set on 'end'
+    }
+
+    **EMOTION EVENTS** (emotion=true): sent as separate JSON messages after the
+    frame response when the smoothed emotion changes; clients hold the last
+    emotion until the next event:
+    {
+        'type': 'emotion',
+        'emotion': str,
+        'confidence': float,
         'timestamp': float
     }
 
+    **BACKPRESSURE:**
+    Latest-frame-wins: while a frame is being processed only the newest
+    incoming frame is kept, older ones are dropped and counted.
+
     **USAGE:**
     - Connect via WebSocket: ws://localhost:8000/api/v1/vsl/hand-tracking/realtime
     - Send base64-encoded frame as text message
+      (or `new WebSocket(url, ['vsl.frames.v1'])` and send frame bytes)
     - Receive JSON response with keypoint data
 
     **NOTE:**
     - This is a basic implementation for students to build upon
     - Optimized for educational purposes, showing keypoint locations in real-time
     """
-    await websocket.accept()
-    logger.info("[WebSocket] Hand tracking client connected")
+    subprotocol = BINARY_SUBPROTOCOL if BINARY_SUBPROTOCOL in websocket.scope.get('subprotocols', []) else None
+    await websocket.accept(subprotocol=subprotocol)
+    logger.info(f"[WebSocket] Hand tracking client connected (mode: {'binary' if subprotocol else 'text'})")
+
+    # Each session tracks hands on its own graph from the pool
+    try:
+        session = HandTrackingSession(
+            smoothing=websocket.query_params.get('smoothing'),
+            roi_tracking=websocket.query_params.get('roi_tracking'),
+            response_format=websocket.query_params.get('format'),
+            delta=websocket.query_params.get('delta'),
+            recognition=websocket.query_params.get('recognition'),
+            emotion=websocket.query_params.get('emotion')
+        )
+    except ValueError as e:
+        await websocket.send_json({
+            'success': False,
+            'hands_detected': 0,
+            'hands': [],
+            'error': str(e),
+            'timestamp': time.time()
+        })
+        await websocket.close(code=1008)
+        return
+
+    try:
+        # Waiting for a free graph must not block the inference workers of live sessions
+        await asyncio.to_thread(session.open)
+    except TimeoutError as e:
+        logger.warning(f"[WebSocket] Hand tracking rejected: {str(e)}")
+        await websocket.send_json({
+            'success': False,
+            'hands_detected': 0,
+            'hands': [],
+            'error': "Server busy - no hand tracking graph available",
+            'timestamp': time.time()
+        })
+        await websocket.close(code=1013)
+        return
+
+    # Receiver task keeps only the newest frame; this loop processes whatever is newest
+    slot = session.slot
+    receiver = asyncio.create_task(receive_latest_frames(websocket, slot))
 
     try:
         while True:
-            # Receive frame data from frontend (base64-encoded image)
-            data = await websocket.receive_text()
+            message = await slot.get()
+            if message is None:
+                break
+            if is_end_of_stream(message):
+                # Clean close: end the open gesture so the client gets its 'end' event
+                for event in session.finish():
+                    await websocket.send_json(event)
+                await websocket.close(code=1000)
+                break
 
             try:
                 # Process frame and detect hand keypoints
-                result = service.detect_hand_keypoints_realtime(data)
-
-                # Print keypoints to console for debugging
-                if result['success'] and result['hands_detected'] > 0:
-                    logger.info(f"[Hand Tracking] Detected {result['hands_detected']} hand(s)")
-                    for hand in result['hands']:
-                        logger.info(f"  - {hand['hand_type']} hand: {len(hand['keypoints'])} keypoints")
-                        # Print first 3 keypoints as example
-                        for i, kp in enumerate(hand['keypoints'][:3]):
-                            logger.info(f"    Point {i}: x={kp['x']:.3f}, y={kp['y']:.3f}, z={kp['z']:.3f}")
-
-                # Send result back to frontend
-                await websocket.send_json(result)
-
+                result = await inference_executor.run(session.process, message)
+
+                # Sampled debug telemetry (1 in N frames, rate-limited, off by default)
+                result['frames_dropped'] = slot.dropped_count
+                session.telemetry.record(result)
+
+                # Send result back to frontend, then any gesture / emotion events
+                gesture_events = result.pop('gesture_events', None)
+                emotion_events = result.pop('emotion_events', None)
+                await _send_response(websocket, session.encode(result))
+                if isinstance(gesture_events, Future):
+                    # Batched prediction - wait for it before the next frame is pushed
+                    try:
+                        gesture_events = await asyncio.wrap_future(gesture_events)
+                    except Exception as e:
+                        logger.error(f"[WebSocket] Gesture recognition failed: {str(e)}")
+                        gesture_events = None
+                for event in gesture_events or ():
+                    await websocket.send_json(event)
+                for event in emotion_events or ():
+                    await websocket.send_json(event)
+
+            except WebSocketDisconnect:
+                raise
             except Exception as e:
                 logger.error(f"[WebSocket] Error processing frame: {str(e)}")
                 error_response = {
@@ -373,11 +504,35 @@ async def hand_tracking_realtime(websocket: WebSocket):
                     'hands_detected': 0,
                     'hands': [],
                     'error': str(e),
-                    'timestamp': time.time()
+                    'timestamp': time.time(),
+                    'frames_dropped': slot.dropped_count
                 }
-                await websocket.send_json(error_response)
+                await _send_response(websocket, session.encode(error_response))
+
+        logger.info(
+            f"[WebSocket] Hand tracking client disconnected "
+            f"(received: {slot.received_count}, dropped: {slot.dropped_count})"
+        )
 
     except WebSocketDisconnect:
         logger.info("[WebSocket] Hand tracking client disconnected")
     except Exception as e:
         logger.error(f"[WebSocket] Unexpected error: {str(e)}", exc_info=True)
+    finally:
+        receiver.cancel()
+        await asyncio.to_thread(session.close)
+
+
+async def _send_response(websocket: WebSocket, response):
+    """
+    Gửi realtime response theo kiểu đã encode
+
+    INPUT:
+        response: dict (send_json), str (send_text) hoặc bytes (send_bytes)
+    """
+    if isinstance(response, bytes):
+        await websocket.send_bytes(response)
+    elif isinstance(response, str):
+        await websocket.send_text(response)
+    else:
+        await websocket.send_json(response)
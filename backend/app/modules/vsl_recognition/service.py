@@ -5,17 +5,36 @@ Business logic cho VSL recognition
 STUDENT TODO: Implement các functions dưới đây
 """
 import logging
+import threading
 from pathlib import Path
 from typing import Dict, Any, Optional
 import time
 import base64
 import numpy as np
-import cv2
 
+from ...config import settings
+from ...core.batching import MicroBatcher
+from ...core.keypoint_cache import keypoint_cache
+from ...core.landmark_profiles import LandmarkPipeline
 from ...core.model_manager import model_manager
+from ...core.model_serving import model_server
+from ...core.resolution import downscale_for_inference
+from ...core.utils import iter_video_frames
+from .emotion_stream import EmotionTracker
+from .frame_protocol import decode_base64_frame, decode_binary_frame
+from .gesture_stream import FEATURE_SIZE, SlidingWindowRecognizer, predict_windows
+from .models import VSLRecognitionModel
+from .video_keypoints import (
+    extract_hand_keypoint_range,
+    extract_hand_keypoints_sharded,
+    build_hand_keypoints_result
+)
 
 logger = logging.getLogger(__name__)
 
+_gesture_batcher: Optional[MicroBatcher] = None
+_gesture_batcher_lock = threading.Lock()
+
 
 def recognize_from_video(video_path: str, options: Optional[Dict] = None) -> Dict[str, Any]:
     """
@@ -27,6 +46,9 @@ def recognize_from_video(video_path: str, options: Optional[Dict] = None) -> Dic
             - sample_rate: int - Lấy 1 frame mỗi N frames (default: 5)
             - confidence_threshold: float - Ngưỡng confidence (default: 0.5)
             - max_frames: int - Số frames tối đa xử lý (default: None)
+            - include_landmarks: bool - Trả về landmarks_sequence (default: False)
+            - landmark_profile: str - 'hands' | 'hands_pose' | 'holistic'
+              (default: profile của model trong registry, rồi settings.LANDMARK_PROFILE)
 
     OUTPUT:
         {
@@ -34,38 +56,149 @@ def recognize_from_video(video_path: str, options: Optional[Dict] = None) -> Dic
             'detected_text': str - Text được nhận diện,
             'confidence': float - Độ tin cậy (0-1),
             'frame_count': int - Số frames đã xử lý,
+            'landmark_profile': str - Profile đã dùng,
             'landmarks_sequence': list - Sequence of landmarks (optional),
             'processing_time': float - Thời gian xử lý (seconds),
             'error': str or None
         }
 
-    STUDENT TODO:
-        1. Load video và extract frames (sử dụng core/utils.py::extract_frames_from_video)
-        2. Với mỗi frame, extract landmarks (sử dụng core/model_manager.py::extract_holistic_landmarks)
-        3. Xây dựng sequence of landmarks
-        4. Load trained model và predict từ sequence
-        5. Post-process kết quả
-        6. Return kết quả theo format trên
+    Frames được đọc dạng stream (core/utils.py::iter_video_frames), mỗi frame
+    chỉ giữ lại landmarks nên bộ nhớ không phụ thuộc độ dài video. Chỉ các
+    MediaPipe graphs của landmark profile được chạy (core/landmark_profiles.py).
 
     EXAMPLE:
         result = recognize_from_video('/path/to/video.mp4')
         print(result['detected_text'])  # "Xin chào"
     """
-    # PLACEHOLDER - Students implement this
-    print("[VSL_RECOGNITION] recognize_from_video called")
-    print(f"  - video_path: {video_path}")
-    print(f"  - options: {options}")
+    options = options or {}
+    start_time = time.time()
 
-    # TODO: Implement actual recognition logic
-    return {
-        'success': True,
-        'detected_text': "PLACEHOLDER - Implement recognition logic",
-        'confidence': 0.0,
-        'frame_count': 0,
-        'landmarks_sequence': [],
-        'processing_time': 0.0,
-        'error': None
-    }
+    try:
+        landmarks_sequence = []
+        frame_info = []
+        # Holds the served model version for the whole request (hot-swap safe)
+        with model_server.acquire("vsl_recognition") as model:
+            profile = options.get('landmark_profile') or getattr(model, 'landmark_profile', None)
+            frames = iter_video_frames(
+                video_path,
+                sample_rate=options.get('sample_rate', 5),
+                max_frames=options.get('max_frames')
+            )
+            with LandmarkPipeline(profile) as pipeline:
+                for frame in frames:
+                    # LandmarkFrame: arrays, readable with the legacy '*_landmarks' keys
+                    landmarks_sequence.append(pipeline.process(frame.image))
+                    frame_info.append((frame.index, frame.timestamp))
+
+            prediction = model.predict_from_sequence(landmarks_sequence)
+        confidence = prediction['confidence']
+        detected_text = prediction['predicted_text'] if confidence >= options.get('confidence_threshold', 0.5) else ""
+
+        return {
+            'success': True,
+            'detected_text': detected_text,
+            'confidence': confidence,
+            'frame_count': len(landmarks_sequence),
+            'landmark_profile': pipeline.profile,
+            'landmarks_sequence': _landmarks_sequence_to_dicts(landmarks_sequence, frame_info)
+            if options.get('include_landmarks') else [],
+            'processing_time': round(time.time() - start_time, 2),
+            'error': None
+        }
+
+    except Exception as e:
+        logger.error(f"Error recognizing video: {str(e)}", exc_info=True)
+        return {
+            'success': False,
+            'detected_text': "",
+            'confidence': 0.0,
+            'frame_count': 0,
+            'landmark_profile': None,
+            'landmarks_sequence': [],
+            'processing_time': round(time.time() - start_time, 2),
+            'error': str(e)
+        }
+
+
+def _landmarks_sequence_to_dicts(landmarks_sequence: list, frame_info: list) -> list:
+    """Chuyển sequence LandmarkFrame sang list dicts cho JSON response"""
+    return [
+        {
+            'frame_number': frame_number,
+            'timestamp': timestamp,
+            'left_hand_landmarks': landmarks['left_hand_landmarks'],
+            'right_hand_landmarks': landmarks['right_hand_landmarks'],
+            'pose_landmarks': landmarks['pose_landmarks']
+        }
+        for landmarks, (frame_number, timestamp) in zip(landmarks_sequence, frame_info)
+    ]
+
+
+def _load_vsl_model(entry: Optional[Dict[str, Any]]) -> VSLRecognitionModel:
+    """Loader cho model_server: VSL recognition model của registry entry (None = chưa có active model)"""
+    if not entry:
+        return VSLRecognitionModel()
+    metadata = entry.get('metadata', {})
+    return VSLRecognitionModel(
+        Path(entry['model_path']),
+        backend=metadata.get('backend'),
+        labels=metadata.get('labels'),
+        landmark_profile=metadata.get('landmark_profile')
+    )
+
+
+def _warmup_vsl_model(model: VSLRecognitionModel):
+    """Chạy một window giả trước khi model mới được swap vào"""
+    model.predict_batch(np.zeros((1, settings.GESTURE_WINDOW_SIZE, FEATURE_SIZE), np.float32))
+
+
+model_server.register("vsl_recognition", _load_vsl_model, warmup=_warmup_vsl_model)
+
+
+def create_gesture_recognizer() -> SlidingWindowRecognizer:
+    """
+    Tạo sliding-window gesture recognizer cho một realtime session
+
+    OUTPUT:
+        SlidingWindowRecognizer dùng VSL recognition model đang active
+        (window / stride / threshold theo settings.GESTURE_*). Khi
+        settings.INFERENCE_BATCHING bật, windows của mọi sessions được
+        predict chung qua micro-batcher.
+    """
+    batcher = _get_gesture_batcher() if settings.INFERENCE_BATCHING else None
+    return SlidingWindowRecognizer(model_server.proxy("vsl_recognition"), batcher=batcher)
+
+
+def create_emotion_tracker() -> EmotionTracker:
+    """
+    Tạo emotion tracker cho một realtime session
+
+    OUTPUT:
+        EmotionTracker dùng detect_emotion() (face mesh mỗi
+        settings.EMOTION_FACE_INTERVAL frames, schedule / EMA theo settings.EMOTION_*)
+    """
+    return EmotionTracker(detect_emotion)
+
+
+def _get_gesture_batcher() -> MicroBatcher:
+    """Micro-batcher dùng chung cho gesture windows của mọi realtime sessions"""
+    global _gesture_batcher
+    if _gesture_batcher is None:
+        with _gesture_batcher_lock:
+            if _gesture_batcher is None:
+                _gesture_batcher = MicroBatcher(
+                    "vsl_recognition",
+                    _predict_gesture_windows,
+                    max_batch_size=settings.INFERENCE_BATCH_MAX_SIZE,
+                    max_wait=settings.INFERENCE_BATCH_MAX_WAIT_MS / 1000
+                )
+    return _gesture_batcher
+
+
+def _predict_gesture_windows(windows: list) -> list:
+    """Batch function của gesture batcher - mỗi batch dùng model version hiện tại"""
+    with model_server.acquire("vsl_recognition") as model:
+        return predict_windows(model, windows)
 
 
 def recognize_from_image(image_path: str, options: Optional[Dict] = None) -> Dict[str, Any]:
@@ -137,7 +270,9 @@ def recognize_realtime_frame(frame_data: bytes, options: Optional[Dict] = None)
         3. Predict gesture từ landmarks
         4. Return kết quả nhanh (< 100ms để realtime)
 
-    NOTE: Function này phải tối ưu cho tốc độ vì được gọi liên tục từ webcam
+    NOTE: Function này phải tối ưu cho tốc độ vì được gọi liên tục từ webcam.
+        Nhận diện gesture liên tục trên WebSocket hand tracking dùng
+        sliding window theo session (xem gesture_stream.py, ?recognition=true).
     """
     # PLACEHOLDER
     print("[VSL_RECOGNITION] recognize_realtime_frame called")
@@ -214,7 +349,9 @@ def detect_emotion(face_landmarks: list) -> Dict[str, Any]:
         {
             'success': bool,
             'emotion': str - 'happy', 'sad', 'angry', 'neutral', etc.,
-            'confidence': float
+            'confidence': float,
+            'probabilities': dict (optional) - emotion -> score; realtime sessions
+                smooth these across face mesh runs (emotion_stream.py)
         }
 
     STUDENT TODO:
@@ -226,9 +363,8 @@ def detect_emotion(face_landmarks: list) -> Dict[str, Any]:
     EMOTIONS TO DETECT:
         - neutral, happy, sad, angry, surprised, confused
     """
-    # PLACEHOLDER
-    print("[VSL_RECOGNITION] detect_emotion called")
-    print(f"  - face_landmarks count: {len(face_landmarks) if face_landmarks else 0}")
+    # PLACEHOLDER - called from the realtime hot path (emotion_stream.py), no print() here
+    logger.debug(f"detect_emotion called with {len(face_landmarks) if face_landmarks else 0} face landmarks")
 
     # TODO: Implement emotion detection
     return {
@@ -241,7 +377,9 @@ def detect_emotion(face_landmarks: list) -> Dict[str, Any]:
 def process_video_hand_keypoints(
     video_path: str,
     sample_rate: int = 5,
-    max_frames: Optional[int] = None
+    max_frames: Optional[int] = None,
+    parallel: bool = False,
+    content_hash: Optional[str] = None
 ) -> Dict[str, Any]:
     """
     Process video file and extract hand keypoints from each frame
@@ -254,6 +392,12 @@ def process_video_hand_keypoints(
         sample_rate: int - Process 1 frame every N frames (default: 5)
             Example: sample_rate=5 means process frames 0, 5, 10, 15...
         max_frames: int or None - Maximum frames to process (default: None = all)
+        parallel: bool - Split the video into frame ranges processed on worker
+            processes (see video_keypoints.py). Same response schema and
+            statistics as the sequential mode.
+        content_hash: str or None - SHA-256 of the video content. When given,
+            extracted keypoints are looked up in / stored to the keypoint cache
+            (core/keypoint_cache.py), so re-uploads of the same clip skip MediaPipe.
 
     OUTPUT:
         {
@@ -282,6 +426,9 @@ def process_video_hand_keypoints(
                     'both_hands_frames': int,
                     'avg_hands_per_frame': float
                 },
+            'cache_hit': bool - Keypoints were loaded from the keypoint cache,
+            'inference_scale': float - Inference width / video width (<= 1.0,
+                see settings.VIDEO_INFERENCE_WIDTH),
             'error': str or None
         }
 
@@ -303,9 +450,28 @@ def process_video_hand_keypoints(
         3. Export keypoints to CSV/JSON for training
         4. Add gesture classification per frame
     """
+    import cv2
     start_time = time.time()
 
     try:
+        inference_width = settings.VIDEO_INFERENCE_WIDTH
+        cache_key = None
+        if content_hash:
+            # Sharded extraction restarts tracking at shard boundaries - cached per mode
+            cache_key = keypoint_cache.make_key(
+                content_hash, kind='hands', sample_rate=sample_rate, max_frames=max_frames or 0,
+                inference_width=inference_width, mode='sharded' if parallel else 'sequential'
+            )
+            cached = keypoint_cache.get(cache_key)
+            if cached is not None:
+                track, meta = cached
+                result = build_hand_keypoints_result(track, meta['fps'], meta['total_video_frames'])
+                result['cache_hit'] = True
+                result['inference_scale'] = meta.get('inference_scale', 1.0)
+                result['processing_time'] = round(time.time() - start_time, 2)
+                logger.info(f"Keypoint cache hit for video: {video_path}")
+                return result
+
         # Open video file
         cap = cv2.VideoCapture(video_path)
         if not cap.isOpened():
@@ -314,127 +480,42 @@ def process_video_hand_keypoints(
         # Get video properties
         total_video_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
         fps = cap.get(cv2.CAP_PROP_FPS)
-
-        logger.info(f"Processing video: {video_path}")
-        logger.info(f"  Total frames: {total_video_frames}, FPS: {fps}")
-        logger.info(f"  Sample rate: {sample_rate}, Max frames: {max_frames}")
-
-        # Initialize counters
-        frame_count = 0
-        processed_count = 0
-        hands_detected_count = 0
-        left_hand_count = 0
-        right_hand_count = 0
-        both_hands_count = 0
-        sample_frames = []
-
-        # Process frames
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                break
-
-            # Check max frames limit
-            if max_frames and processed_count >= max_frames:
-                break
-
-            # Process only sampled frames
-            if frame_count % sample_rate == 0:
-                # Extract hand landmarks
-                landmarks_result = model_manager.extract_hand_landmarks(frame)
-
-                frame_data = {
-                    'frame_number': frame_count,
-                    'timestamp': round(frame_count / fps, 2) if fps > 0 else 0,
-                    'hands_detected': 0,
-                    'hands': []
-                }
-
-                if landmarks_result['success'] and landmarks_result['landmarks']:
-                    hands_detected = len(landmarks_result['landmarks'])
-                    frame_data['hands_detected'] = hands_detected
-                    hands_detected_count += 1
-
-                    # Count hand types
-                    has_left = False
-                    has_right = False
-
-                    # Process each detected hand
-                    for i, hand_landmarks in enumerate(landmarks_result['landmarks']):
-                        hand_type = 'Unknown'
-                        if landmarks_result['handedness'] and i < len(landmarks_result['handedness']):
-                            hand_type = landmarks_result['handedness'][i]
-                            if hand_type == 'Left':
-                                has_left = True
-                            elif hand_type == 'Right':
-                                has_right = True
-
-                        # Format keypoints (only first 5 for sample to reduce size)
-                        keypoints = []
-                        for idx, landmark in enumerate(hand_landmarks[:5]):
-                            keypoints.append({
-                                'id': idx,
-                                'x': round(landmark['x'], 4),
-                                'y': round(landmark['y'], 4),
-                                'z': round(landmark['z'], 4)
-                            })
-
-                        frame_data['hands'].append({
-                            'hand_type': hand_type,
-                            'keypoints': keypoints,
-                            'total_keypoints': len(hand_landmarks)
-                        })
-
-                    # Update hand type counters
-                    if has_left and has_right:
-                        both_hands_count += 1
-                    elif has_left:
-                        left_hand_count += 1
-                    elif has_right:
-                        right_hand_count += 1
-
-                # Save sample frames (max 10 evenly distributed)
-                if len(sample_frames) < 10 or processed_count % (max(1, (max_frames or total_video_frames) // 10)) == 0:
-                    if len(sample_frames) < 10:
-                        sample_frames.append(frame_data)
-
-                processed_count += 1
-
-                # Log progress every 50 frames
-                if processed_count % 50 == 0:
-                    logger.info(f"  Processed {processed_count} frames...")
-
-            frame_count += 1
-
+        frame_width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
         cap.release()
 
-        processing_time = time.time() - start_time
+        # Frames wider than VIDEO_INFERENCE_WIDTH are downscaled before MediaPipe
+        inference_scale = round(inference_width / frame_width, 4) if inference_width and frame_width > inference_width else 1.0
 
-        # Calculate statistics
-        detection_rate = (hands_detected_count / processed_count * 100) if processed_count > 0 else 0
-        avg_hands = (left_hand_count + right_hand_count + 2 * both_hands_count) / processed_count if processed_count > 0 else 0
+        logger.info(f"Processing video: {video_path}")
+        logger.info(f"  Total frames: {total_video_frames}, FPS: {fps}, Inference scale: {inference_scale}")
+        logger.info(f"  Sample rate: {sample_rate}, Max frames: {max_frames}, Parallel: {parallel}")
+
+        if parallel:
+            # Frame ranges on worker processes, merged in frame order
+            track = extract_hand_keypoints_sharded(video_path, total_video_frames, sample_rate, max_frames)
+        else:
+            # Process frames with a dedicated Hands graph (keeps tracking state per video)
+            stop_frame = max_frames * sample_rate if max_frames else None
+            with model_manager.hands_session() as hands:
+                track = extract_hand_keypoint_range(
+                    video_path, 0, stop_frame, sample_rate, hands=hands, inference_width=inference_width
+                )
+
+        if cache_key:
+            keypoint_cache.put(cache_key, track, {
+                'fps': fps, 'total_video_frames': total_video_frames, 'inference_scale': inference_scale
+            })
+
+        result = build_hand_keypoints_result(track, fps, total_video_frames)
+        result['cache_hit'] = False
+        result['inference_scale'] = inference_scale
 
-        result = {
-            'success': True,
-            'total_frames_processed': processed_count,
-            'hands_detected_frames': hands_detected_count,
-            'detection_rate': round(detection_rate, 2),
-            'sample_frames': sample_frames,
-            'summary': {
-                'left_hand_frames': left_hand_count,
-                'right_hand_frames': right_hand_count,
-                'both_hands_frames': both_hands_count,
-                'avg_hands_per_frame': round(avg_hands, 2),
-                'video_fps': round(fps, 2),
-                'video_duration_seconds': round(total_video_frames / fps, 2) if fps > 0 else 0
-            },
-            'processing_time': round(processing_time, 2),
-            'error': None
-        }
+        processing_time = time.time() - start_time
+        result['processing_time'] = round(processing_time, 2)
 
         logger.info(f"Video processing complete:")
-        logger.info(f"  Processed: {processed_count} frames")
-        logger.info(f"  Hands detected: {hands_detected_count} frames ({detection_rate:.1f}%)")
+        logger.info(f"  Processed: {result['total_frames_processed']} frames")
+        logger.info(f"  Hands detected: {result['hands_detected_frames']} frames ({result['detection_rate']:.1f}%)")
         logger.info(f"  Processing time: {processing_time:.2f}s")
 
         return result
@@ -453,7 +534,16 @@ def process_video_hand_keypoints(
         }
 
 
-def detect_hand_keypoints_realtime(frame_base64: str) -> Dict[str, Any]:
+def detect_hand_keypoints_realtime(
+    frame_base64: str,
+    hands=None,
+    smoother=None,
+    tracker=None,
+    resolution=None,
+    encoder=None,
+    recognizer=None,
+    emotion=None
+) -> Dict[str, Any]:
     """
     Detect hand keypoints from a single frame in real-time
 
@@ -463,6 +553,24 @@ def detect_hand_keypoints_realtime(frame_base64: str) -> Dict[str, Any]:
     INPUT:
         frame_base64: str - Base64-encoded JPEG/PNG image from webcam
             Example: "data:image/jpeg;base64,/9j/4AAQSkZJRg..." or just the base64 string
+        hands: Hands graph checked out for this session (optional, see
+            model_manager.hands_session()). Keeps tracking state across frames.
+        smoother: HandLandmarkSmoother of the session (optional, see smoothing.py).
+            Filters keypoint jitter across frames.
+        tracker: HandRoiTracker of the session (optional, see roi_tracking.py).
+            Runs inference on a crop around the previous hands instead of the full frame.
+        resolution: InferenceResolution of the session (optional, see core/resolution.py).
+            Frames are downscaled to its (possibly adaptive) width before inference;
+            default: fixed settings.REALTIME_INFERENCE_WIDTH.
+        encoder: ResponseEncoder of the session (optional, see response_codec.py).
+            'hands' is encoded straight from the landmark arrays in the compact
+            format (quantized, optionally delta) instead of per-keypoint dicts.
+        recognizer: SlidingWindowRecognizer of the session (optional, see
+            gesture_stream.py). Adds 'gesture_events' (list of start/end events,
+            or a Future of that list when the recognizer uses the micro-batcher).
+        emotion: EmotionTracker of the session (optional, see emotion_stream.py).
+            Runs face mesh every few frames only and adds 'emotion_events'
+            (emitted when the smoothed emotion changes).
 
     OUTPUT:
         {
@@ -482,6 +590,7 @@ def detect_hand_keypoints_realtime(frame_base64: str) -> Dict[str, Any]:
                 ],
             'timestamp': float - Processing timestamp,
             'processing_time': float - Time taken to process (seconds),
+            'inference_scale': float - Inference width / frame width (<= 1.0),
             'error': str or None - Error message if failed
         }
 
@@ -510,84 +619,152 @@ def detect_hand_keypoints_realtime(frame_base64: str) -> Dict[str, Any]:
     start_time = time.time()
 
     try:
-        # Step 1: Decode base64 image
-        # Handle data URL format (data:image/jpeg;base64,xxxxx)
-        if ',' in frame_base64:
-            frame_base64 = frame_base64.split(',')[1]
-
-        # Decode base64 to bytes
-        image_bytes = base64.b64decode(frame_base64)
-
-        # Convert bytes to numpy array
-        nparr = np.frombuffer(image_bytes, np.uint8)
-
-        # Decode image
-        image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-
-        if image is None:
-            raise ValueError("Failed to decode image from base64")
-
-        # Step 2: Extract hand landmarks using ModelManager
-        landmarks_result = model_manager.extract_hand_landmarks(image)
-
-        # Step 3: Format results
-        hands = []
-        hands_detected = 0
-
-        if landmarks_result['success'] and landmarks_result['landmarks']:
-            hands_detected = len(landmarks_result['landmarks'])
-
-            # Process each detected hand
-            for i, hand_landmarks in enumerate(landmarks_result['landmarks']):
-                # Get hand type (Left/Right)
-                hand_type = 'Unknown'
-                if landmarks_result['handedness'] and i < len(landmarks_result['handedness']):
-                    hand_type = landmarks_result['handedness'][i]
-
-                # Format keypoints
-                keypoints = []
-                for idx, landmark in enumerate(hand_landmarks):
-                    keypoints.append({
-                        'id': idx,
-                        'x': round(landmark['x'], 4),
-                        'y': round(landmark['y'], 4),
-                        'z': round(landmark['z'], 4)
-                    })
-
-                hands.append({
-                    'hand_type': hand_type,
-                    'keypoints': keypoints
-                })
-
-        processing_time = time.time() - start_time
+        # Step 1: Decode base64 image (handles data URL format)
+        image = decode_base64_frame(frame_base64)
 
-        return {
-            'success': True,
-            'hands_detected': hands_detected,
-            'hands': hands,
-            'timestamp': time.time(),
-            'processing_time': round(processing_time, 4),
-            'error': None
-        }
+        # Step 2-3: Extract and format hand keypoints
+        return _detect_hand_keypoints(
+            image, start_time, hands=hands, smoother=smoother,
+            tracker=tracker, resolution=resolution, encoder=encoder, recognizer=recognizer,
+            emotion=emotion
+        )
 
     except base64.binascii.Error as e:
         logger.error(f"Base64 decode error: {str(e)}")
-        return {
-            'success': False,
-            'hands_detected': 0,
-            'hands': [],
-            'timestamp': time.time(),
-            'processing_time': 0.0,
-            'error': f"Invalid base64 image: {str(e)}"
-        }
+        return _hand_keypoints_error(f"Invalid base64 image: {str(e)}")
 
     except Exception as e:
         logger.error(f"Error in hand keypoint detection: {str(e)}", exc_info=True)
-        return {
-            'success': False,
-            'hands_detected': 0,
-            'hands': [],
-            'timestamp': time.time(),
-            'processing_time': 0.0,
-            'error': str(e)
-        }
+        return _hand_keypoints_error(str(e))
+
+
+def detect_hand_keypoints_from_bytes(
+    frame_bytes: bytes,
+    hands=None,
+    smoother=None,
+    tracker=None,
+    resolution=None,
+    encoder=None,
+    recognizer=None,
+    emotion=None
+) -> Dict[str, Any]:
+    """
+    Detect hand keypoints from a binary WebSocket frame
+
+    Binary counterpart of detect_hand_keypoints_realtime(): no base64 overhead,
+    the frame is decoded straight from the message buffer.
+
+    INPUT:
+        frame_bytes: bytes - Encoded image (JPEG/WebP/PNG) or raw frame with
+            header (see frame_protocol.py)
+        hands: Hands graph checked out for this session (optional)
+        smoother: HandLandmarkSmoother of the session (optional)
+        tracker: HandRoiTracker of the session (optional)
+        resolution: InferenceResolution of the session (optional)
+        encoder: ResponseEncoder of the session (optional)
+        recognizer: SlidingWindowRecognizer of the session (optional)
+        emotion: EmotionTracker of the session (optional)
+
+    OUTPUT:
+        Same format as detect_hand_keypoints_realtime()
+    """
+    start_time = time.time()
+
+    try:
+        image, is_rgb = decode_binary_frame(frame_bytes)
+        return _detect_hand_keypoints(
+            image, start_time, is_rgb=is_rgb, hands=hands, smoother=smoother,
+            tracker=tracker, resolution=resolution, encoder=encoder, recognizer=recognizer,
+            emotion=emotion
+        )
+
+    except Exception as e:
+        logger.error(f"Error in hand keypoint detection: {str(e)}", exc_info=True)
+        return _hand_keypoints_error(str(e))
+
+
+def _detect_hand_keypoints(
+    image: np.ndarray,
+    start_time: float,
+    is_rgb: bool = False,
+    hands=None,
+    smoother=None,
+    tracker=None,
+    resolution=None,
+    encoder=None,
+    recognizer=None,
+    emotion=None
+) -> Dict[str, Any]:
+    """
+    Extract hand landmarks from a decoded frame and format the realtime response
+    """
+    # Coordinates are normalized, so downscaling needs no remapping
+    if resolution is not None:
+        image, scale = resolution.apply(image)
+    else:
+        image, scale = downscale_for_inference(image, settings.REALTIME_INFERENCE_WIDTH)
+
+    if tracker is not None:
+        landmark_frame = tracker.detect(image, is_rgb=is_rgb, hands=hands)
+    else:
+        landmark_frame = model_manager.extract_hand_landmarks(image, is_rgb=is_rgb, hands=hands)
+    if smoother is not None:
+        landmark_frame = smoother.update(landmark_frame)
+    gesture_events = recognizer.push(landmark_frame) if recognizer is not None else None
+
+    if encoder is not None:
+        # Compact format: quantized arrays, no per-keypoint dicts
+        hands = encoder.encode_hands(landmark_frame)
+    else:
+        # Format keypoints straight from the (21, 4) arrays - dicts only at the JSON boundary
+        hands = [
+            {
+                'hand_type': hand_type,
+                'keypoints': [
+                    {'id': idx, 'x': round(x, 4), 'y': round(y, 4), 'z': round(z, 4)}
+                    for idx, (x, y, z) in enumerate(points[:, :3].tolist())
+                ]
+            }
+            for hand_type, points in landmark_frame.iter_hands()
+        ]
+
+    # Adaptive resolution only tracks the hands cost - face mesh below runs every Kth frame
+    if resolution is not None:
+        resolution.record(time.time() - start_time)
+
+    # Face mesh at a lower cadence than hands - emotion state is held in between
+    emotion_events = None
+    if emotion is not None:
+        emotion_events = emotion.update(image, landmark_frame.hand_count > 0, is_rgb=is_rgb)
+
+    processing_time = time.time() - start_time
+
+    result = {
+        'success': True,
+        'hands_detected': landmark_frame.hand_count,
+        'hands': hands,
+        'timestamp': time.time(),
+        'processing_time': round(processing_time, 4),
+        'inference_scale': round(scale, 4),
+        'error': None
+    }
+    if gesture_events is not None:
+        result['gesture_events'] = gesture_events
+    if emotion_events is not None:
+        result['emotion_events'] = emotion_events
+    return result
+
+
+def _hand_keypoints_error(error: str) -> Dict[str, Any]:
+    """
+    Realtime response khi xử lý frame thất bại
+    """
+    return {
+        'success': False,
+        'hands_detected': 0,
+        'hands': [],
+        'timestamp': time.time(),
+        'processing_time': 0.0,
+        'inference_scale': None,
+        'error': error
+    }
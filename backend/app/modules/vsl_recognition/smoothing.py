@@ -0,0 +1,287 @@
+"""
+Landmark Smoothing - Lọc jitter của keypoints theo thời gian
+
+- OneEuroFilter: low-pass với cutoff thích ứng theo tốc độ (ít trễ khi tay
+  di chuyển nhanh, mượt khi tay đứng yên)
+- KalmanFilter: constant-velocity Kalman, mỗi toạ độ độc lập
+- HandLandmarkSmoother: state theo từng realtime session, lọc cả 2 hands x
+  21 joints trong một lần tính vectorized (O(1) mỗi frame)
+- smooth_sequence(): bản batch cho cả sequence (T, ..., C)
+
+Filters nhận array bất kỳ shape (..., C) và mask `present` (...,): rows vừa
+xuất hiện lại được khởi tạo lại thay vì nội suy từ vị trí cũ.
+"""
+import time
+from typing import Optional
+
+import numpy as np
+
+from ...core.landmarks import HAND_SLOTS, LandmarkFrame
+
+SMOOTHING_METHODS = ('none', 'one_euro', 'kalman')
+
+# Tham số mặc định cho toạ độ normalized [0, 1] của MediaPipe
+ONE_EURO_DEFAULTS = {'min_cutoff': 1.0, 'beta': 50.0, 'd_cutoff': 1.0}
+KALMAN_DEFAULTS = {'process_noise': 1.0, 'measurement_noise': 1e-4}
+
+# dt dùng khi timestamps không tăng (frames trùng thời điểm)
+_MIN_DT = 1e-3
+
+
+class OneEuroFilter:
+    """
+    One Euro filter (Casiez et al., 2012), vectorized trên mọi phần tử
+    """
+
+    def __init__(self, min_cutoff: float = 1.0, beta: float = 50.0, d_cutoff: float = 1.0):
+        """
+        INPUT:
+            min_cutoff: Cutoff (Hz) khi đứng yên - nhỏ hơn = mượt hơn, trễ hơn
+            beta: Hệ số tăng cutoff theo tốc độ - lớn hơn = ít trễ khi di chuyển nhanh
+            d_cutoff: Cutoff (Hz) cho đạo hàm
+        """
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.reset()
+
+    def reset(self):
+        """Xoá state - sample tiếp theo được trả về nguyên vẹn"""
+        self._x = None
+        self._dx = None
+        self._active = None
+        self._timestamp = None
+
+    @staticmethod
+    def _alpha(cutoff, dt: float):
+        tau = 1.0 / (2 * np.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def __call__(self, x: np.ndarray, timestamp: float, present: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Lọc một sample
+
+        INPUT:
+            x: array (..., C)
+            timestamp: Thời điểm (seconds)
+            present: bool (...,) - rows có dữ liệu (default: tất cả)
+        OUTPUT:
+            array (..., C) đã lọc (rows không present giữ nguyên x)
+        """
+        x = np.asarray(x, np.float64)
+        present = np.ones(x.shape[:-1], bool) if present is None else np.asarray(present, bool)
+
+        if self._x is None or self._x.shape != x.shape:
+            self._x = x.copy()
+            self._dx = np.zeros_like(x)
+            self._active = np.zeros(x.shape[:-1], bool)
+            dt = None
+        else:
+            dt = max(timestamp - self._timestamp, _MIN_DT)
+        self._timestamp = timestamp
+
+        fresh = (present & ~self._active)[..., None]
+        if dt is not None:
+            dx = (x - self._x) / dt
+            dx_hat = self._dx + self._alpha(self.d_cutoff, dt) * (dx - self._dx)
+            cutoff = self.min_cutoff + self.beta * np.abs(dx_hat)
+            x_hat = self._x + self._alpha(cutoff, dt) * (x - self._x)
+
+            self._x = np.where(fresh, x, x_hat)
+            self._dx = np.where(fresh, 0.0, dx_hat)
+        else:
+            self._x = x.copy()
+
+        self._active = present.copy()
+        return np.where(present[..., None], self._x, x)
+
+
+class KalmanFilter:
+    """
+    Constant-velocity Kalman filter, mỗi toạ độ là một hệ (vị trí, vận tốc) độc lập
+
+    Covariance 2x2 của mỗi toạ độ lưu bằng 3 arrays (p00, p01, p11) nên
+    predict/update là vài phép tính element-wise trên toàn bộ joints.
+    """
+
+    def __init__(self, process_noise: float = 1.0, measurement_noise: float = 1e-4):
+        """
+        INPUT:
+            process_noise: Phương sai gia tốc (units/s^2)^2 - lớn hơn = bám nhanh hơn
+            measurement_noise: Phương sai nhiễu đo (units^2) - lớn hơn = mượt hơn
+        """
+        self.process_noise = process_noise
+        self.measurement_noise = measurement_noise
+        self.reset()
+
+    def reset(self):
+        """Xoá state - sample tiếp theo được trả về nguyên vẹn"""
+        self._x = None
+        self._v = None
+        self._p00 = self._p01 = self._p11 = None
+        self._active = None
+        self._timestamp = None
+
+    def _init_rows(self, x: np.ndarray, rows: np.ndarray):
+        """Khởi tạo state của rows: vị trí = đo được, vận tốc = 0, covariance ban đầu"""
+        rows = rows[..., None]
+        self._x = np.where(rows, x, self._x)
+        self._v = np.where(rows, 0.0, self._v)
+        self._p00 = np.where(rows, self.measurement_noise, self._p00)
+        self._p01 = np.where(rows, 0.0, self._p01)
+        self._p11 = np.where(rows, 1.0, self._p11)
+
+    def __call__(self, x: np.ndarray, timestamp: float, present: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Lọc một sample (predict + update)
+
+        INPUT / OUTPUT: như OneEuroFilter.__call__
+        """
+        x = np.asarray(x, np.float64)
+        present = np.ones(x.shape[:-1], bool) if present is None else np.asarray(present, bool)
+
+        if self._x is None or self._x.shape != x.shape:
+            self._x = x.copy()
+            self._v = np.zeros_like(x)
+            self._p00 = np.zeros_like(x)
+            self._p01 = np.zeros_like(x)
+            self._p11 = np.zeros_like(x)
+            self._active = np.zeros(x.shape[:-1], bool)
+            self._init_rows(x, present)
+            self._active = present.copy()
+            self._timestamp = timestamp
+            return x
+
+        dt = max(timestamp - self._timestamp, _MIN_DT)
+        self._timestamp = timestamp
+        q = self.process_noise
+
+        # Predict
+        x_pred = self._x + self._v * dt
+        p00 = self._p00 + dt * (2 * self._p01 + dt * self._p11) + q * dt ** 3 / 3
+        p01 = self._p01 + dt * self._p11 + q * dt ** 2 / 2
+        p11 = self._p11 + q * dt
+
+        # Update
+        gain0 = p00 / (p00 + self.measurement_noise)
+        gain1 = p01 / (p00 + self.measurement_noise)
+        residual = x - x_pred
+
+        keep = present[..., None]
+        self._x = np.where(keep, x_pred + gain0 * residual, self._x)
+        self._v = np.where(keep, self._v + gain1 * residual, self._v)
+        self._p00 = np.where(keep, (1 - gain0) * p00, self._p00)
+        self._p01 = np.where(keep, (1 - gain0) * p01, self._p01)
+        self._p11 = np.where(keep, p11 - gain1 * p01, self._p11)
+
+        self._init_rows(x, present & ~self._active)
+        self._active = present.copy()
+        return np.where(keep, self._x, x)
+
+
+def create_landmark_filter(method: str, **params):
+    """
+    Tạo filter theo tên
+
+    INPUT:
+        method: 'none' | 'one_euro' | 'kalman'
+        **params: Tham số của filter (default: ONE_EURO_DEFAULTS / KALMAN_DEFAULTS)
+    OUTPUT:
+        OneEuroFilter | KalmanFilter | None ('none')
+    RAISES:
+        ValueError nếu method không hỗ trợ
+    """
+    if method == 'none':
+        return None
+    if method == 'one_euro':
+        return OneEuroFilter(**{**ONE_EURO_DEFAULTS, **params})
+    if method == 'kalman':
+        return KalmanFilter(**{**KALMAN_DEFAULTS, **params})
+    raise ValueError(f"Unknown smoothing method: {method}. Supported: {', '.join(SMOOTHING_METHODS)}")
+
+
+def smooth_sequence(
+    points: np.ndarray,
+    method: str = 'one_euro',
+    timestamps: Optional[np.ndarray] = None,
+    fps: float = 30.0,
+    present: Optional[np.ndarray] = None,
+    **params
+) -> np.ndarray:
+    """
+    Lọc cả sequence (batch) - kết quả giống hệt chạy filter streaming từng frame
+
+    INPUT:
+        points: array (T, ..., C)
+        method: 'none' | 'one_euro' | 'kalman'
+        timestamps: (T,) seconds (default: t / fps)
+        fps: Dùng khi không có timestamps
+        present: bool (T, ...) - rows có dữ liệu (default: tất cả)
+        **params: Tham số filter
+    OUTPUT:
+        array (T, ..., C) cùng dtype với points
+    """
+    landmark_filter = create_landmark_filter(method, **params)
+    if landmark_filter is None or len(points) == 0:
+        return np.array(points, copy=True)
+
+    if timestamps is None:
+        timestamps = np.arange(len(points)) / fps
+
+    smoothed = np.empty_like(points)
+    for t in range(len(points)):
+        smoothed[t] = landmark_filter(points[t], float(timestamps[t]), None if present is None else present[t])
+    return smoothed
+
+
+class HandLandmarkSmoother:
+    """
+    Smoothing state của một realtime hand tracking session
+
+    Hands được xếp vào 2 slots cố định theo handedness (Left, Right) để mỗi
+    slot luôn lọc cùng một bàn tay; slot vắng mặt được khởi tạo lại khi hand
+    xuất hiện trở lại.
+    """
+
+    def __init__(self, method: str, **params):
+        """
+        INPUT:
+            method: 'one_euro' | 'kalman'
+            **params: Tham số filter
+        RAISES:
+            ValueError nếu method không hỗ trợ
+        """
+        self.method = method
+        self._filter = create_landmark_filter(method, **params)
+
+    def update(self, frame: LandmarkFrame, timestamp: Optional[float] = None) -> LandmarkFrame:
+        """
+        Lọc hands của một frame
+
+        INPUT:
+            frame: LandmarkFrame (kind 'hands')
+            timestamp: seconds (default: time.monotonic())
+        OUTPUT:
+            LandmarkFrame mới với x, y, z đã lọc (cùng thứ tự hands, handedness)
+        """
+        if self._filter is None:
+            return frame
+        if timestamp is None:
+            timestamp = time.monotonic()
+
+        slots = frame.hand_slots()  # hand index -> slot
+
+        joints = 21
+        stacked = np.zeros((len(HAND_SLOTS), joints, 3))
+        present = np.zeros((len(HAND_SLOTS), joints), bool)
+        for i, slot in slots.items():
+            stacked[slot] = frame.segment(f'hand_{i}')[:, :3]
+            present[slot] = True
+
+        smoothed = self._filter(stacked, timestamp, present)
+
+        points = frame.points.copy()
+        for i, slot in slots.items():
+            start, stop = frame.segments[f'hand_{i}']
+            points[start:stop, :3] = smoothed[slot]
+        return LandmarkFrame(points, frame.segments, frame.handedness, frame.kind, frame.scores)
@@ -6,6 +6,10 @@ STUDENT TODO: Implement helper functions
 import numpy as np
 from typing import List, Dict, Any
 
+from ...core import geometry
+from ...core.landmark_store import infer_layout, sequence_from_frames, sequence_to_frames
+from .smoothing import smooth_sequence
+
 
 def preprocess_landmarks_sequence(landmarks_sequence: List[Dict]) -> np.ndarray:
     """
@@ -31,53 +35,112 @@ def preprocess_landmarks_sequence(landmarks_sequence: List[Dict]) -> np.ndarray:
     return np.array([])
 
 
-def smooth_landmarks_sequence(landmarks_sequence: List[Dict], window_size: int = 3) -> List[Dict]:
+def smooth_landmarks_sequence(
+    landmarks_sequence: List[Dict],
+    window_size: int = 3,
+    method: str = 'moving_average',
+    fps: float = 30.0
+) -> List[Dict]:
     """
     Smooth landmarks sequence để giảm noise
 
     INPUT:
-        landmarks_sequence: List of landmarks
-        window_size: int - Window size cho smoothing
+        landmarks_sequence: List of frame dicts ({'<segment>_landmarks': [...] hoặc None})
+            hoặc LandmarkFrames
+        window_size: int - Window size cho moving average (centered)
+        method: 'moving_average' | 'one_euro' | 'kalman' (xem smoothing.py)
+        fps: float - Frame rate (one_euro / kalman)
 
     OUTPUT:
-        List[Dict] - Smoothed landmarks sequence
-
-    STUDENT TODO:
-        - Apply moving average hoặc Gaussian smoothing
-        - Preserve sequence length
+        List[Dict] - Smoothed landmarks sequence, cùng độ dài, dạng
+            {'<segment>_landmarks': [...] hoặc None}. Segments vắng mặt
+            không bị nội suy và không ảnh hưởng các frames lân cận.
+            Frame dicts được shallow-copy: các keys khác (frame_number,
+            timestamp, ...) được giữ nguyên, chỉ các '*_landmarks' bị thay.
     """
-    print("[Utils] smooth_landmarks_sequence called")
-
-    # TODO: Implement smoothing
-    return landmarks_sequence
-
-
-def calculate_hand_features(hand_landmarks: List[Dict]) -> Dict[str, float]:
+    if not landmarks_sequence:
+        return []
+
+    sequence = sequence_from_frames(landmarks_sequence, infer_layout(landmarks_sequence))
+    joint_counts = [stop - start for start, stop in sequence.segments.values()]
+    present = np.repeat(sequence.mask, joint_counts, axis=1)  # (T, J)
+    xyz = sequence.points[..., :3]
+
+    if method == 'moving_average':
+        sequence.points[..., :3] = _masked_moving_average(xyz, present, window_size)
+    else:
+        sequence.points[..., :3] = smooth_sequence(xyz, method, fps=fps, present=present)
+
+    return [
+        _merge_smoothed(frame, smoothed)
+        for frame, smoothed in zip(landmarks_sequence, sequence_to_frames(sequence))
+    ]
+
+
+def _merge_smoothed(frame, smoothed: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy các keys không phải landmarks của frame dict gốc, ghi đè '*_landmarks' đã smooth"""
+    if not isinstance(frame, dict):
+        return smoothed
+    merged = dict(frame)
+    if 'landmarks' in merged and 'handedness' in merged:
+        # Hands format -> replaced by the left_hand / right_hand segments
+        del merged['landmarks'], merged['handedness']
+    merged.update(smoothed)
+    return merged
+
+
+def _masked_moving_average(points: np.ndarray, present: np.ndarray, window_size: int) -> np.ndarray:
+    """Centered moving average (T, J, C) chỉ trên các frames present - vectorized bằng cumsum"""
+    half = window_size // 2
+    weights = present[..., None].astype(np.float64)
+    sums = np.cumsum(np.concatenate([np.zeros_like(weights[:1] * points[:1]), points * weights]), axis=0)
+    counts = np.cumsum(np.concatenate([np.zeros_like(weights[:1]), weights]), axis=0)
+
+    frames = np.arange(len(points))
+    low = np.clip(frames - half, 0, len(points))
+    high = np.clip(frames + half + 1, 0, len(points))
+    window_sums = sums[high] - sums[low]
+    window_counts = counts[high] - counts[low]
+
+    averaged = window_sums / np.maximum(window_counts, 1)
+    return np.where(weights > 0, averaged, points).astype(points.dtype)
+
+
+def calculate_hand_features(hand_landmarks) -> Dict[str, Any]:
     """
     Tính các features từ hand landmarks
 
     INPUT:
-        hand_landmarks: List of 21 hand landmarks
+        hand_landmarks: List of 21 hand landmarks, hoặc array (21, 3|4)
 
     OUTPUT:
         {
-            'palm_size': float,
-            'finger_distances': list,
-            'hand_orientation': float,
-            'spread': float,
-            ...
+            'palm_size': float - Cổ tay -> MCP ngón giữa,
+            'finger_distances': list - Khoảng cách giữa các cặp đầu ngón (10 cặp),
+                chia cho palm_size,
+            'hand_orientation': float - Góc (degrees) của cổ tay -> MCP ngón giữa
+                trong mặt phẳng ảnh,
+            'spread': float - Khoảng cách trung bình giữa các đầu ngón, chia cho palm_size,
+            'finger_angles': list - Góc các khớp ngón tay (radians, xem geometry.HAND_JOINT_TRIPLES)
         }
 
-    STUDENT TODO:
-        - Tính khoảng cách giữa các điểm
-        - Tính góc của các ngón tay
-        - Tính hand orientation
-        - Extract other relevant features
+    NOTE: Cho cả sequence dùng trực tiếp core/geometry.py trên array (T, 21, 3)
     """
-    print("[Utils] calculate_hand_features called")
-
-    # TODO: Implement feature extraction
-    return {}
+    points = geometry.as_points(hand_landmarks).astype(np.float64)
+    palm_vector = points[geometry.HAND_MIDDLE_MCP] - points[geometry.HAND_WRIST]
+    palm_size = float(np.linalg.norm(palm_vector))
+
+    normalized = geometry.normalize_hand(points)
+    tips = normalized[list(geometry.HAND_FINGERTIPS)]
+    tip_distances = geometry.pairwise_distances(tips)[np.triu_indices(len(geometry.HAND_FINGERTIPS), k=1)]
+
+    return {
+        'palm_size': palm_size,
+        'finger_distances': tip_distances.tolist(),
+        'hand_orientation': float(np.degrees(np.arctan2(palm_vector[1], palm_vector[0]))),
+        'spread': float(tip_distances.mean()),
+        'finger_angles': geometry.joint_angles(points, geometry.HAND_JOINT_TRIPLES).tolist()
+    }
 
 
 def calculate_pose_features(pose_landmarks: List[Dict]) -> Dict[str, float]:
@@ -0,0 +1,360 @@
+"""
+Video Hand Keypoints - Trích xuất hand keypoints từ video
+
+- extract_hand_keypoint_range(): trích xuất một khoảng frames thành arrays
+- build_hand_keypoints_result(): tạo response + summary statistics từ arrays
+- extract_hand_keypoints_sharded(): chia video thành các khoảng frames, mỗi
+  khoảng chạy trên một worker process (Hands graph riêng), rồi ghép theo thứ tự
+
+Kết quả được lưu dạng NumPy arrays (HandKeypointTrack) thay vì dicts để
+truyền giữa các processes gọn nhẹ.
+"""
+import logging
+import math
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from ...config import settings
+from ...core.model_manager import model_manager
+from ...core.resolution import downscale_for_inference
+from ...core.utils import iter_sampled_frames
+
+logger = logging.getLogger(__name__)
+
+# Số hands tối đa mỗi frame (MediaPipe max_num_hands) và số keypoints mỗi hand
+MAX_HANDS = 2
+HAND_KEYPOINTS = 21
+
+# Handedness codes trong HandKeypointTrack['handedness']
+HAND_TYPES = ('Unknown', 'Left', 'Right')
+_HAND_TYPE_CODES = {name: code for code, name in enumerate(HAND_TYPES)}
+
+# Số sample frames trả về trong response
+MAX_SAMPLE_FRAMES = 10
+
+# Số keypoints mỗi hand trong sample frames (giảm kích thước response)
+SAMPLE_KEYPOINTS = 5
+
+_shard_pool: Optional[ProcessPoolExecutor] = None
+_shard_pool_lock = threading.Lock()
+
+
+def empty_hand_keypoint_track() -> Dict[str, np.ndarray]:
+    """
+    Tạo HandKeypointTrack rỗng
+
+    OUTPUT:
+        {
+            'frame_numbers': int32 (F,) - Số thứ tự frame trong video,
+            'hand_counts': int8 (F,) - Số hands detect được,
+            'handedness': int8 (F, 2) - Index vào HAND_TYPES,
+            'landmarks': float32 (F, 2, 21, 3) - x, y, z của mỗi keypoint
+        }
+    """
+    return {
+        'frame_numbers': np.zeros(0, np.int32),
+        'hand_counts': np.zeros(0, np.int8),
+        'handedness': np.zeros((0, MAX_HANDS), np.int8),
+        'landmarks': np.zeros((0, MAX_HANDS, HAND_KEYPOINTS, 3), np.float32)
+    }
+
+
+def extract_hand_keypoint_range(
+    video_path: str,
+    start_frame: int = 0,
+    stop_frame: Optional[int] = None,
+    sample_rate: int = 1,
+    hands=None,
+    inference_width: Optional[int] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Trích xuất hand keypoints của các frames trong [start_frame, stop_frame)
+
+    Chỉ các frames có frame_number % sample_rate == 0 được xử lý. Frames rộng
+    hơn inference_width được downscale trước khi đưa vào MediaPipe (toạ độ
+    normalized nên không cần map lại).
+
+    INPUT:
+        video_path: str - Đường dẫn video
+        start_frame: int - Frame bắt đầu (seek tới vị trí này)
+        stop_frame: int or None - Frame kết thúc (không bao gồm), None = hết video
+        sample_rate: int - Xử lý 1 frame mỗi N frames
+        hands: Hands graph đã checkout (xem model_manager.hands_session())
+        inference_width: int or None - Default: settings.VIDEO_INFERENCE_WIDTH (0 = giữ nguyên)
+    OUTPUT:
+        HandKeypointTrack (xem empty_hand_keypoint_track())
+    RAISES:
+        ValueError nếu không mở được video
+    """
+    import cv2
+    if inference_width is None:
+        inference_width = settings.VIDEO_INFERENCE_WIDTH
+
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise ValueError(f"Cannot open video file: {video_path}")
+
+    frame_numbers = []
+    hand_counts = []
+    handedness = []
+    landmarks = []
+
+    try:
+        # Skipped frames are only grabbed, never decoded
+        for frame_count, frame in iter_sampled_frames(cap, sample_rate, start_frame, stop_frame):
+            frame, _ = downscale_for_inference(frame, inference_width)
+            landmark_frame = model_manager.extract_hand_landmarks(frame, hands=hands)
+            frame_handedness = np.zeros(MAX_HANDS, np.int8)
+            frame_landmarks = np.zeros((MAX_HANDS, HAND_KEYPOINTS, 3), np.float32)
+
+            for i, (hand_type, points) in enumerate(landmark_frame.iter_hands()):
+                if i >= MAX_HANDS:
+                    break
+                frame_handedness[i] = _HAND_TYPE_CODES.get(hand_type, 0)
+                frame_landmarks[i] = points[:, :3]
+
+            frame_numbers.append(frame_count)
+            hand_counts.append(landmark_frame.hand_count)
+            handedness.append(frame_handedness)
+            landmarks.append(frame_landmarks)
+    finally:
+        cap.release()
+
+    if not frame_numbers:
+        return empty_hand_keypoint_track()
+
+    return {
+        'frame_numbers': np.asarray(frame_numbers, np.int32),
+        'hand_counts': np.asarray(hand_counts, np.int8),
+        'handedness': np.stack(handedness),
+        'landmarks': np.stack(landmarks)
+    }
+
+
+def concatenate_hand_keypoint_tracks(tracks: List[Dict[str, np.ndarray]]) -> Dict[str, np.ndarray]:
+    """
+    Ghép các HandKeypointTracks (đã theo thứ tự frame)
+
+    INPUT:
+        tracks: list of HandKeypointTrack
+    OUTPUT:
+        HandKeypointTrack
+    """
+    if not tracks:
+        return empty_hand_keypoint_track()
+    return {key: np.concatenate([track[key] for track in tracks]) for key in tracks[0]}
+
+
+def build_hand_keypoints_result(
+    track: Dict[str, np.ndarray],
+    fps: float,
+    total_video_frames: int
+) -> Dict[str, Any]:
+    """
+    Tạo response của process_video_hand_keypoints() từ HandKeypointTrack
+
+    INPUT:
+        track: HandKeypointTrack
+        fps: float - FPS của video
+        total_video_frames: int - Tổng số frames của video
+    OUTPUT:
+        dict - Xem service.process_video_hand_keypoints() (chưa có processing_time)
+    """
+    processed_count = len(track['frame_numbers'])
+    hand_counts = track['hand_counts']
+    handedness = track['handedness']
+
+    # Hand type per frame: only detected hand slots count
+    slot_detected = np.arange(MAX_HANDS)[None, :] < hand_counts[:, None]
+    has_left = np.any(slot_detected & (handedness == _HAND_TYPE_CODES['Left']), axis=1)
+    has_right = np.any(slot_detected & (handedness == _HAND_TYPE_CODES['Right']), axis=1)
+
+    hands_detected_count = int(np.count_nonzero(hand_counts))
+    both_hands_count = int(np.count_nonzero(has_left & has_right))
+    left_hand_count = int(np.count_nonzero(has_left & ~has_right))
+    right_hand_count = int(np.count_nonzero(has_right & ~has_left))
+
+    sample_frames = [
+        _build_sample_frame(track, i, fps) for i in range(min(MAX_SAMPLE_FRAMES, processed_count))
+    ]
+
+    # Calculate statistics
+    detection_rate = (hands_detected_count / processed_count * 100) if processed_count > 0 else 0
+    avg_hands = (left_hand_count + right_hand_count + 2 * both_hands_count) / processed_count if processed_count > 0 else 0
+
+    return {
+        'success': True,
+        'total_frames_processed': processed_count,
+        'hands_detected_frames': hands_detected_count,
+        'detection_rate': round(detection_rate, 2),
+        'sample_frames': sample_frames,
+        'summary': {
+            'left_hand_frames': left_hand_count,
+            'right_hand_frames': right_hand_count,
+            'both_hands_frames': both_hands_count,
+            'avg_hands_per_frame': round(avg_hands, 2),
+            'video_fps': round(fps, 2),
+            'video_duration_seconds': round(total_video_frames / fps, 2) if fps > 0 else 0
+        },
+        'error': None
+    }
+
+
+def _build_sample_frame(track: Dict[str, np.ndarray], index: int, fps: float) -> Dict[str, Any]:
+    """Tạo sample frame dict (chỉ SAMPLE_KEYPOINTS keypoints đầu mỗi hand)"""
+    frame_number = int(track['frame_numbers'][index])
+    hands_detected = int(track['hand_counts'][index])
+
+    hands = []
+    for i in range(min(hands_detected, MAX_HANDS)):
+        keypoints = []
+        for idx, (x, y, z) in enumerate(track['landmarks'][index, i, :SAMPLE_KEYPOINTS].tolist()):
+            keypoints.append({
+                'id': idx,
+                'x': round(x, 4),
+                'y': round(y, 4),
+                'z': round(z, 4)
+            })
+
+        hands.append({
+            'hand_type': HAND_TYPES[track['handedness'][index, i]],
+            'keypoints': keypoints,
+            'total_keypoints': HAND_KEYPOINTS
+        })
+
+    return {
+        'frame_number': frame_number,
+        'timestamp': round(frame_number / fps, 2) if fps > 0 else 0,
+        'hands_detected': hands_detected,
+        'hands': hands
+    }
+
+
+def plan_video_shards(
+    total_video_frames: int,
+    sample_rate: int,
+    max_frames: Optional[int],
+    num_workers: int,
+    min_frames_per_shard: int
+) -> List[tuple]:
+    """
+    Chia video thành các khoảng frames [start, stop) cho từng worker
+
+    Mỗi shard bắt đầu tại bội số của sample_rate nên tập frames được xử lý
+    giống hệt chế độ tuần tự. Shard cuối đọc tới hết video (stop=None) trừ khi
+    bị giới hạn bởi max_frames.
+
+    INPUT:
+        total_video_frames: int - CAP_PROP_FRAME_COUNT
+        sample_rate: int
+        max_frames: int or None - Số sampled frames tối đa
+        num_workers: int - Số shards tối đa
+        min_frames_per_shard: int - Số sampled frames tối thiểu mỗi shard
+    OUTPUT:
+        list of (start_frame, stop_frame or None)
+    """
+    limit = total_video_frames
+    if max_frames:
+        limit = min(limit, max_frames * sample_rate)
+
+    sampled = math.ceil(limit / sample_rate)
+    num_shards = max(1, min(num_workers, sampled // max(1, min_frames_per_shard)))
+    per_shard = math.ceil(sampled / num_shards) if sampled else 0
+
+    shards = []
+    for i in range(num_shards):
+        start = i * per_shard * sample_rate
+        stop = (i + 1) * per_shard * sample_rate
+        if i == num_shards - 1:
+            stop = max_frames * sample_rate if max_frames else None
+        shards.append((start, stop))
+    return shards
+
+
+def extract_hand_keypoints_sharded(
+    video_path: str,
+    total_video_frames: int,
+    sample_rate: int,
+    max_frames: Optional[int] = None,
+    num_workers: Optional[int] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Trích xuất hand keypoints song song trên nhiều worker processes
+
+    Tập frames và thứ tự giống hệt chế độ tuần tự, nhưng mỗi shard bắt đầu với
+    Hands graph mới: tracking được khởi động lại (full detection) tại mỗi ranh
+    giới shard, nên landmarks ở các frames đầu shard có thể khác chút ít so với
+    khi chạy tuần tự.
+
+    INPUT:
+        video_path: str
+        total_video_frames: int - Tổng số frames (để chia shards)
+        sample_rate: int
+        max_frames: int or None
+        num_workers: int or None - Default: settings.VIDEO_SHARD_WORKERS
+    OUTPUT:
+        HandKeypointTrack của toàn bộ video (theo thứ tự frame)
+    """
+    shards = plan_video_shards(
+        total_video_frames,
+        sample_rate,
+        max_frames,
+        num_workers or _shard_worker_count(),
+        settings.VIDEO_SHARD_MIN_FRAMES
+    )
+
+    if len(shards) == 1:
+        # Too short to be worth the IPC - run in this process
+        with model_manager.hands_session() as hands:
+            return extract_hand_keypoint_range(video_path, 0, shards[0][1], sample_rate, hands=hands)
+
+    logger.info(f"  Splitting video into {len(shards)} shards")
+    pool = _get_shard_pool()
+    futures = [
+        pool.submit(_extract_shard, video_path, start, stop, sample_rate)
+        for start, stop in shards
+    ]
+    return concatenate_hand_keypoint_tracks([future.result() for future in futures])
+
+
+def _extract_shard(video_path: str, start_frame: int, stop_frame: Optional[int], sample_rate: int) -> Dict[str, np.ndarray]:
+    """Chạy trong worker process - mỗi process có Hands graph pool riêng"""
+    with model_manager.hands_session() as hands:
+        return extract_hand_keypoint_range(video_path, start_frame, stop_frame, sample_rate, hands=hands)
+
+
+def _shard_worker_count() -> int:
+    """Số worker processes (settings.VIDEO_SHARD_WORKERS, 0 = số CPU cores)"""
+    return settings.VIDEO_SHARD_WORKERS or os.cpu_count() or 1
+
+
+def _get_shard_pool() -> ProcessPoolExecutor:
+    """Tạo process pool khi cần (spawn - MediaPipe không an toàn với fork)"""
+    global _shard_pool
+    if _shard_pool is None:
+        with _shard_pool_lock:
+            if _shard_pool is None:
+                workers = _shard_worker_count()
+                _shard_pool = ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+                logger.info(f"Video shard pool started with {workers} processes")
+    return _shard_pool
+
+
+def shutdown_shard_pool():
+    """
+    Dừng process pool (gọi khi shutdown ứng dụng)
+    """
+    global _shard_pool
+    with _shard_pool_lock:
+        pool, _shard_pool = _shard_pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+        logger.info("Video shard pool stopped")
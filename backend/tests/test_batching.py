@@ -0,0 +1,105 @@
+"""
+Tests cho MicroBatcher: gom batch, lỗi batch_fn, shutdown không bỏ sót Future nào
+"""
+import threading
+import time
+from concurrent.futures import Future, wait
+
+import pytest
+
+from app.core.batching import MicroBatcher, get_batcher_metrics
+
+
+@pytest.fixture
+def batcher():
+    calls = []
+
+    def batch_fn(items):
+        calls.append(list(items))
+        return [item * 2 for item in items]
+
+    batcher = MicroBatcher('test_batching', batch_fn, max_batch_size=4, max_wait=0.02)
+    batcher.calls = calls
+    yield batcher
+    batcher.shutdown()
+
+
+class TestMicroBatcher:
+    """Test cases cho MicroBatcher"""
+
+    def test_results_follow_submit_order(self, batcher):
+        futures = [batcher.submit(i) for i in range(10)]
+
+        assert [future.result(timeout=5) for future in futures] == [i * 2 for i in range(10)]
+        assert all(len(batch) <= 4 for batch in batcher.calls)
+        assert get_batcher_metrics()['test_batching']['items'] == 10
+
+    def test_batch_error_goes_to_every_future(self):
+        def failing(items):
+            raise ValueError("model lỗi")
+
+        batcher = MicroBatcher('test_batching_error', failing, max_batch_size=4, max_wait=0.02)
+        try:
+            futures = [batcher.submit(i) for i in range(3)]
+            for future in futures:
+                with pytest.raises(ValueError):
+                    future.result(timeout=5)
+            assert batcher.get_metrics()['failed_batches'] >= 1
+        finally:
+            batcher.shutdown()
+
+    def test_shutdown_processes_queued_requests(self, batcher):
+        futures = [batcher.submit(i) for i in range(6)]
+
+        batcher.shutdown()
+
+        assert [future.result(timeout=0) for future in futures] == [i * 2 for i in range(6)]
+        assert 'test_batching' not in get_batcher_metrics()
+
+    def test_submit_after_shutdown_raises(self, batcher):
+        batcher.shutdown()
+
+        with pytest.raises(RuntimeError):
+            batcher.submit(1)
+
+    def test_concurrent_submit_and_shutdown_leaves_no_pending_future(self, batcher):
+        """Submit từ nhiều threads trong lúc shutdown: mọi Future đều có kết quả hoặc RuntimeError"""
+        futures = []
+        rejected = []
+        start = threading.Event()
+
+        def client():
+            start.wait()
+            for i in range(200):
+                try:
+                    futures.append(batcher.submit(i))
+                except RuntimeError:
+                    rejected.append(i)
+                    return
+
+        threads = [threading.Thread(target=client) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        start.set()
+        time.sleep(0.005)
+        batcher.shutdown()
+        for thread in threads:
+            thread.join(timeout=5)
+
+        done, not_done = wait(futures, timeout=5)
+        assert not not_done
+        for future in done:
+            if future.exception() is not None:
+                assert isinstance(future.exception(), RuntimeError)
+
+    def test_leftover_requests_fail_after_worker_exit(self, batcher):
+        """Requests còn trong queue khi worker đã dừng nhận RuntimeError"""
+        batcher.submit(0).result(timeout=5)
+        batcher.shutdown()
+        future = Future()
+        batcher._queue.put((1, future))
+
+        batcher._fail_pending()
+
+        with pytest.raises(RuntimeError):
+            future.result(timeout=0)
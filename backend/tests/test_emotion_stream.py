@@ -0,0 +1,160 @@
+"""
+Tests cho EmotionTracker: lịch chạy face mesh mỗi K frames, hold / hết hạn, EMA smoothing
+"""
+import numpy as np
+import pytest
+
+from app.modules.vsl_recognition.emotion_stream import EmotionTracker
+
+FACE = [{'x': 0.5, 'y': 0.5, 'z': 0.0, 'visibility': 0.0}] * 468
+IMAGE = np.zeros((4, 4, 3), np.uint8)
+
+
+class StubManager:
+    """extract_face_landmarks giả: trả về FACE khi `face` bật"""
+
+    def __init__(self):
+        self.face = True
+        self.calls = []
+
+    def extract_face_landmarks(self, image, is_rgb=False, static_image_mode=False):
+        self.calls.append(static_image_mode)
+        return {'success': True, 'landmarks': FACE if self.face else None}
+
+
+class StubPredictor:
+    """predict_fn giả: trả về lần lượt các predictions đã cho"""
+
+    def __init__(self, *predictions):
+        self.predictions = list(predictions)
+        self.calls = 0
+
+    def __call__(self, face_landmarks):
+        self.calls += 1
+        return self.predictions[min(self.calls, len(self.predictions)) - 1]
+
+
+def _tracker(predict_fn, **kwargs):
+    manager = StubManager()
+    params = {'interval': 3, 'schedule': 'interval', 'alpha': 1.0, 'hold': 0}
+    params.update(kwargs)
+    return EmotionTracker(predict_fn, manager=manager, **params), manager
+
+
+def _run(tracker, frames, hands_present=True, start=0.0, fps=10.0):
+    events = []
+    for i in range(frames):
+        events += tracker.update(IMAGE, hands_present, timestamp=start + i / fps)
+    return events
+
+
+class TestScheduling:
+    """Face mesh chỉ chạy mỗi `interval` frames"""
+
+    def test_runs_every_k_frames(self):
+        tracker, manager = _tracker(StubPredictor({'emotion': 'happy', 'confidence': 0.9}))
+
+        _run(tracker, 10)
+
+        # Frame đầu tiên, rồi mỗi 3 frames: 0, 3, 6, 9
+        assert tracker.face_runs == 4
+        assert manager.calls == [True] * 4  # static_image_mode graph, không tracking chung
+
+    def test_hands_schedule_skips_frames_without_hands(self):
+        tracker, manager = _tracker(StubPredictor({'emotion': 'happy', 'confidence': 0.9}), schedule='hands')
+
+        _run(tracker, 10, hands_present=False)
+        assert tracker.face_runs == 0
+
+        _run(tracker, 1)
+        assert tracker.face_runs == 1
+
+    def test_invalid_parameters(self):
+        with pytest.raises(ValueError):
+            EmotionTracker(StubPredictor(), schedule='always', manager=StubManager())
+        with pytest.raises(ValueError):
+            EmotionTracker(StubPredictor(), alpha=0, manager=StubManager())
+
+
+class TestHold:
+    """State được giữ giữa các lần chạy và hết hạn khi không thấy mặt quá lâu"""
+
+    def test_event_only_on_label_change(self):
+        tracker, _ = _tracker(StubPredictor({'emotion': 'happy', 'confidence': 0.9}))
+
+        events = _run(tracker, 10)
+
+        assert [event['emotion'] for event in events] == ['happy']
+        assert events[0]['type'] == 'emotion'
+        assert tracker.state == {'emotion': 'happy', 'confidence': 0.9}
+
+    def test_missing_face_holds_state(self):
+        tracker, manager = _tracker(StubPredictor({'emotion': 'sad', 'confidence': 0.8}))
+        _run(tracker, 1)
+        manager.face = False
+
+        events = _run(tracker, 20, start=0.1)
+
+        assert events == []
+        assert tracker.state['emotion'] == 'sad'
+
+    def test_state_expires_after_hold(self):
+        tracker, manager = _tracker(StubPredictor({'emotion': 'sad', 'confidence': 0.8}), hold=1.0)
+        _run(tracker, 1)
+        manager.face = False
+
+        held = _run(tracker, 10, start=0.1)      # t = 0.1 .. 1.0
+        expired = _run(tracker, 5, start=1.1)    # t > hold sau lần cuối thấy mặt
+
+        assert held == []
+        assert [(event['emotion'], event['confidence']) for event in expired] == [(None, 0.0)]
+        assert tracker.state == {'emotion': None, 'confidence': 0.0}
+
+    def test_face_after_expiry_starts_fresh(self):
+        tracker, manager = _tracker(
+            StubPredictor({'emotion': 'sad', 'confidence': 0.8}, {'emotion': 'happy', 'confidence': 0.3}),
+            interval=1, hold=0.5, alpha=0.5
+        )
+        _run(tracker, 1)
+        manager.face = False
+        _run(tracker, 10, start=0.1)
+        manager.face = True
+
+        events = _run(tracker, 1, start=2.0)
+
+        # Không còn điểm 'sad' cũ trong EMA
+        assert [event['emotion'] for event in events] == ['happy']
+        assert tracker.state['confidence'] == pytest.approx(0.15)
+
+
+class TestSmoothing:
+    """EMA trên probabilities giữa các lần chạy face mesh"""
+
+    def test_ema_delays_label_switch(self):
+        happy = {'emotion': 'happy', 'probabilities': {'happy': 0.9, 'neutral': 0.1}}
+        neutral = {'emotion': 'neutral', 'probabilities': {'happy': 0.2, 'neutral': 0.8}}
+        tracker, _ = _tracker(StubPredictor(happy, happy, happy, neutral, neutral), interval=1, alpha=0.5)
+
+        events = _run(tracker, 5)
+
+        # happy: .45 -> .675 -> .7875 -> .4938 -> .3469; neutral: .05 -> .075 -> .0875 -> .4438 -> .6219
+        assert [event['emotion'] for event in events] == ['happy', 'neutral']
+        assert events[1]['timestamp'] == pytest.approx(0.4)  # prediction 'neutral' đầu tiên chưa đổi label
+        assert tracker.state['confidence'] == pytest.approx(0.6219, abs=1e-4)
+
+    def test_alpha_one_follows_latest(self):
+        happy = {'emotion': 'happy', 'probabilities': {'happy': 0.9, 'neutral': 0.1}}
+        neutral = {'emotion': 'neutral', 'probabilities': {'happy': 0.2, 'neutral': 0.8}}
+        tracker, _ = _tracker(StubPredictor(happy, neutral), interval=1, alpha=1.0)
+
+        events = _run(tracker, 2)
+
+        assert [event['emotion'] for event in events] == ['happy', 'neutral']
+
+    def test_label_only_prediction(self):
+        """Model không trả probabilities: dùng confidence của label"""
+        tracker, _ = _tracker(StubPredictor({'emotion': 'angry', 'confidence': 0.7}), interval=1, alpha=0.5)
+
+        _run(tracker, 2)
+
+        assert tracker.state == {'emotion': 'angry', 'confidence': pytest.approx(0.525)}
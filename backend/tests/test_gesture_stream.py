@@ -0,0 +1,182 @@
+"""
+Tests cho gesture_stream: windows luôn đủ window_size, batched == unbatched
+"""
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from app.core.batching import MicroBatcher
+from app.core.landmarks import LandmarkFrame
+from app.modules.vsl_recognition import service
+from app.modules.vsl_recognition.realtime_session import HandTrackingSession, is_end_of_stream
+from app.modules.vsl_recognition.gesture_stream import (
+    FEATURE_SIZE,
+    FeatureRingBuffer,
+    SlidingWindowRecognizer,
+    predict_windows
+)
+
+WINDOW_SIZE = 8
+
+
+class LengthSensitiveModel:
+    """Model giả: confidence phụ thuộc độ dài window và mọi giá trị trong window"""
+
+    def __init__(self):
+        self.shapes = []
+
+    def predict_batch(self, features):
+        self.shapes.append(features.shape)
+        return [
+            {'predicted_text': 'XIN_CHAO', 'confidence': float(np.tanh(window.sum()) / 2 + 0.5 * len(window) / 16)}
+            for window in features
+        ]
+
+    def predict_from_array(self, features):
+        return self.predict_batch(features[None])[0]
+
+
+def _hands_frame(seed: int) -> LandmarkFrame:
+    points = np.random.default_rng(seed).random((21, 4)).astype(np.float32)
+    return LandmarkFrame(points, {'hand_0': (0, 21)}, ['Left'], 'hands')
+
+
+class TestFeatureRingBuffer:
+    """Test cases cho FeatureRingBuffer"""
+
+    def test_padded_window_has_window_size_rows(self):
+        buffer = FeatureRingBuffer(WINDOW_SIZE)
+        for i in range(3):
+            buffer.push(np.full(FEATURE_SIZE, i + 1, np.float32), float(i))
+
+        window = buffer.window(WINDOW_SIZE, pad=True)
+
+        assert window.shape == (WINDOW_SIZE, FEATURE_SIZE)
+        assert not window[:5].any()
+        np.testing.assert_array_equal(window[5:, 0], [1, 2, 3])
+        assert len(buffer.window(WINDOW_SIZE)) == 3
+
+    def test_window_wraps_in_time_order(self):
+        buffer = FeatureRingBuffer(4)
+        for i in range(6):
+            buffer.push(np.full(FEATURE_SIZE, i, np.float32), float(i))
+
+        np.testing.assert_array_equal(buffer.window(4, pad=True)[:, 0], [2, 3, 4, 5])
+        assert buffer.window_start_time(4) == 2.0
+
+
+class TestPredictWindows:
+    """Prediction của một window không phụ thuộc batch"""
+
+    def test_padding_independent_of_batch(self):
+        model = LengthSensitiveModel()
+        rng = np.random.default_rng(0)
+        short = rng.random((3, FEATURE_SIZE)).astype(np.float32)
+        full = rng.random((WINDOW_SIZE, FEATURE_SIZE)).astype(np.float32)
+
+        alone = predict_windows(model, [short], window_size=WINDOW_SIZE)
+        batched = predict_windows(model, [full, short], window_size=WINDOW_SIZE)
+
+        assert alone[0] == batched[1]
+        assert model.shapes == [(1, WINDOW_SIZE, FEATURE_SIZE), (2, WINDOW_SIZE, FEATURE_SIZE)]
+
+    def test_long_window_keeps_latest_frames(self):
+        model = LengthSensitiveModel()
+        window = np.random.default_rng(1).random((WINDOW_SIZE + 3, FEATURE_SIZE)).astype(np.float32)
+
+        assert predict_windows(model, [window], WINDOW_SIZE) == predict_windows(model, [window[3:]], WINDOW_SIZE)
+
+
+class TestSlidingWindowRecognizer:
+    """Cùng frames -> cùng events, có hay không có micro-batcher"""
+
+    def _events(self, batcher=None):
+        model = LengthSensitiveModel()
+        recognizer = SlidingWindowRecognizer(
+            model, window_size=WINDOW_SIZE, stride=2, threshold=0.6, min_frames=2, batcher=batcher
+        )
+        events = []
+        for i in range(20):
+            frame = _hands_frame(i) if i < 14 else LandmarkFrame.empty('hands')
+            result = recognizer.push(frame, timestamp=i / 30)
+            events.extend(result if isinstance(result, list) else result.result(timeout=5))
+        return events, model.shapes
+
+    def test_batched_matches_unbatched(self):
+        batch_model = LengthSensitiveModel()
+        batcher = MicroBatcher(
+            'test_gesture_stream',
+            lambda windows: predict_windows(batch_model, windows, WINDOW_SIZE),
+            max_batch_size=4,
+            max_wait=0.001
+        )
+        try:
+            batched, _ = self._events(batcher)
+        finally:
+            batcher.shutdown()
+        unbatched, shapes = self._events()
+
+        assert unbatched
+        assert batched == unbatched
+        assert set(shapes) == {(1, WINDOW_SIZE, FEATURE_SIZE)}
+        assert {shape[1:] for shape in batch_model.shapes} == {(WINDOW_SIZE, FEATURE_SIZE)}
+
+    @pytest.mark.parametrize('pushed', [2, 5])
+    def test_early_windows_are_padded(self, pushed):
+        model = LengthSensitiveModel()
+        recognizer = SlidingWindowRecognizer(model, window_size=WINDOW_SIZE, stride=1, min_frames=1)
+
+        for i in range(pushed):
+            recognizer.push(_hands_frame(i), timestamp=float(i))
+
+        assert model.shapes == [(1, WINDOW_SIZE, FEATURE_SIZE)] * pushed
+
+    def test_finish_ends_open_gesture(self):
+        """Client gửi END_OF_STREAM: gesture đang mở nhận event 'end' tại frame cuối"""
+        session = HandTrackingSession(response_format='json')
+        session.recognizer = SlidingWindowRecognizer(
+            LengthSensitiveModel(), window_size=WINDOW_SIZE, stride=1, threshold=0.6, min_frames=1
+        )
+        events = []
+        for i in range(6):
+            events += session.recognizer.push(_hands_frame(i), timestamp=float(i))
+        assert [event['event'] for event in events] == ['start']
+
+        closing = session.finish()
+
+        assert [(event['event'], event['label'], event['end_time']) for event in closing] == [('end', 'XIN_CHAO', 5.0)]
+        assert session.finish() == []
+        assert HandTrackingSession(response_format='json').finish() == []
+
+    def test_end_of_stream_message(self):
+        assert is_end_of_stream({'type': 'websocket.receive', 'text': '{"type": "end"}'})
+        assert not is_end_of_stream({'type': 'websocket.receive', 'text': '{"type": "pause"}'})
+        assert not is_end_of_stream({'type': 'websocket.receive', 'text': '{not json'})
+        assert not is_end_of_stream({'type': 'websocket.receive', 'text': 'data:image/jpeg;base64,/9j/'})
+        assert not is_end_of_stream({'type': 'websocket.receive', 'bytes': b'{"type": "end"}'})
+
+
+class TestGestureBatcher:
+    """Batcher dùng chung được tạo đúng một lần"""
+
+    def test_concurrent_first_use_creates_one_batcher(self, monkeypatch):
+        created = []
+
+        def slow_batcher(*args, **kwargs):
+            time.sleep(0.01)
+            created.append(object())
+            return created[-1]
+
+        monkeypatch.setattr(service, '_gesture_batcher', None)
+        monkeypatch.setattr(service, 'MicroBatcher', slow_batcher)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(service._get_gesture_batcher())) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=5)
+
+        assert len(created) == 1
+        assert results == created * 8
@@ -0,0 +1,73 @@
+"""
+Import-time budget cho backend
+
+Import app.main phải nhanh (autoscaled replicas, test runs): các ML
+dependencies nặng (cv2, mediapipe, tensorflow, whisper, ...) chỉ được import
+lazy khi thực sự dùng, và import config không được tạo thư mục.
+
+Chạy trong subprocess để đo cold import. Thời gian import FastAPI /
+SQLAlchemy / pydantic (framework) được đo riêng và không tính vào budget.
+
+Budget mặc định: IMPORT_BUDGET_MS=1000 (override bằng env var).
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+IMPORT_BUDGET_MS = float(os.environ.get("IMPORT_BUDGET_MS", 1000))
+
+HEAVY_MODULES = (
+    'cv2', 'mediapipe', 'tensorflow', 'torch', 'whisper', 'transformers',
+    'librosa', 'underthesea', 'albumentations', 'pandas', 'onnxruntime'
+)
+
+_IMPORT_SCRIPT = """
+import json, sys, time
+import fastapi, fastapi.staticfiles, sqlalchemy, sqlalchemy.orm, pydantic_settings, numpy
+started_at = time.perf_counter()
+import app.main
+elapsed_ms = (time.perf_counter() - started_at) * 1000
+print(json.dumps({
+    'elapsed_ms': elapsed_ms,
+    'heavy': [name for name in %r if name in sys.modules]
+}))
+""" % (HEAVY_MODULES,)
+
+
+def _import_app(cwd: Path) -> dict:
+    env = dict(os.environ)
+    env['PYTHONPATH'] = str(BACKEND_DIR)
+    env.setdefault('DATABASE_URL', f"sqlite:///{cwd / 'import_test.db'}")
+    output = subprocess.run(
+        [sys.executable, '-W', 'ignore', '-c', _IMPORT_SCRIPT],
+        cwd=cwd, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def test_import_app_main_skips_heavy_dependencies():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        result = _import_app(Path(tmp_dir))
+    assert result['heavy'] == [], f"Heavy modules imported by app.main: {result['heavy']}"
+
+
+def test_import_app_main_within_budget():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        result = _import_app(Path(tmp_dir))
+    assert result['elapsed_ms'] < IMPORT_BUDGET_MS, (
+        f"Importing app.main took {result['elapsed_ms']:.0f}ms (budget: {IMPORT_BUDGET_MS:.0f}ms)"
+    )
+
+
+def test_import_config_creates_no_directories():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        env = dict(os.environ)
+        env['PYTHONPATH'] = str(BACKEND_DIR)
+        env['DATA_DIR'] = str(Path(tmp_dir) / 'data')
+        env['MODELS_DIR'] = str(Path(tmp_dir) / 'models')
+        subprocess.run([sys.executable, '-c', 'import app.config'], cwd=tmp_dir, env=env, check=True)
+        assert list(Path(tmp_dir).iterdir()) == []
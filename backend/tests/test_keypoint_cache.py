@@ -0,0 +1,88 @@
+"""
+Tests cho KeypointCache: hit, miss khi fingerprint đổi, LRU eviction
+"""
+import os
+
+import numpy as np
+import pytest
+
+from app.core.keypoint_cache import KeypointCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = KeypointCache(tmp_path / "cache", max_bytes=10 * 1024 * 1024)
+    cache._fingerprint = 'config-a'
+    return cache
+
+
+def _track(seed: int = 0, size: int = 64):
+    rng = np.random.default_rng(seed)
+    return {'landmarks': rng.random((size, 2, 21, 3)).astype(np.float32)}
+
+
+class TestKeypointCache:
+    """Test cases cho KeypointCache"""
+
+    def test_put_then_get_hits(self, cache):
+        """Entry vừa ghi được đọc lại nguyên vẹn cùng metadata"""
+        key = cache.make_key('video-hash', kind='hands', sample_rate=5)
+        track = _track()
+
+        cache.put(key, track, {'fps': 30.0})
+        cached = cache.get(key)
+
+        assert cached is not None
+        arrays, meta = cached
+        np.testing.assert_array_equal(arrays['landmarks'], track['landmarks'])
+        assert meta['fps'] == 30.0
+        assert cache.get_metrics()['hits'] == 1
+
+    def test_params_are_part_of_key(self, cache):
+        """Tham số trích xuất khác nhau (vd: sharded / sequential) => key khác"""
+        sequential = cache.make_key('video-hash', kind='hands', mode='sequential')
+        sharded = cache.make_key('video-hash', kind='hands', mode='sharded')
+
+        cache.put(sequential, _track())
+
+        assert sequential != sharded
+        assert cache.get(sharded) is None
+
+    def test_fingerprint_change_misses(self, cache):
+        """Cấu hình MediaPipe đổi => key mới, entry cũ không hit và bị purge"""
+        key = cache.make_key('video-hash', kind='hands')
+        cache.put(key, _track())
+
+        cache._fingerprint = 'config-b'
+        new_key = cache.make_key('video-hash', kind='hands')
+
+        assert new_key != key
+        assert cache.get(new_key) is None
+        assert cache.purge_stale() == 1
+        assert cache.get(key) is None
+
+    def test_lru_eviction(self, cache, tmp_path):
+        """Vượt max_bytes => entry ít dùng nhất (mtime cũ nhất) bị xoá"""
+        keys = [cache.make_key(f'video-{i}') for i in range(3)]
+        cache.put(keys[0], _track(0))
+        entry_size = cache.get_metrics()['total_bytes']
+        cache.max_bytes = int(entry_size * 2.5)
+
+        cache.put(keys[1], _track(1))
+        # Make keys[0] the most recently used, keys[1] the least
+        os.utime(cache._path(keys[1]), (1, 1))
+        cache.get(keys[0])
+        cache.put(keys[2], _track(2))
+
+        assert cache.get(keys[1]) is None
+        assert cache.get(keys[0]) is not None
+        assert cache.get(keys[2]) is not None
+        assert cache.get_metrics()['evictions'] == 1
+
+    def test_disabled_cache(self, tmp_path):
+        """enabled=False: không ghi, luôn miss"""
+        cache = KeypointCache(tmp_path / "cache", max_bytes=1024, enabled=False)
+        cache.put('key', _track())
+
+        assert cache.get('key') is None
+        assert not (tmp_path / "cache").exists()
@@ -0,0 +1,106 @@
+"""
+Tests cho landmark_store: round-trip ghi -> đọc file VSLS
+"""
+import numpy as np
+import pytest
+
+from app.core.landmark_store import (
+    HANDS_LAYOUT,
+    HOLISTIC_LAYOUT,
+    read_landmark_sequence,
+    sequence_from_frames,
+    sequence_to_frames,
+    write_landmark_sequence
+)
+from app.core.landmarks import LandmarkFrame
+
+
+def _points(seed: int, joints: int) -> np.ndarray:
+    return np.random.default_rng(seed).random((joints, 4)).astype(np.float32)
+
+
+def _hands_frame(hand_types, seed: int = 0) -> LandmarkFrame:
+    hands = [_points(seed + i, 21) for i in range(len(hand_types))]
+    points = np.concatenate(hands) if hands else np.zeros((0, 4), np.float32)
+    segments = {f'hand_{i}': (21 * i, 21 * i + 21) for i in range(len(hand_types))}
+    return LandmarkFrame(points, segments, list(hand_types), 'hands')
+
+
+class TestLandmarkSequenceRoundTrip:
+    """Ghi rồi đọc lại cho cùng points / mask / segments / meta"""
+
+    @pytest.mark.parametrize('mmap', [True, False])
+    def test_holistic_round_trip(self, tmp_path, mmap):
+        holistic = LandmarkFrame.from_segments(
+            [('pose', _points(0, 33)), ('left_hand', _points(1, 21))], kind='holistic'
+        )
+        frames = [holistic, LandmarkFrame.empty('holistic')]
+        sequence = sequence_from_frames(frames, HOLISTIC_LAYOUT, meta={'fps': 30.0})
+
+        path = write_landmark_sequence(tmp_path / "a.vsls", sequence)
+        loaded = read_landmark_sequence(path, mmap=mmap)
+
+        assert len(loaded) == 2
+        assert loaded.segments == sequence.segments
+        assert loaded.meta == {'fps': 30.0}
+        np.testing.assert_array_equal(loaded.points, sequence.points)
+        np.testing.assert_array_equal(loaded.mask, sequence.mask)
+        np.testing.assert_array_equal(loaded.segment('pose')[0], _points(0, 33))
+        assert loaded.present('left_hand').tolist() == [True, False]
+        assert loaded.present('right_hand').tolist() == [False, False]
+
+    def test_float16_round_trip_error(self, tmp_path):
+        sequence = sequence_from_frames([_hands_frame(['Left', 'Right'])], HANDS_LAYOUT)
+
+        loaded = read_landmark_sequence(write_landmark_sequence(tmp_path / "h.vsls", sequence, dtype='float16'))
+
+        assert loaded.points.dtype == np.float16
+        np.testing.assert_allclose(loaded.points, sequence.points, atol=1e-3)
+
+    def test_frame_dicts_round_trip(self, tmp_path):
+        holistic = LandmarkFrame.from_segments([('right_hand', _points(3, 21))], kind='holistic')
+        frames = sequence_to_frames(sequence_from_frames([holistic], HANDS_LAYOUT))
+
+        loaded = read_landmark_sequence(
+            write_landmark_sequence(tmp_path / "d.vsls", sequence_from_frames(frames, HANDS_LAYOUT))
+        )
+
+        assert sequence_to_frames(loaded) == frames
+
+
+class TestHandSegments:
+    """Hands không bị mất khi handedness 'Unknown' hoặc trùng nhau"""
+
+    @pytest.mark.parametrize('hand_types', [
+        ['Left', 'Right'],
+        ['Unknown', 'Right'],
+        ['Left', 'Left'],
+        ['Right', 'Right'],
+        ['Unknown', 'Unknown'],
+    ])
+    def test_two_hands_are_kept(self, tmp_path, hand_types):
+        frame = _hands_frame(hand_types)
+
+        loaded = read_landmark_sequence(
+            write_landmark_sequence(tmp_path / "h.vsls", sequence_from_frames([frame], HANDS_LAYOUT))
+        )
+
+        assert loaded.mask[0].tolist() == [True, True]
+        stored = {loaded.segment(name)[0].tobytes() for name in ('left_hand', 'right_hand')}
+        assert stored == {points.tobytes() for _, points in frame.iter_hands()}
+
+    def test_known_handedness_keeps_its_segment(self):
+        frame = _hands_frame(['Unknown', 'Left'])
+
+        sequence = sequence_from_frames([frame], HANDS_LAYOUT)
+
+        np.testing.assert_array_equal(sequence.segment('left_hand')[0], frame.segment('hand_1'))
+        np.testing.assert_array_equal(sequence.segment('right_hand')[0], frame.segment('hand_0'))
+
+    def test_hands_dict_with_missing_handedness(self):
+        frame = _hands_frame(['Right', 'Unknown']).to_dict()
+        frame['handedness'] = ['Right']
+
+        sequence = sequence_from_frames([frame], HANDS_LAYOUT)
+
+        assert sequence.mask[0].tolist() == [True, True]
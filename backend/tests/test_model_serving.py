@@ -0,0 +1,199 @@
+"""
+Tests cho model hot-swap: load lỗi không swap sang placeholder, registry báo mọi thay đổi active model
+"""
+import threading
+import time
+
+import pytest
+
+from app.core.model_serving import ModelServer
+from app.core.trained_model_registry import TrainedModelRegistry
+from app.modules.vsl_recognition import models as vsl_models
+from app.modules.vsl_recognition.models import VSLRecognitionModel
+from app.modules.vsl_recognition.service import _load_vsl_model
+
+
+class FakeRuntime:
+    quantization = None
+
+    def __init__(self, path):
+        self.path = path
+        self.closed = False
+
+    def predict(self, features):
+        raise AssertionError("not used")
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def registry(tmp_path):
+    return TrainedModelRegistry(tmp_path / "model_registry.json")
+
+
+@pytest.fixture
+def fake_runtime(monkeypatch):
+    """load_runtime giả: file có nội dung 'corrupt' thì lỗi như runtime thật"""
+    def load_runtime(model_path, backend=None, num_threads=None):
+        if open(model_path, 'rb').read() == b'corrupt':
+            raise ValueError(f"Invalid model file: {model_path}")
+        return FakeRuntime(model_path)
+
+    monkeypatch.setattr(vsl_models, 'load_runtime', load_runtime)
+
+
+def _register(registry, tmp_path, name: str, content: bytes = b'ok', is_active: bool = False) -> str:
+    path = tmp_path / f"{name}.onnx"
+    if content is not None:
+        path.write_bytes(content)
+    return registry.register_model(name, 'v1', 'vsl_recognition', str(path), is_active=is_active)['model_id']
+
+
+def _wait_idle(server: ModelServer, model_type: str = 'vsl_recognition'):
+    deadline = time.time() + 5
+    while server.get_status()[model_type]['loading'] and time.time() < deadline:
+        time.sleep(0.01)
+    return server.get_status()[model_type]
+
+
+class TestModelLoading:
+    """VSLRecognitionModel chỉ là placeholder khi không có model_path"""
+
+    def test_no_path_is_placeholder(self):
+        assert VSLRecognitionModel().model is None
+
+    def test_missing_file_raises(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            VSLRecognitionModel(tmp_path / "missing.onnx")
+
+    def test_corrupt_file_raises(self, tmp_path, fake_runtime):
+        path = tmp_path / "bad.onnx"
+        path.write_bytes(b'corrupt')
+
+        with pytest.raises(ValueError):
+            VSLRecognitionModel(path)
+
+
+class TestHotSwap:
+    """Model server giữ version đang serve khi version mới load lỗi"""
+
+    @pytest.mark.parametrize('content', [b'corrupt', None])
+    def test_failed_load_keeps_current_model(self, registry, tmp_path, fake_runtime, content):
+        good = _register(registry, tmp_path, 'good', is_active=True)
+        server = ModelServer(registry, watch_interval=0)
+        server.register('vsl_recognition', _load_vsl_model)
+        with server.acquire('vsl_recognition') as model:
+            assert model.model is not None
+
+        bad = _register(registry, tmp_path, 'bad', content=content)
+        registry.set_active_model(bad)
+        status = _wait_idle(server)
+
+        assert status['model_id'] == good
+        assert status['swaps'] == 0
+        assert status['last_error']
+        with server.acquire('vsl_recognition') as model:
+            assert model.model is not None and not model.model.closed
+
+    def test_good_load_swaps(self, registry, tmp_path, fake_runtime):
+        _register(registry, tmp_path, 'first', is_active=True)
+        server = ModelServer(registry, watch_interval=0)
+        server.register('vsl_recognition', _load_vsl_model)
+        with server.acquire('vsl_recognition') as model:
+            first = model.model
+
+        second = _register(registry, tmp_path, 'second')
+        registry.set_active_model(second)
+        status = _wait_idle(server)
+
+        assert status['model_id'] == second
+        assert status['swaps'] == 1
+        assert first.closed
+
+
+class TestFirstLoad:
+    """Load lần đầu không giữ lock của server"""
+
+    def test_status_not_blocked_by_slow_load(self, registry):
+        started, release = threading.Event(), threading.Event()
+        loads = []
+
+        def slow_loader(entry):
+            loads.append(entry)
+            started.set()
+            release.wait(5)
+            return object()
+
+        server = ModelServer(registry, watch_interval=0)
+        server.register('vsl_recognition', slow_loader)
+        clients = [threading.Thread(target=server.preload, args=('vsl_recognition',)) for _ in range(3)]
+        for client in clients:
+            client.start()
+        assert started.wait(5)
+
+        try:
+            status = {}
+            reader = threading.Thread(target=lambda: status.update(server.get_status()))
+            reader.start()
+            reader.join(timeout=1)
+            assert not reader.is_alive()
+            assert status['vsl_recognition']['model_id'] is None
+        finally:
+            release.set()
+            for client in clients:
+                client.join(timeout=5)
+
+        assert len(loads) == 1  # concurrent first requests share one load
+
+    def test_unregistered_type_raises(self, registry):
+        server = ModelServer(registry, watch_interval=0)
+
+        with pytest.raises(KeyError):
+            with server.acquire('unknown'):
+                pass
+
+
+class TestRegistryNotifications:
+    """Listeners được báo khi active model thay đổi trong cùng process"""
+
+    @pytest.fixture
+    def changes(self, registry):
+        changes = []
+        registry.add_listener(changes.append)
+        return changes
+
+    def test_register_active_notifies(self, registry, tmp_path, changes):
+        first = _register(registry, tmp_path, 'first', is_active=True)
+        _register(registry, tmp_path, 'inactive')
+        second = _register(registry, tmp_path, 'second', is_active=True)
+
+        assert changes == ['vsl_recognition', 'vsl_recognition']
+        assert registry.get_active_model('vsl_recognition')['id'] == second
+        assert not registry.get_model(first)['is_active']
+
+    def test_delete_active_notifies(self, registry, tmp_path, changes):
+        active = _register(registry, tmp_path, 'active', is_active=True)
+        inactive = _register(registry, tmp_path, 'inactive')
+        changes.clear()
+
+        assert registry.delete_model(inactive)['success']
+        assert changes == []
+        assert registry.delete_model(active)['success']
+        assert changes == ['vsl_recognition']
+        assert not registry.delete_model(active)['success']
+        assert registry.get_active_model('vsl_recognition') is None
+
+    def test_server_follows_register_and_delete(self, registry, tmp_path, fake_runtime):
+        server = ModelServer(registry, watch_interval=0)
+        server.register('vsl_recognition', _load_vsl_model)
+        with server.acquire('vsl_recognition') as model:
+            assert model.model is None
+
+        model_id = _register(registry, tmp_path, 'new', is_active=True)
+        assert _wait_idle(server)['model_id'] == model_id
+
+        registry.delete_model(model_id)
+        status = _wait_idle(server)
+        assert status['model_id'] is None
+        assert status['swaps'] == 2
@@ -0,0 +1,222 @@
+"""
+Tests cho response_codec: encode -> decode, sai số quantize, delta/keyframe, msgpack optional
+"""
+import json
+import sys
+import types
+
+import numpy as np
+import pytest
+
+from app.core.landmarks import LandmarkFrame
+from app.modules.vsl_recognition.response_codec import (
+    DELTA_KEYFRAME_INTERVAL,
+    KEYPOINT_QUANTIZATION,
+    ResponseEncoder,
+    decode_binary_response
+)
+
+# Sai số tối đa của rint(x * Q) / Q (cộng sai số float32)
+MAX_QUANTIZATION_ERROR = 0.5 / KEYPOINT_QUANTIZATION + 1e-6
+
+
+def _hands_frame(points, hand_types) -> LandmarkFrame:
+    """points: (hands, 21, 3) -> LandmarkFrame kind 'hands'"""
+    points = np.asarray(points, np.float32)
+    if not len(points):
+        return LandmarkFrame.empty('hands')
+    xyzv = np.concatenate([np.hstack([hand, np.ones((21, 1), np.float32)]) for hand in points])
+    segments = {f'hand_{i}': (21 * i, 21 * i + 21) for i in range(len(points))}
+    return LandmarkFrame(xyzv, segments, list(hand_types), 'hands')
+
+
+def _random_hands(seed: int, hands: int = 2) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    points = rng.random((hands, 21, 3)).astype(np.float32)
+    points[..., 2] = points[..., 2] * 0.4 - 0.2  # z có thể âm
+    return points
+
+
+def _result(**extra):
+    return {'success': True, 'timestamp': 1.5, 'processing_time': 0.01, 'inference_scale': 0.5, **extra}
+
+
+def _encode_binary(encoder: ResponseEncoder, points, hand_types=('Left', 'Right'), previous=None):
+    encoder.encode_hands(_hands_frame(points, hand_types[:len(points)]))
+    return decode_binary_response(encoder.dumps(_result(frames_dropped=3)), previous)
+
+
+class TestQuantization:
+    """Encode -> decode giữ toạ độ trong sai số quantize"""
+
+    def test_binary_round_trip_error_bound(self):
+        encoder = ResponseEncoder('binary')
+        points = _random_hands(0)
+
+        decoded = _encode_binary(encoder, points)
+
+        assert decoded['success'] and decoded['keyframe']
+        assert decoded['hand_types'] == ['Left', 'Right']
+        assert decoded['frames_dropped'] == 3
+        assert decoded['inference_scale'] == 0.5
+        assert np.abs(decoded['keypoints'] - points).max() <= MAX_QUANTIZATION_ERROR
+
+    def test_flat_round_trip_error_bound(self):
+        encoder = ResponseEncoder('flat')
+        points = _random_hands(1)
+
+        hands = encoder.encode_hands(_hands_frame(points, ['Left', 'Right']))
+        message = json.loads(encoder.dumps(_result(hands=hands)))
+
+        assert message['quantization'] == KEYPOINT_QUANTIZATION
+        keypoints = np.array([hand['keypoints'] for hand in message['hands']]).reshape(points.shape)
+        assert np.abs(keypoints / message['quantization'] - points).max() <= MAX_QUANTIZATION_ERROR
+
+    def test_binary_error_response(self):
+        encoder = ResponseEncoder('binary')
+
+        decoded = decode_binary_response(encoder.dumps({'success': False, 'error': 'Lỗi decode frame'}))
+
+        assert not decoded['success']
+        assert decoded['error'] == 'Lỗi decode frame'
+        assert decoded['inference_scale'] is None
+
+
+class TestDelta:
+    """Delta frames và điều kiện gửi lại keyframe"""
+
+    def _motion(self, frames: int, step: float = 0.002, seed: int = 2) -> np.ndarray:
+        rng = np.random.default_rng(seed)
+        start = _random_hands(seed) * 0.8 + 0.1
+        return start + np.cumsum(rng.uniform(-step, step, (frames,) + start.shape), axis=0).astype(np.float32)
+
+    def test_delta_chain_does_not_accumulate_error(self):
+        """Cộng dồn delta frames cho đúng giá trị quantize của từng frame"""
+        encoder = ResponseEncoder('binary', delta=True)
+        previous = None
+        keyframes = []
+
+        for points in self._motion(DELTA_KEYFRAME_INTERVAL + 5):
+            decoded = _encode_binary(encoder, points, previous=previous)
+            keyframes.append(decoded['keyframe'])
+            previous = decoded['quantized']
+            np.testing.assert_array_equal(previous, np.rint(points * KEYPOINT_QUANTIZATION).astype(np.int16))
+            assert np.abs(decoded['keypoints'] - points).max() <= MAX_QUANTIZATION_ERROR
+
+        # Keyframe đầu tiên, rồi mỗi DELTA_KEYFRAME_INTERVAL delta frames
+        assert keyframes[0] and not any(keyframes[1:DELTA_KEYFRAME_INTERVAL + 1])
+        assert keyframes[DELTA_KEYFRAME_INTERVAL + 1]
+
+    def test_flat_delta_reconstructs(self):
+        encoder = ResponseEncoder('flat', delta=True)
+        frames = self._motion(5)
+        total = None
+
+        for points in frames:
+            hands = encoder.encode_hands(_hands_frame(points, ['Left', 'Right']))
+            message = json.loads(encoder.dumps(_result(hands=hands)))
+            keypoints = np.array([hand['keypoints'] for hand in message['hands']]).reshape(points.shape)
+            total = keypoints if message['keyframe'] else total + keypoints
+
+        assert np.abs(total / KEYPOINT_QUANTIZATION - frames[-1]).max() <= MAX_QUANTIZATION_ERROR
+
+    def test_hand_count_change_sends_keyframe(self):
+        encoder = ResponseEncoder('binary', delta=True)
+        two_hands = _random_hands(3)
+        previous = _encode_binary(encoder, two_hands)['quantized']
+        assert not _encode_binary(encoder, two_hands, previous=previous)['keyframe']
+
+        one_hand = _encode_binary(encoder, two_hands[:1])
+        assert one_hand['keyframe']
+        assert one_hand['hand_types'] == ['Left']
+
+        no_hands = _encode_binary(encoder, two_hands[:0])
+        assert no_hands['keyframe'] and no_hands['hand_types'] == []
+
+        assert _encode_binary(encoder, two_hands)['keyframe']
+
+    def test_handedness_change_sends_keyframe(self):
+        encoder = ResponseEncoder('binary', delta=True)
+        points = _random_hands(4)
+        _encode_binary(encoder, points, ('Left', 'Right'))
+
+        decoded = _encode_binary(encoder, points, ('Right', 'Left'))
+
+        assert decoded['keyframe']
+        assert decoded['hand_types'] == ['Right', 'Left']
+
+    def test_large_binary_delta_sends_keyframe(self):
+        """Delta ngoài int8 -> keyframe (binary); 'flat' vẫn gửi delta"""
+        points = _random_hands(5)
+        moved = points + 0.05  # 500 quantization steps
+
+        binary = ResponseEncoder('binary', delta=True)
+        _encode_binary(binary, points)
+        assert _encode_binary(binary, moved)['keyframe']
+
+        flat = ResponseEncoder('flat', delta=True)
+        flat.encode_hands(_hands_frame(points, ['Left', 'Right']))
+        flat.dumps(_result())
+        flat.encode_hands(_hands_frame(moved, ['Left', 'Right']))
+        assert json.loads(flat.dumps(_result()))['keyframe'] is False
+
+    def test_error_response_keeps_delta_state(self):
+        encoder = ResponseEncoder('binary', delta=True)
+        points = _random_hands(6)
+        previous = _encode_binary(encoder, points)['quantized']
+
+        encoder.dumps({'success': False, 'error': 'frame lỗi'})
+        decoded = _encode_binary(encoder, points + 0.001, previous=previous)
+
+        assert not decoded['keyframe']
+        assert decoded['sequence'] == 3
+
+    def test_delta_requires_previous(self):
+        encoder = ResponseEncoder('binary', delta=True)
+        points = _random_hands(7)
+        _encode_binary(encoder, points)
+        encoder.encode_hands(_hands_frame(points, ['Left', 'Right']))
+
+        with pytest.raises(ValueError):
+            decode_binary_response(encoder.dumps(_result()))
+
+
+class TestMsgpack:
+    """Format 'msgpack' là optional dependency"""
+
+    def test_missing_msgpack_is_rejected(self, monkeypatch):
+        """Thiếu msgpack -> ValueError (router trả JSON error và đóng connection)"""
+        monkeypatch.setitem(sys.modules, 'msgpack', None)
+
+        with pytest.raises(ValueError, match='pip install msgpack'):
+            ResponseEncoder('msgpack')
+
+    def test_missing_msgpack_session_falls_back_to_error(self, monkeypatch):
+        from app.modules.vsl_recognition.realtime_session import HandTrackingSession
+        monkeypatch.setitem(sys.modules, 'msgpack', None)
+
+        with pytest.raises(ValueError, match='msgpack'):
+            HandTrackingSession(response_format='msgpack')
+        assert HandTrackingSession(response_format='flat').encoder.format == 'flat'
+
+    def test_msgpack_message_matches_flat(self, monkeypatch):
+        """Có msgpack: cùng message với 'flat', serialize bằng msgpack.packb"""
+        fake = types.ModuleType('msgpack')
+        fake.packb = lambda message: json.dumps(message, separators=(',', ':')).encode('utf-8')
+        monkeypatch.setitem(sys.modules, 'msgpack', fake)
+        points = _random_hands(8)
+
+        messages = []
+        for response_format in ('msgpack', 'flat'):
+            encoder = ResponseEncoder(response_format)
+            hands = encoder.encode_hands(_hands_frame(points, ['Left', 'Right']))
+            messages.append(encoder.dumps(_result(hands=hands)))
+
+        assert encoder.binary is False
+        assert isinstance(messages[0], bytes)
+        assert json.loads(messages[0]) == json.loads(messages[1])
+
+    def test_unknown_format_is_rejected(self):
+        for response_format in ('xml', 'json'):
+            with pytest.raises(ValueError):
+                ResponseEncoder(response_format)
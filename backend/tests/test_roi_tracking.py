@@ -0,0 +1,179 @@
+"""
+Tests cho HandRoiTracker: crop geometry, điều kiện full detection lại, reset tracking,
+warm-up pool full-frame detection
+"""
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.config import settings
+from app.core.model_manager import ModelManager, model_manager
+from app.modules.vsl_recognition.roi_tracking import HandRoiTracker
+
+HEIGHT, WIDTH = 720, 1280
+
+
+class FakeHands:
+    """Hands graph giả: một hand = bounding box của vùng pixel sáng trong ảnh đầu vào"""
+
+    def __init__(self, score: float = 0.95):
+        self.score = score
+        self.inputs = []
+        self.resets = 0
+
+    def reset(self):
+        self.resets += 1
+
+    def process(self, image):
+        self.inputs.append(image.shape[:2])
+        height, width = image.shape[:2]
+        ys, xs = np.nonzero(image[..., 0] > 128)
+        if len(xs) == 0:
+            return SimpleNamespace(multi_hand_landmarks=None, multi_handedness=None)
+        landmarks = [
+            SimpleNamespace(
+                x=(xs.min() + (xs.max() - xs.min()) * k / 20) / width,
+                y=(ys.min() + (ys.max() - ys.min()) * k / 20) / height,
+                z=0.0, visibility=0.0
+            )
+            for k in range(21)
+        ]
+        label = SimpleNamespace(label='Left', score=self.score)
+        return SimpleNamespace(
+            multi_hand_landmarks=[SimpleNamespace(landmark=landmarks)],
+            multi_handedness=[SimpleNamespace(classification=[label])]
+        )
+
+
+@pytest.fixture
+def detector(monkeypatch):
+    """Full-frame detection graph (static_image_mode) giả"""
+    detector = FakeHands()
+
+    @contextmanager
+    def hands_session(timeout=None, static_image_mode=False):
+        assert static_image_mode
+        yield detector
+
+    monkeypatch.setattr(model_manager, 'hands_session', hands_session)
+    return detector
+
+
+def _frame(x: int, y: int = 300, size=(100, 80)) -> np.ndarray:
+    image = np.zeros((HEIGHT, WIDTH, 3), np.uint8)
+    image[y:y + size[0], max(0, x):x + size[1]] = 255
+    return image
+
+
+class TestHandRoiTracker:
+    """Test cases cho HandRoiTracker"""
+
+    def test_crops_track_on_session_graph(self, detector):
+        """Sau full detection, các frames tiếp theo chỉ inference trên crop bằng graph của session"""
+        hands = FakeHands(score=0.3)  # handedness score thấp không làm tracking thất bại
+        tracker = HandRoiTracker(full_detection_interval=10, margin=0.3)
+
+        for i in range(6):
+            frame = tracker.detect(_frame(400 + 2 * i), hands=hands)
+            assert frame.hand_count == 1
+
+        metrics = tracker.get_metrics()
+        assert metrics['full_detections'] == 1
+        assert metrics['tracking_failures'] == 0
+        assert detector.inputs == [(HEIGHT, WIDTH)]
+        assert all(shape != (HEIGHT, WIDTH) for shape in hands.inputs)
+
+    def test_roi_coordinates_match_full_frame(self, detector):
+        """Landmarks từ crop được map về đúng toạ độ toàn frame"""
+        tracker = HandRoiTracker(full_detection_interval=10)
+        hands = FakeHands()
+        tracker.detect(_frame(400), hands=hands)
+
+        frame = tracker.detect(_frame(404), hands=hands)
+        expected = model_manager.extract_hand_landmarks(_frame(404), hands=FakeHands())
+
+        np.testing.assert_allclose(frame.points[:, :2], expected.points[:, :2], atol=1e-6)
+
+    def test_graph_reset_only_on_new_crop_geometry(self, detector):
+        """Crop graph được reset khi pixel ROI đổi, không reset khi ROI giữ nguyên"""
+        hands = FakeHands()
+        tracker = HandRoiTracker(full_detection_interval=50, margin=0.3)
+
+        for _ in range(5):
+            tracker.detect(_frame(400), hands=hands)
+        assert hands.resets == 1
+
+        for i in range(1, 20):
+            tracker.detect(_frame(400 + 6 * i), hands=hands)
+        metrics = tracker.get_metrics()
+        assert hands.resets == metrics['graph_resets'] >= 2
+        assert hands.resets < metrics['roi_detections']
+
+    def test_hand_clipped_at_crop_edge_triggers_full_detection(self, detector):
+        """Hand ra khỏi ROI (chạm mép crop) -> full detection lại ngay trên frame đó"""
+        hands = FakeHands()
+        tracker = HandRoiTracker(full_detection_interval=50, margin=0.3)
+        tracker.detect(_frame(400), hands=hands)
+
+        frame = tracker.detect(_frame(440), hands=hands)
+
+        metrics = tracker.get_metrics()
+        assert metrics['tracking_failures'] == 1
+        assert metrics['full_detections'] == 2
+        expected = model_manager.extract_hand_landmarks(_frame(440), hands=FakeHands())
+        np.testing.assert_allclose(frame.points[:, :2], expected.points[:, :2], atol=1e-6)
+
+    def test_hand_at_frame_edge_is_not_clipped(self, detector):
+        """ROI trùng mép frame: hand sát mép frame không bị coi là ra khỏi crop"""
+        tracker = HandRoiTracker(full_detection_interval=50)
+        hands = FakeHands()
+
+        for _ in range(5):
+            tracker.detect(_frame(0), hands=hands)
+
+        assert tracker.get_metrics()['tracking_failures'] == 0
+
+    def test_lost_hand_triggers_full_detection(self, detector):
+        """Mất hand trong ROI -> full detection, không có hand thì bỏ ROI"""
+        tracker = HandRoiTracker(full_detection_interval=50)
+        hands = FakeHands()
+        tracker.detect(_frame(400), hands=hands)
+
+        frame = tracker.detect(np.zeros((HEIGHT, WIDTH, 3), np.uint8), hands=hands)
+
+        assert frame.hand_count == 0
+        assert tracker.get_metrics()['tracking_failures'] == 1
+        assert tracker.get_metrics()['roi'] is None
+
+
+class TestWarmup:
+    """warmup_graph('hands') tạo sẵn cả graph full-frame detection khi bật ROI tracking"""
+
+    @pytest.fixture
+    def manager(self, monkeypatch):
+        manager = ModelManager()
+        created = []
+
+        def create_hands_model(static_image_mode=False):
+            created.append(static_image_mode)
+            return FakeHands()
+
+        monkeypatch.setattr(manager, '_create_hands_model', create_hands_model)
+        manager.created = created
+        yield manager
+        manager.release_models()
+
+    @pytest.mark.parametrize('roi_tracking', [True, False])
+    def test_static_pool_prewarmed_with_roi_tracking(self, manager, monkeypatch, roi_tracking):
+        monkeypatch.setattr(settings, 'HAND_ROI_TRACKING', roi_tracking)
+
+        count = manager.warmup_graph('hands')
+
+        static = manager.created.count(True)
+        assert static == (1 if roi_tracking else 0)
+        assert count == settings.HANDS_POOL_MIN_SIZE + static
+        assert manager.get_pool_metrics()['hands']['idle'] == settings.HANDS_POOL_MIN_SIZE
+        if roi_tracking:
+            assert manager.get_pool_metrics()['hands_static']['idle'] == 1
@@ -0,0 +1,172 @@
+"""
+Tests cho smoothing: input hằng số, độ trễ với step input, reset khi hand biến mất,
+smooth_landmarks_sequence giữ keys của frame dicts
+"""
+import numpy as np
+import pytest
+
+from app.core.landmarks import LandmarkFrame
+from app.modules.vsl_recognition.smoothing import (
+    HandLandmarkSmoother,
+    KalmanFilter,
+    OneEuroFilter,
+    create_landmark_filter,
+    smooth_sequence
+)
+from app.modules.vsl_recognition.utils import smooth_landmarks_sequence
+
+FPS = 30.0
+STEP = 0.1
+
+
+def _hands_frame(hands) -> LandmarkFrame:
+    """hands: list of (handedness, array (21, 3)) -> LandmarkFrame kind 'hands'"""
+    if not hands:
+        return LandmarkFrame.empty('hands')
+    points = np.concatenate([
+        np.hstack([xyz, np.ones((21, 1))]) for _, xyz in hands
+    ]).astype(np.float32)
+    segments = {f'hand_{i}': (21 * i, 21 * i + 21) for i in range(len(hands))}
+    return LandmarkFrame(points, segments, [hand_type for hand_type, _ in hands], 'hands')
+
+
+def _step_response(method: str, frames: int = 30, step_at: int = 10) -> np.ndarray:
+    """Output (đã chia cho STEP) của filter khi input nhảy từ 0 lên STEP tại frame step_at"""
+    points = np.zeros((frames, 2, 3))
+    points[step_at:] = STEP
+    smoothed = smooth_sequence(points, method, fps=FPS)
+    return smoothed[step_at:, 0, 0] / STEP
+
+
+class TestFilters:
+    """Test cases cho OneEuroFilter / KalmanFilter"""
+
+    @pytest.mark.parametrize('method', ['one_euro', 'kalman'])
+    def test_constant_input_stays_constant(self, method):
+        """Input không đổi thì output bằng đúng input"""
+        points = np.tile(np.array([0.3, 0.6, -0.05]), (50, 21, 1))
+
+        smoothed = smooth_sequence(points, method, fps=FPS)
+
+        np.testing.assert_allclose(smoothed, points, atol=1e-12)
+
+    def test_one_euro_step_lag(self):
+        """One Euro: frame đầu sau step đã đi quá nửa đường, sau 3 frames sai < 1%"""
+        response = _step_response('one_euro')
+
+        assert 0.5 < response[0] < 1.0
+        assert np.all(np.diff(response) >= 0)  # không overshoot
+        assert abs(response[3] - 1.0) < 0.01
+
+    def test_kalman_step_lag(self):
+        """Kalman: frame đầu sau step đã đi quá nửa đường, overshoot < 15%, sau 10 frames sai < 2%"""
+        response = _step_response('kalman')
+
+        assert 0.5 < response[0] < 1.0
+        assert response.max() < 1.15
+        assert np.all(np.abs(response[10:] - 1.0) < 0.02)
+
+    @pytest.mark.parametrize('filter_cls', [OneEuroFilter, KalmanFilter])
+    def test_reappearing_row_is_reinitialized(self, filter_cls):
+        """Row vắng mặt rồi xuất hiện lại ở vị trí mới được trả về nguyên vẹn"""
+        landmark_filter = filter_cls()
+        present = np.array([True, True])
+        for t in range(5):
+            landmark_filter(np.zeros((2, 3)), t / FPS, present)
+        landmark_filter(np.zeros((2, 3)), 5 / FPS, np.array([True, False]))
+
+        moved = np.full((2, 3), 0.5)
+        output = landmark_filter(moved, 6 / FPS, present)
+
+        np.testing.assert_array_equal(output[1], moved[1])
+        assert not np.allclose(output[0], moved[0])
+
+    def test_unknown_method_raises(self):
+        """Method không hỗ trợ -> ValueError"""
+        with pytest.raises(ValueError):
+            create_landmark_filter('median')
+        assert create_landmark_filter('none') is None
+
+
+class TestHandLandmarkSmoother:
+    """Test cases cho HandLandmarkSmoother"""
+
+    @pytest.mark.parametrize('method', ['one_euro', 'kalman'])
+    def test_resets_when_hand_disappears(self, method):
+        """Hand biến mất một frame rồi xuất hiện lại: không nội suy từ vị trí cũ"""
+        smoother = HandLandmarkSmoother(method)
+        before, after = np.zeros((21, 3)), np.full((21, 3), 0.5)
+        for t in range(5):
+            smoother.update(_hands_frame([('Left', before)]), t / FPS)
+        smoother.update(_hands_frame([]), 5 / FPS)
+
+        output = smoother.update(_hands_frame([('Left', after)]), 6 / FPS)
+
+        np.testing.assert_allclose(output.segment('hand_0')[:, :3], after, atol=1e-6)
+
+    def test_present_hand_is_smoothed(self):
+        """Không có frame vắng mặt thì cùng chuyển động đó được lọc (đối chứng)"""
+        smoother = HandLandmarkSmoother('one_euro')
+        before, after = np.zeros((21, 3)), np.full((21, 3), 0.5)
+        for t in range(6):
+            smoother.update(_hands_frame([('Left', before)]), t / FPS)
+
+        output = smoother.update(_hands_frame([('Left', after)]), 6 / FPS)
+
+        assert np.all(output.segment('hand_0')[:, :3] < 0.5)
+
+    def test_slots_follow_handedness(self):
+        """Khi một hand biến mất, hand còn lại vẫn lọc theo state của chính nó"""
+        smoother = HandLandmarkSmoother('one_euro')
+        left, right = np.zeros((21, 3)), np.full((21, 3), 0.8)
+        for t in range(5):
+            smoother.update(_hands_frame([('Left', left), ('Right', right)]), t / FPS)
+
+        output = smoother.update(_hands_frame([('Right', right)]), 5 / FPS)
+
+        assert output.handedness == ['Right']
+        np.testing.assert_allclose(output.segment('hand_0')[:, :3], right, atol=1e-6)
+        np.testing.assert_array_equal(output.segment('hand_0')[:, 3], 1.0)
+
+
+class TestSmoothLandmarksSequence:
+    """smooth_landmarks_sequence trên frame dicts (format JSON hiện có)"""
+
+    def _frames(self, count: int = 6):
+        frames = []
+        for t in range(count):
+            hand = [{'x': 0.1 * t, 'y': 0.5, 'z': 0.0, 'visibility': 1.0}] * 21
+            frames.append({
+                'frame_number': t,
+                'timestamp': t / FPS,
+                'left_hand_landmarks': hand,
+                'right_hand_landmarks': hand if t % 2 else None,
+                'pose_landmarks': None  # không có trong layout suy ra
+            })
+        return frames
+
+    @pytest.mark.parametrize('method', ['moving_average', 'one_euro'])
+    def test_extra_keys_survive(self, method):
+        """frame_number / timestamp và keys của segments None được giữ, input không bị sửa"""
+        frames = self._frames()
+
+        smoothed = smooth_landmarks_sequence(frames, method=method)
+
+        assert [frame['frame_number'] for frame in smoothed] == list(range(6))
+        assert [frame['timestamp'] for frame in smoothed] == [t / FPS for t in range(6)]
+        assert all(
+            set(frame) == {'frame_number', 'timestamp', 'left_hand_landmarks', 'right_hand_landmarks', 'pose_landmarks'}
+            for frame in smoothed
+        )
+        assert smoothed[0]['right_hand_landmarks'] is None
+        assert all(frame['pose_landmarks'] is None for frame in smoothed)
+        assert frames[3]['left_hand_landmarks'][0]['x'] == pytest.approx(0.3)
+
+    def test_only_landmarks_are_smoothed(self):
+        frames = self._frames()
+
+        smoothed = smooth_landmarks_sequence(frames, window_size=3)
+
+        assert smoothed[3]['left_hand_landmarks'][0]['x'] == pytest.approx(0.3, abs=1e-6)  # (0.2+0.3+0.4)/3
+        assert smoothed[0]['left_hand_landmarks'][0]['x'] == pytest.approx(0.05, abs=1e-6)
+        assert smoothed[3] is not frames[3]
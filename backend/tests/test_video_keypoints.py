@@ -0,0 +1,89 @@
+"""
+Tests cho video_keypoints: chia shards và trích xuất sharded vs tuần tự
+"""
+import cv2
+import numpy as np
+import pytest
+
+from app.config import settings
+from app.modules.vsl_recognition import video_keypoints
+from app.modules.vsl_recognition.video_keypoints import (
+    extract_hand_keypoint_range,
+    extract_hand_keypoints_sharded,
+    plan_video_shards
+)
+
+
+def _sampled_frames(shards, total_video_frames, sample_rate):
+    """Các frames được xử lý theo plan (stop None = hết video)"""
+    frames = []
+    for start, stop in shards:
+        stop = total_video_frames if stop is None else min(stop, total_video_frames)
+        frames.extend(f for f in range(start, stop) if f % sample_rate == 0)
+    return frames
+
+
+class TestPlanVideoShards:
+    """Test cases cho plan_video_shards"""
+
+    def test_shards_are_contiguous_and_aligned(self):
+        """Shards liền nhau, không overlap, bắt đầu tại bội số của sample_rate"""
+        shards = plan_video_shards(1000, 3, None, 4, 10)
+
+        assert len(shards) == 4
+        assert shards[0][0] == 0
+        assert shards[-1][1] is None
+        for (_, stop), (start, _) in zip(shards, shards[1:]):
+            assert stop == start
+        assert all(start % 3 == 0 for start, _ in shards)
+
+    def test_shards_cover_sequential_frames_once(self):
+        """Tập sampled frames của các shards giống hệt chế độ tuần tự"""
+        shards = plan_video_shards(997, 4, None, 3, 20)
+
+        frames = _sampled_frames(shards, 997, 4)
+        assert frames == list(range(0, 997, 4))
+
+    def test_max_frames_limits_last_shard(self):
+        """max_frames giới hạn shard cuối"""
+        shards = plan_video_shards(1000, 5, 20, 4, 5)
+
+        assert shards == [(0, 25), (25, 50), (50, 75), (75, 100)]
+        assert len(_sampled_frames(shards, 1000, 5)) == 20
+
+    def test_short_video_single_shard(self):
+        """Video ngắn hơn min_frames_per_shard chỉ có một shard"""
+        assert plan_video_shards(10, 1, None, 8, 50) == [(0, None)]
+
+    def test_empty_video(self):
+        """Video không có frame nào"""
+        assert plan_video_shards(0, 1, None, 4, 50) == [(0, None)]
+
+
+@pytest.fixture
+def noise_video(tmp_path):
+    """Video 40 frames noise 160x120"""
+    path = tmp_path / "noise.avi"
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*'MJPG'), 30, (160, 120))
+    assert writer.isOpened()
+    rng = np.random.default_rng(0)
+    for _ in range(40):
+        writer.write(rng.integers(0, 255, (120, 160, 3), dtype=np.uint8))
+    writer.release()
+    return str(path)
+
+
+class TestExtractHandKeypointsSharded:
+    """Sharded và tuần tự cho cùng số frames, cùng thứ tự"""
+
+    def test_sharded_matches_sequential_frames(self, noise_video, monkeypatch):
+        monkeypatch.setattr(settings, 'VIDEO_SHARD_MIN_FRAMES', 5)
+        try:
+            sharded = extract_hand_keypoints_sharded(noise_video, 40, sample_rate=2, num_workers=2)
+        finally:
+            video_keypoints.shutdown_shard_pool()
+        sequential = extract_hand_keypoint_range(noise_video, sample_rate=2)
+
+        assert len(sharded['frame_numbers']) == len(sequential['frame_numbers']) == 20
+        np.testing.assert_array_equal(sharded['frame_numbers'], sequential['frame_numbers'])
+        assert sharded['landmarks'].shape == sequential['landmarks'].shape